@@ -0,0 +1,712 @@
+#!/usr/bin/env python3
+"""
+Benchmarks - setup latency আর streaming efficiency মাপো
+Local stand-in GitHub API আর local file/RTMP sink, তাই real GitHub/YouTube লাগে না।
+Results temp directory র streamer-benchmarks/results.jsonl এ (বা --results path এ) জমা হয়,
+আগের runs এর সাথে মিলিয়ে regressions দেখায় - repo tree তে কিছু লেখা হয় না।
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import base64
+import hashlib
+import random
+import shutil
+import platform
+import subprocess
+import tempfile
+import threading
+import contextlib
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamer
+
+# Outside the checkout, so benchmark runs never leave the working tree dirty
+RESULTS_FILE = os.path.join(tempfile.gettempdir(), 'streamer-benchmarks', 'results.jsonl')
+REGRESSION_THRESHOLD = 1.10
+# seconds - ছোট timings এ scheduler noise কে regression ধরো না
+REGRESSION_SLACK = {'setup': 0.05, 'startup': 0.005, 'assets': 4.0}  # assets: MB
+STREAMER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamer.py')
+
+
+class FakeGitHub:
+    """GitHubAutoSetup যে endpoints ব্যবহার করে তার local stand-in
+
+    প্রতিটা request এ latency (ms), প্রতি token এ rate limit (X-RateLimit-*
+    headers, শেষ হলে 403), GET এ ETag / 304। Repo state memory তে থাকে, তাই
+    একই server এ দ্বিতীয় run "সব unchanged" path টা মাপে।
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, rate_limit=5000, rate_window=60.0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.lock = threading.Lock()
+        self.repos = {}
+        self.objects = {}
+        self.budgets = {}
+        self.requests = {}
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests = {}
+
+    def request_count(self):
+        with self.lock:
+            return sum(self.requests.values())
+
+    # --- Git objects ---
+
+    def _store(self, kind, data):
+        sha = hashlib.sha1(json.dumps([kind, data], sort_keys=True).encode('utf-8')).hexdigest()
+        self.objects[sha] = (kind, data)
+        return sha
+
+    def _create_repo(self, full_name):
+        readme = '# bench\n'
+        tree = self._store('tree', {'README.md': streamer.git_blob_sha(readme.encode('utf-8'))})
+        commit = self._store('commit', {'tree': tree, 'parents': [], 'message': 'Initial commit'})
+        self.repos[full_name] = {
+            'refs': {'main': commit},
+            'secrets': {},
+            'key_id': str(random.randint(10 ** 17, 10 ** 18)),
+            'key': base64.b64encode(os.urandom(32)).decode('ascii'),
+            'contents': {}
+        }
+
+    def _tree_of(self, sha):
+        kind, data = self.objects.get(sha, (None, None))
+        if kind == 'commit':
+            return data['tree'], self.objects[data['tree']][1]
+        if kind == 'tree':
+            return sha, data
+        return None, None
+
+    # --- Routing ---
+
+    def route(self, method, path, body):
+        """(status, json body) - self.lock ধরে রেখে ডাকো"""
+        parts = [part for part in path.split('/') if part]
+        if method == 'GET' and parts == ['user']:
+            return 200, {'login': 'bench-user'}
+        if method == 'POST' and parts == ['user', 'repos']:
+            full_name = f"bench-user/{body['name']}"
+            if full_name in self.repos:
+                return 422, {'message': 'name already exists'}
+            self._create_repo(full_name)
+            return 201, {'full_name': full_name}
+        if len(parts) < 3 or parts[0] != 'repos':
+            return 404, {'message': 'Not Found'}
+
+        full_name = f'{parts[1]}/{parts[2]}'
+        repo = self.repos.get(full_name)
+        rest = parts[3:]
+        if repo is None:
+            return 404, {'message': 'Not Found'}
+        if not rest and method == 'GET':
+            return 200, {'full_name': full_name, 'default_branch': 'main'}
+
+        if rest[:3] == ['git', 'ref', 'heads'] and method == 'GET':
+            sha = repo['refs'].get('/'.join(rest[3:]))
+            return (200, {'object': {'sha': sha}}) if sha else (404, {'message': 'Not Found'})
+        if rest[:3] == ['git', 'refs', 'heads'] and method == 'PATCH':
+            repo['refs']['/'.join(rest[3:])] = body['sha']
+            return 200, {'object': {'sha': body['sha']}}
+        if rest[:2] == ['git', 'trees'] and method == 'GET':
+            tree_sha, tree = self._tree_of(rest[2])
+            if tree is None:
+                return 404, {'message': 'Not Found'}
+            entries = [{'path': path, 'type': 'blob', 'sha': sha} for path, sha in sorted(tree.items())]
+            return 200, {'sha': tree_sha, 'tree': entries, 'truncated': False}
+        if rest == ['git', 'trees'] and method == 'POST':
+            _, base = self._tree_of(body.get('base_tree', ''))
+            tree = dict(base or {})
+            for entry in body['tree']:
+                tree[entry['path']] = entry.get('sha') or streamer.git_blob_sha(entry['content'].encode('utf-8'))
+            return 201, {'sha': self._store('tree', tree)}
+        if rest == ['git', 'blobs'] and method == 'POST':
+            content = body['content']
+            data = base64.b64decode(content) if body.get('encoding') == 'base64' else content.encode('utf-8')
+            return 201, {'sha': streamer.git_blob_sha(data)}
+        if rest == ['git', 'commits'] and method == 'POST':
+            return 201, {'sha': self._store('commit', body)}
+
+        if rest[:1] == ['contents']:
+            file_path = '/'.join(rest[1:])
+            if method == 'GET':
+                content = repo['contents'].get(file_path)
+                if content is None:
+                    return 404, {'message': 'Not Found'}
+                return 200, {'sha': streamer.git_blob_sha(content), 'path': file_path}
+            if method == 'PUT':
+                existed = file_path in repo['contents']
+                repo['contents'][file_path] = base64.b64decode(body['content'])
+                return (200 if existed else 201), {'content': {'path': file_path}}
+
+        if rest == ['actions', 'secrets', 'public-key'] and method == 'GET':
+            return 200, {'key_id': repo['key_id'], 'key': repo['key']}
+        if rest[:2] == ['actions', 'secrets'] and len(rest) == 3 and method == 'PUT':
+            if body.get('key_id') != repo['key_id']:
+                return 422, {'message': 'Bad key_id'}
+            existed = rest[2] in repo['secrets']
+            repo['secrets'][rest[2]] = body['encrypted_value']
+            return (204 if existed else 201), None
+        if rest[:2] == ['actions', 'workflows'] and rest[-1:] == ['dispatches'] and method == 'POST':
+            return 204, None
+        return 404, {'message': 'Not Found'}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if fake.latency or fake.jitter:
+                    time.sleep(fake.latency + random.uniform(0, fake.jitter))
+
+                url = urlsplit(self.path)
+                token = self.headers.get('Authorization', '')
+                endpoint = streamer.GitHubAPI.endpoint_name(self.command, url.path)
+                now = time.time()
+                with fake.lock:
+                    fake.requests[endpoint] = fake.requests.get(endpoint, 0) + 1
+                    budget = fake.budgets.get(token)
+                    if budget is None or budget['reset'] <= now:
+                        budget = fake.budgets[token] = {'remaining': fake.rate_limit,
+                                                        'reset': now + fake.rate_window}
+                    if budget['remaining'] <= 0:
+                        status, body = 403, {'message': 'API rate limit exceeded'}
+                    else:
+                        try:
+                            status, body = fake.route(self.command, url.path, json.loads(raw or b'null'))
+                        except (KeyError, TypeError, ValueError) as e:
+                            status, body = 400, {'message': str(e)}
+
+                    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+                    etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+                    not_modified = (self.command == 'GET' and status == 200
+                                    and self.headers.get('If-None-Match') == etag)
+                    # Conditional 304 rate limit এ গোনা হয় না - GitHub এর মত
+                    if not not_modified and status != 403:
+                        budget['remaining'] -= 1
+                    remaining, reset = budget['remaining'], budget['reset']
+
+                self.send_response(304 if not_modified else status)
+                self.send_header('X-RateLimit-Limit', str(fake.rate_limit))
+                self.send_header('X-RateLimit-Remaining', str(max(remaining, 0)))
+                self.send_header('X-RateLimit-Reset', str(int(reset)))
+                if self.command == 'GET' and status == 200:
+                    self.send_header('ETag', etag)
+                if not_modified or status in (204, 304):
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = _handle
+
+        return Handler
+
+
+class BenchSetup(streamer.GitHubAutoSetup):
+    """Extra files আর secrets যোগ করা GitHubAutoSetup - 1..N scaling মাপার জন্য"""
+
+    def __init__(self, base_dir, extra_files=0, extra_secrets=0):
+        super().__init__(base_dir=base_dir, banner=False)
+        self.extra_files = extra_files
+        self.extra_secrets = extra_secrets
+
+    def collect_files_to_upload(self):
+        files = super().collect_files_to_upload()
+        for i in range(self.extra_files):
+            files.append((f'assets/file{i:03d}.txt', f'bench file {i}\n' * 50, f'Add file {i}'))
+        return files
+
+    def secrets_to_set(self):
+        secrets = super().secrets_to_set()
+        for i in range(self.extra_secrets):
+            secrets[f'BENCH_SECRET_{i:03d}'] = f'value-{i}'
+        return secrets
+
+
+def make_workspace(token='bench-token'):
+    """setup_github.txt সহ একটা temporary base_dir - প্রতিবার নতুন repo নাম, যাতে cold run সত্যিই cold হয়"""
+    base_dir = tempfile.mkdtemp(prefix='streamer-bench-')
+    repo = f'bench-{os.path.basename(base_dir)}'
+    here = os.path.dirname(os.path.abspath(__file__))
+    shutil.copy(os.path.join(here, 'streamer.py'), os.path.join(base_dir, 'streamer.py'))
+    with open(os.path.join(base_dir, 'requirements.txt'), 'w', encoding='utf-8') as f:
+        f.write('requests>=2.31.0\n')
+    with open(os.path.join(base_dir, 'setup_github.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(['bench-stream-key-0000', 'https://example.com/video.mp4', '1080p', '16:9', token, repo]))
+    return base_dir
+
+
+def bench_setup(fake, files=0, secrets=0):
+    """একটা repo: প্রথমে cold run (নতুন repo), তারপর একই workspace এ warm run"""
+    base_dir = make_workspace()
+    results = []
+    try:
+        for phase in ('cold', 'warm'):
+            fake.reset_counts()
+            setup = BenchSetup(base_dir, extra_files=files, extra_secrets=secrets)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ok = setup.run()
+            wall = time.perf_counter() - started
+            results.append({
+                'suite': 'setup',
+                'scenario': f'setup/{phase}/files={files}/secrets={secrets}',
+                'ok': ok,
+                'wall_s': round(wall, 3),
+                'requests': fake.request_count(),
+                # Older trees (sequential run) এ graph নেই - তুলনার জন্য None
+                'critical_path_s': (getattr(setup.report, 'graph', None) or {}).get('critical_path_s'),
+                'step_sum_s': (getattr(setup.report, 'graph', None) or {}).get('step_sum_s'),
+                'steps': {record['name']: record['wall_ms'] for record in setup.report.steps}
+            })
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+    return results
+
+
+# Child process এ setup - তার peak RSS এ শুধু upload path থাকে, fake server নয়
+ASSET_CHILD = '''
+import sys, io, json, contextlib, resource
+import benchmark, streamer
+streamer.GITHUB_API_URL = sys.argv[1]
+setup = benchmark.BenchSetup(sys.argv[2])
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with contextlib.redirect_stdout(io.StringIO()):
+    ok = setup.run()
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'ok': ok, 'rss_growth_kb': after - before, 'files': setup.report.files}))
+'''
+
+
+def bench_assets(fake, size_mb):
+    """size_mb এর একটা binary asset push - memory যেন file size এর সাথে না বাড়ে"""
+    base_dir = make_workspace()
+    try:
+        os.makedirs(os.path.join(base_dir, 'assets'))
+        with open(os.path.join(base_dir, 'assets', 'intro.bin'), 'wb') as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+        fake.reset_counts()
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', ASSET_CHILD, fake.url, base_dir], capture_output=True,
+                                   text=True, cwd=os.path.dirname(STREAMER_PATH), timeout=600)
+        wall = time.perf_counter() - started
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+    try:
+        data = json.loads(completed.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        print(completed.stderr[-2000:])
+        data = {'ok': False, 'rss_growth_kb': 0, 'files': []}
+    record = next((f for f in data['files'] if f['path'] == 'assets/intro.bin'), {})
+    return [{
+        'suite': 'assets',
+        'scenario': f'assets/{size_mb}MB',
+        'ok': bool(data['ok'] and record.get('ok')),
+        'wall_s': round(wall, 3),
+        'requests': fake.request_count(),
+        'method': record.get('method'),
+        'peak_rss_growth_mb': round(data['rss_growth_kb'] / 1024, 1),
+        'buffer_peak_kb': round(record.get('buffer_peak', 0) / 1024)
+    }]
+
+
+def bench_fleet(fake, repos, workers=16):
+    """N repos একসাথে `streamer.py fleet` CLI দিয়ে - setup_github.txt ছাড়া workspace এ"""
+    base_dir = make_workspace()
+    os.remove(os.path.join(base_dir, 'setup_github.txt'))
+    entries = [{'stream_key': f'key-{i}', 'video_url': 'https://example.com/video.mp4',
+                'token': f'bench-token-{i % 4}', 'repo': f'fleet-{os.path.basename(base_dir)}-{i}'} for i in range(repos)]
+    for entry in entries:
+        entry.setdefault('quality', '1080p')
+        entry.setdefault('aspect_ratio', '16:9')
+    with open(os.path.join(base_dir, 'fleet.json'), 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+    original_cwd = os.getcwd()
+    try:
+        os.chdir(base_dir)
+        fake.reset_counts()
+        args = streamer.parse_args(['fleet', 'fleet.json', '--workers', str(workers),
+                                    '--summary', os.path.join(base_dir, 'fleet_summary.json')])
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = streamer.run_fleet(args)
+        wall = time.perf_counter() - started
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(base_dir, ignore_errors=True)
+    return [{
+        'suite': 'setup',
+        'scenario': f'fleet/repos={repos}',
+        'ok': ok,
+        'wall_s': round(wall, 3),
+        'requests': fake.request_count()
+    }]
+
+
+class RtmpSink:
+    """ffmpeg -listen দিয়ে local RTMP server - যা আসে সেটা ফেলে দেয়"""
+
+    def __init__(self, port=19350):
+        self.url = f'rtmp://127.0.0.1:{port}/live/bench'
+        self.process = None
+
+    def start(self):
+        cmd = [streamer.FFMPEG_BIN, '-hide_banner', '-loglevel', 'error', '-listen', '1',
+               '-f', 'flv', '-i', self.url, '-c', 'copy', '-f', 'null', '-']
+        self.process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL)
+        time.sleep(0.5)
+        return self
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def children_cpu():
+    import resource
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def make_source(path, seconds):
+    """1080p30 test pattern + tone - সব runs এ একই source"""
+    cmd = [streamer.FFMPEG_BIN, '-hide_banner', '-loglevel', 'error', '-y',
+           '-f', 'lavfi', '-i', 'testsrc2=size=1920x1080:rate=30',
+           '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=44100',
+           '-t', str(seconds), '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+           '-c:a', 'aac', path]
+    subprocess.run(cmd, check=True)
+
+
+def bench_stream(qualities, seconds, preset, sink='file'):
+    """প্রতিটা quality তে -re ছাড়া encode: real-time factor আর CPU per media second"""
+    if not shutil.which(streamer.FFMPEG_BIN):
+        print(f"⚠️  {streamer.FFMPEG_BIN} not found - skipping stream benchmarks")
+        return []
+
+    workdir = tempfile.mkdtemp(prefix='streamer-bench-')
+    source = os.path.join(workdir, 'source.mp4')
+    results = []
+    try:
+        make_source(source, seconds)
+        probe = streamer.probe_media(source)
+        for quality in qualities:
+            rtmp = RtmpSink().start() if sink == 'rtmp' else None
+            output = rtmp.url if rtmp else os.path.join(workdir, f'sink_{quality}.flv')
+            config = streamer.StreamConfig('', source, quality=quality, output=output, preset=preset,
+                                           adaptive=False, media_cache=False, pretranscode='off',
+                                           resume=False, metrics_file=None)
+            ffmpeg = streamer.FFmpegStreamer(config)
+            # Encoder এর আসল ক্ষমতা - -re থাকলে speed 1x এ আটকে থাকে
+            cmd = [arg for arg in ffmpeg.build_command(probe) if arg not in ('-re', '-stream_loop', '-1')]
+
+            cpu_before = children_cpu()
+            started = time.perf_counter()
+            completed = subprocess.run(cmd, stdout=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+            wall = time.perf_counter() - started
+            cpu = children_cpu() - cpu_before
+            if rtmp:
+                rtmp.stop()
+
+            results.append({
+                'suite': 'stream',
+                'scenario': f'stream/{quality}/{preset}/{sink}',
+                'ok': completed.returncode == 0,
+                'wall_s': round(wall, 3),
+                'media_s': seconds,
+                'realtime_factor': round(seconds / wall, 2) if wall else None,
+                'cpu_s': round(cpu, 3),
+                'cpu_per_media_s': round(cpu / seconds, 3),
+                'output_bytes': os.path.getsize(output) if not rtmp and os.path.exists(output) else None
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def import_profile(code):
+    """python -X importtime: {module: (self_us, cumulative_us)}"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True,
+                            text=True, cwd=os.path.dirname(STREAMER_PATH), timeout=60)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def bench_startup(runs=5, seconds=5):
+    """Stream mode এর startup: import cost, third-party imports, time-to-first-frame"""
+    results = []
+    # Interpreter নিজে (site, .pth hooks) যা import করে সেটা বাদ
+    baseline = set(import_profile('pass'))
+    stdlib = getattr(sys, 'stdlib_module_names', None)
+
+    for scenario, code in (('startup/stream-imports', "import streamer; streamer.parse_args(['stream'])"),
+                           ('startup/setup-imports', "import streamer; streamer.GitHubAPI('x')")):
+        timings = []
+        for _ in range(runs):
+            modules = import_profile(code)
+            loaded = {name: times for name, times in modules.items() if name not in baseline}
+            timings.append(sum(self_us for self_us, _ in loaded.values()) / 1e6)
+        third_party = sorted({name.split('.')[0] for name in loaded
+                              if stdlib is not None and name.split('.')[0] not in stdlib
+                              and name.split('.')[0] != 'streamer'})
+        results.append({
+            'suite': 'startup',
+            'scenario': scenario,
+            # Stream mode এ stdlib এর বাইরে কিছু import হলে fail
+            'ok': not third_party or scenario != 'startup/stream-imports',
+            'wall_s': round(sorted(timings)[len(timings) // 2], 4),
+            'modules': len(loaded),
+            'third_party': third_party
+        })
+
+    if not shutil.which(streamer.FFMPEG_BIN):
+        print(f"⚠️  {streamer.FFMPEG_BIN} not found - skipping time-to-first-frame")
+        return results
+
+    workdir = tempfile.mkdtemp(prefix='streamer-bench-')
+    try:
+        source = os.path.join(workdir, 'source.mp4')
+        make_source(source, seconds)
+        timings = []
+        for i in range(runs):
+            output = os.path.join(workdir, f'first_frame_{i}.flv')
+            env = dict(os.environ, YOUTUBE_STREAM_KEY='bench', VIDEO_URL=source, STREAM_OUTPUT=output,
+                       STREAMER_CACHE_DIR=os.path.join(workdir, 'cache'), PRETRANSCODE='off',
+                       RESUME='0', METRICS_FILE='', READAHEAD='0')
+            started = time.perf_counter()
+            process = subprocess.Popen([sys.executable, STREAMER_PATH, 'stream'], env=env,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elapsed = None
+            try:
+                # FLV header + metadata এর পরে প্রথম video tag (keyframe) লেখা হলে ধরো first frame
+                while time.perf_counter() - started < 60 and process.poll() is None:
+                    if os.path.exists(output) and os.path.getsize(output) > 4096:
+                        elapsed = time.perf_counter() - started
+                        break
+                    time.sleep(0.005)
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if elapsed is not None:
+                timings.append(elapsed)
+        results.append({
+            'suite': 'startup',
+            'scenario': 'startup/first-frame',
+            'ok': len(timings) == runs,
+            'wall_s': round(sorted(timings)[len(timings) // 2], 3) if timings else None
+        })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=5, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def load_history(path):
+    history = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    history.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return history
+
+
+def key_metric(result):
+    """Regression এর জন্য যে সংখ্যাটা দেখা হয় (কম হলে ভালো)"""
+    if result['suite'] == 'stream':
+        return result['cpu_per_media_s']
+    if result['suite'] == 'assets':
+        return result['peak_rss_growth_mb']
+    return result['wall_s']
+
+
+def compare(results, history, threshold=REGRESSION_THRESHOLD):
+    """একই host এ একই scenario এর শেষ 5 runs এর median এর সাথে তুলনা"""
+    host = platform.node()
+    regressions = []
+    for result in results:
+        same = [old for old in history
+                if old.get('scenario') == result['scenario'] and old.get('latency_ms') == result.get('latency_ms')]
+        previous = [key_metric(old) for old in same if old.get('host') == host and old.get('ok')]
+        previous = sorted(previous[-5:])
+        result['baseline'] = previous[len(previous) // 2] if previous else None
+        limit = (result['baseline'] or 0) * threshold
+        limit = max(limit, (result['baseline'] or 0) + REGRESSION_SLACK.get(result['suite'], 0))
+        if result['baseline'] and result['ok'] and key_metric(result) > limit:
+            regressions.append(result)
+
+        # API calls এর সংখ্যা নির্ধারিত - বাড়লেই regression
+        request_counts = [old['requests'] for old in same if 'requests' in old]
+        if 'requests' in result and request_counts and result['requests'] > request_counts[-1]:
+            if result not in regressions:
+                regressions.append(result)
+    return regressions
+
+
+def print_results(results, regressions):
+    print("\n" + "=" * 70)
+    for result in results:
+        flag = '🔺' if result in regressions else ('✅' if result['ok'] else '❌')
+        baseline = f" (baseline {result['baseline']})" if result.get('baseline') else ''
+        if result['suite'] == 'stream':
+            print(f"  {flag} {result['scenario']}: {result['realtime_factor']}x real time, "
+                  f"{result['cpu_per_media_s']} CPU-s per media-s{baseline}")
+        elif result['suite'] == 'assets':
+            print(f"  {flag} {result['scenario']}: {result['wall_s']}s via {result['method']}, "
+                  f"peak RSS +{result['peak_rss_growth_mb']} MB, buffer {result['buffer_peak_kb']} KB{baseline}")
+        elif result['suite'] == 'startup':
+            extra = f", {result['modules']} modules" if 'modules' in result else ''
+            if result.get('third_party'):
+                extra += f", third-party: {', '.join(result['third_party'])}"
+            print(f"  {flag} {result['scenario']}: {result['wall_s']}s{extra}{baseline}")
+        else:
+            print(f"  {flag} {result['scenario']}: {result['wall_s']}s, {result['requests']} requests{baseline}")
+    print("=" * 70)
+    if regressions:
+        print(f"🔺 {len(regressions)} regression(s) vs. previous runs")
+
+
+def parse_args(argv=None):
+    import argparse
+
+    def numbers(text):
+        return [int(item) for item in text.split(',') if item.strip()]
+
+    parser = argparse.ArgumentParser(description='Streamer benchmarks (local stand-ins only)')
+    parser.add_argument('suite', nargs='?', choices=['setup', 'stream', 'startup', 'assets', 'all'], default='all')
+    parser.add_argument('--files', type=numbers, default=[0, 10, 50], help='Extra files per run, e.g. 0,10,50')
+    parser.add_argument('--secrets', type=numbers, default=[0, 16], help='Extra secrets per run')
+    parser.add_argument('--repos', type=numbers, default=[1, 8], help='Repos for the fleet benchmark')
+    parser.add_argument('--latency', type=float, default=30.0, help='Fake API latency per request (ms)')
+    parser.add_argument('--jitter', type=float, default=10.0, help='Extra random latency (ms)')
+    parser.add_argument('--rate-limit', type=int, default=5000, help='Fake API requests per window per token')
+    parser.add_argument('--asset-mb', type=int, default=90, help='Binary asset size for the upload benchmark')
+    parser.add_argument('--qualities', default='480p,720p,1080p')
+    parser.add_argument('--seconds', type=int, default=10, help='Media seconds per stream benchmark')
+    parser.add_argument('--preset', default='veryfast')
+    parser.add_argument('--sink', choices=['file', 'rtmp'], default='file')
+    parser.add_argument('--runs', type=int, default=5, help='Repetitions for startup benchmarks')
+    parser.add_argument('--results', default=RESULTS_FILE, help='JSON lines history file')
+    parser.add_argument('--no-save', action='store_true', help='Do not append to the history')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+
+    if args.suite in ('setup', 'all'):
+        fake = FakeGitHub(args.latency, args.jitter, args.rate_limit).start()
+        original_url = streamer.GITHUB_API_URL
+        streamer.GITHUB_API_URL = fake.url
+        try:
+            for files in args.files:
+                print(f"⏱️  setup: {files} extra files...")
+                results += bench_setup(fake, files=files)
+            for secrets in args.secrets:
+                if secrets == 0 and 0 in args.files:
+                    continue
+                print(f"⏱️  setup: {secrets} extra secrets...")
+                results += bench_setup(fake, secrets=secrets)
+            for repos in args.repos:
+                print(f"⏱️  fleet: {repos} repos...")
+                results += bench_fleet(fake, repos)
+        finally:
+            streamer.GITHUB_API_URL = original_url
+            fake.stop()
+        for result in results:
+            result['latency_ms'] = args.latency
+
+    if args.suite in ('assets', 'all'):
+        fake = FakeGitHub(args.latency, args.jitter, args.rate_limit).start()
+        print(f"⏱️  assets: {args.asset_mb} MB binary upload...")
+        try:
+            results += bench_assets(fake, args.asset_mb)
+        finally:
+            fake.stop()
+
+    if args.suite in ('stream', 'all'):
+        qualities = [q.strip() for q in args.qualities.split(',') if q.strip() in streamer.QUALITY_PRESETS]
+        print(f"⏱️  stream: {', '.join(qualities)}...")
+        results += bench_stream(qualities, args.seconds, args.preset, args.sink)
+
+    if args.suite in ('startup', 'all'):
+        print("⏱️  startup: imports and time-to-first-frame...")
+        results += bench_startup(args.runs)
+
+    regressions = compare(results, load_history(args.results))
+    print_results(results, regressions)
+
+    if not args.no_save and results:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        meta = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': git_commit(),
+                'host': platform.node(), 'python': platform.python_version()}
+        with open(args.results, 'a', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(dict(result, **meta)) + '\n')
+        print(f"📄 Results appended to {args.results}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,30 +6,1279 @@ GitHub YouTube Streamer - Fully Automatic Setup Tool
 """
 
 import os
+import re
 import sys
 import subprocess
 import time
 import json
-import requests
+import random
+import threading
+import contextvars
 import base64
+import hashlib
 from pathlib import Path
 
-# Import nacl only when needed
-try:
-    from nacl import encoding, public
-    NACL_AVAILABLE = True
-except ImportError:
-    NACL_AVAILABLE = False
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+CACHE_DIR = os.environ.get('STREAMER_CACHE_DIR', '.streamer_cache')
+
+# Setup-only dependencies - শুধু setup/fleet এ লাগে, stream mode এ কখনো import হয় না
+SETUP_REQUIRED = {'requests': 'requests>=2.31.0'}
+SETUP_OPTIONAL = {'nacl': 'pynacl>=1.5.0'}
+
+
+def module_available(name):
+    """Module import না করেই দেখো install করা আছে কিনা"""
+    import importlib.util
+    
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+# Endpoint এর variable অংশ বাদ দিয়ে latency counters group করো
+ENDPOINT_PATTERNS = [
+    (re.compile(r'^/repos/[^/]+/[^/]+'), '/repos/{owner}/{repo}'),
+    (re.compile(r'/contents/.+$'), '/contents/{path}'),
+    (re.compile(r'/git/refs?/heads/.+$'), '/git/refs/heads/{branch}'),
+    (re.compile(r'/git/(commits|trees|blobs)/[0-9a-f]{40}'), r'/git/\1/{sha}'),
+    (re.compile(r'/actions/secrets/[A-Z0-9_]+$'), '/actions/secrets/{name}'),
+]
+
+
+def bind_context(func):
+    """func কে এখনকার contextvars সহ pool threads এ চালানোর জন্য (প্রতি call এ আলাদা copy)"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(func, *args, **kwargs)
+
+
+class StepCancelled(BaseException):
+    """StepGraph step এর timeout বা fail-fast - পরের request এর আগেই থামো
+    
+    BaseException, যাতে steps এর ভেতরের `except Exception` এটা গিলে না ফেলে।
+    """
+
+
+# The cancel Event of the StepGraph step running in this context (None outside a graph)
+CURRENT_STEP_CANCEL = contextvars.ContextVar('current_step_cancel', default=None)
+
+
+def check_cancelled():
+    """এখনকার StepGraph step cancelled হলে StepCancelled"""
+    event = CURRENT_STEP_CANCEL.get()
+    if event is not None and event.is_set():
+        raise StepCancelled('step cancelled')
+
+
+def git_blob_sha(data):
+    """Git যেভাবে blob SHA হিসাব করে: sha1("blob <size>\\0" + data)"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+GITHUB_MAX_FILE = 100 * 1024 * 1024  # GitHub এর per-file সীমা
+BLOB_THRESHOLD = 1024 * 1024  # এর বড় text ও tree তে inline না পাঠিয়ে blob হিসেবে
+
+
+class Asset:
+    """Disk এর একটা binary file (overlay, font, audio, clip) - কখনো পুরোটা memory তে পড়া হয় না"""
+    
+    CHUNK = 3 * 256 * 1024  # 3 এর গুণিতক, তাই প্রতিটা chunk আলাদা করে base64 করলেও জোড়া ঠিক থাকে
+    
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._blob_sha = None
+    
+    def chunks(self):
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(self.CHUNK)
+                if not chunk:
+                    return
+                yield chunk
+    
+    @property
+    def blob_sha(self):
+        """git_blob_sha এর streaming version"""
+        if self._blob_sha is None:
+            digest = hashlib.sha1(b'blob %d\0' % self.size)
+            for chunk in self.chunks():
+                digest.update(chunk)
+            self._blob_sha = digest.hexdigest()
+        return self._blob_sha
+
+
+def content_blob_sha(content):
+    """Upload list এর content (text বা Asset) এর git blob SHA"""
+    if isinstance(content, Asset):
+        return content.blob_sha
+    return git_blob_sha(content.encode('utf-8'))
+
+
+def content_size(content):
+    """Upload list এর content এর bytes (characters নয়) - UTF-8 text এ এক character 4 bytes পর্যন্ত"""
+    if isinstance(content, Asset):
+        return content.size
+    return len(content.encode('utf-8'))
+
+
+class Base64Body:
+    """JSON request body যার content field chunk করে base64 হয়
+    
+    requests __len__ থেকে Content-Length বসায় আর iterator থেকে chunk করে
+    পাঠায়; retry হলে আবার শুরু থেকে iterate হয়। peak = একসাথে ধরে রাখা
+    সবচেয়ে বেশি bytes (raw chunk + encoded chunk)।
+    """
+    
+    def __init__(self, fields, source, key='content'):
+        self.source = source if isinstance(source, Asset) else bytes(source)
+        self.prefix = (json.dumps(fields)[:-1] + (', ' if fields else '') + f'"{key}": "').encode('utf-8')
+        self.suffix = b'"}'
+        self.peak = 0
+    
+    @property
+    def size(self):
+        return self.source.size if isinstance(self.source, Asset) else len(self.source)
+    
+    def __len__(self):
+        return len(self.prefix) + 4 * ((self.size + 2) // 3) + len(self.suffix)
+    
+    def __iter__(self):
+        yield self.prefix
+        if isinstance(self.source, Asset):
+            chunks = self.source.chunks()
+        else:
+            chunks = (self.source[i:i + Asset.CHUNK] for i in range(0, len(self.source), Asset.CHUNK))
+        for chunk in chunks:
+            encoded = base64.b64encode(chunk)
+            self.peak = max(self.peak, len(chunk) + len(encoded))
+            yield encoded
+        yield self.suffix
+
+
+class ResponseCache:
+    """GitHub GET responses এর on-disk cache - ETag/Last-Modified দিয়ে conditional requests
+    
+    Key = token identity + URL, তাই এক account এর cache অন্য account পায় না।
+    Size/entry limit ছাড়ালে সবচেয়ে পুরনো (least recently used) entries মুছে যায়।
+    """
+    
+    def __init__(self, directory, max_entries=1000, max_bytes=10 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+    
+    def _path(self, identity, url):
+        digest = hashlib.sha256(f'{identity}\n{url}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:40] + '.json')
+    
+    def get(self, identity, url):
+        path = self._path(identity, url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # LRU এর জন্য
+            return entry
+        except (OSError, ValueError):
+            return None
+    
+    def put(self, identity, url, response):
+        entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'body': response.text,
+            'stored_at': time.time()
+        }
+        path = self._path(identity, url)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict()
+    
+    def invalidate(self, identity=None, url=None):
+        """একটা URL এর entry, অথবা (কিছু না দিলে) পুরো cache মুছে ফেলো"""
+        if url is not None:
+            paths = [self._path(identity, url)]
+        else:
+            try:
+                paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+            except OSError:
+                return 0
+        
+        removed = 0
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+    
+    def _evict(self):
+        with self.lock:
+            try:
+                entries = []
+                for name in os.listdir(self.directory):
+                    if name.endswith('.json'):
+                        stat = os.stat(os.path.join(self.directory, name))
+                        entries.append((stat.st_mtime, stat.st_size, name))
+            except OSError:
+                return
+            
+            total = sum(size for _, size, _ in entries)
+            entries.sort()
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                _, size, name = entries.pop(0)
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                total -= size
+
+
+class GitHubAPI:
+    """GitHub API transport - pooled keep-alive connections, retries, rate-limit pacing"""
+    
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # 5xx বা read timeout এর পর POST হয়তো server এ apply হয়ে গেছে - আবার পাঠালে duplicate
+    IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'PATCH', 'DELETE'}
+    
+    def __init__(self, token, base_url=None, max_retries=4, backoff=0.5, max_backoff=30.0,
+                 pool_size=10, min_remaining=100, cache_dir=None):
+        self.token = token
+        self.base_url = (base_url or GITHUB_API_URL).rstrip('/')
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.min_remaining = min_remaining
+        
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.session = requests.Session()
+        self.transport_errors = (requests.ConnectionError, requests.Timeout)
+        self.ambiguous_errors = (requests.ReadTimeout,)
+        self.session.headers.update({
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': 'github-youtube-streamer'
+        })
+        self.adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        
+        # Rate-limit state (X-RateLimit-* headers থেকে)
+        self.lock = threading.Lock()
+        self.rate_limit = None
+        self.rate_remaining = None
+        self.rate_reset = None
+        self.blocked_until = 0.0
+        
+        # endpoint -> counters
+        self.stats = {}
+        
+        # প্রতিটা attempt এর event পাবে (SetupReport)
+        self.listeners = []
+        
+        # Conditional GET cache - 304 rate limit এ গোনা হয় না, body ও আসে না
+        self.cache = ResponseCache(cache_dir or os.path.join(CACHE_DIR, 'http'))
+        self.identity = hashlib.sha256(f'{self.base_url}\n{token}'.encode('utf-8')).hexdigest()[:16]
+    
+    def url(self, path):
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return self.base_url + path
+    
+    @staticmethod
+    def endpoint_name(method, path):
+        path = path.split('?', 1)[0]
+        if '://' in path:
+            path = '/' + path.split('://', 1)[1].split('/', 1)[-1]
+        for pattern, replacement in ENDPOINT_PATTERNS:
+            path = pattern.sub(replacement, path)
+        return f'{method} {path}'
+    
+    def _pace(self):
+        """Limit এ পৌঁছানোর আগেই ধীরে চলো"""
+        with self.lock:
+            now = time.time()
+            delay = max(0.0, self.blocked_until - now)
+            if self.rate_remaining is not None and self.rate_reset:
+                window = max(0.0, self.rate_reset - now)
+                if self.rate_remaining <= 0:
+                    delay = max(delay, window)
+                elif self.rate_remaining < self.min_remaining:
+                    # বাকি calls গুলো reset পর্যন্ত সমান ভাবে ছড়িয়ে দাও
+                    delay = max(delay, window / self.rate_remaining)
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _update_rate_limit(self, response):
+        headers = response.headers
+        with self.lock:
+            try:
+                if 'X-RateLimit-Remaining' in headers:
+                    self.rate_remaining = int(headers['X-RateLimit-Remaining'])
+                if 'X-RateLimit-Limit' in headers:
+                    self.rate_limit = int(headers['X-RateLimit-Limit'])
+                if 'X-RateLimit-Reset' in headers:
+                    self.rate_reset = float(headers['X-RateLimit-Reset'])
+            except ValueError:
+                pass
+            retry_after = headers.get('Retry-After')
+            if retry_after:
+                try:
+                    self.blocked_until = max(self.blocked_until, time.time() + float(retry_after))
+                except ValueError:
+                    pass
+    
+    def _should_retry(self, method, response):
+        if response.status_code == 429:
+            return True
+        if response.status_code in self.RETRY_STATUSES:
+            return method in self.IDEMPOTENT_METHODS
+        # Secondary rate limit: 403 + Retry-After অথবা remaining=0
+        if response.status_code == 403:
+            return ('Retry-After' in response.headers
+                    or response.headers.get('X-RateLimit-Remaining') == '0')
+        return False
+    
+    def _sleep_backoff(self, attempt):
+        # Full jitter exponential backoff
+        cap = min(self.max_backoff, self.backoff * (2 ** attempt))
+        time.sleep(random.uniform(0, cap))
+    
+    def _record(self, endpoint, elapsed, status=None, retried=False, failed=False):
+        with self.lock:
+            stat = self.stats.setdefault(endpoint, {
+                'calls': 0, 'retries': 0, 'errors': 0, 'not_modified': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            stat['calls'] += 1
+            if status == 304:
+                stat['not_modified'] += 1
+            stat['total_ms'] += elapsed * 1000
+            stat['max_ms'] = max(stat['max_ms'], elapsed * 1000)
+            if retried:
+                stat['retries'] += 1
+            if failed or (status is not None and status >= 500):
+                stat['errors'] += 1
+    
+    def _emit(self, method, endpoint, started, elapsed, attempt, response=None):
+        if not self.listeners:
+            return
+        body = response.request.body if response is not None and response.request is not None else None
+        event = {
+            'method': method,
+            'endpoint': endpoint,
+            'status': response.status_code if response is not None else None,
+            'attempt': attempt,
+            'start': started,
+            'duration_ms': round(elapsed * 1000, 1),
+            'sent': len(body) if body else 0,
+            'received': len(response.content) if response is not None else 0,
+            'rate_remaining': self.rate_remaining
+        }
+        for listener in self.listeners:
+            listener(event)
+    
+    def _from_cache(self, entry, response):
+        """304 এর জায়গায় cached body দিয়ে একটা 200 response বানাও"""
+        import requests
+        
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = entry['body'].encode('utf-8')
+        cached.encoding = 'utf-8'
+        cached.headers.update(response.headers)
+        if entry.get('content_type'):
+            cached.headers['Content-Type'] = entry['content_type']
+        cached.url = response.url
+        cached.request = response.request
+        cached.from_cache = True
+        return cached
+    
+    def request(self, method, path, timeout=15, **kwargs):
+        """Retry আর pacing সহ একটা API call করো"""
+        url = self.url(path)
+        endpoint = self.endpoint_name(method, path)
+        
+        entry = None
+        if method == 'GET':
+            entry = self.cache.get(self.identity, url)
+            if entry:
+                headers = dict(kwargs.pop('headers', None) or {})
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+                kwargs['headers'] = headers
+        
+        for attempt in range(self.max_retries + 1):
+            # A timed-out or cancelled setup step must not send anything more
+            check_cancelled()
+            self._pace()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except self.transport_errors as e:
+                self._record(endpoint, time.perf_counter() - started, retried=attempt > 0, failed=True)
+                self._emit(method, endpoint, started, time.perf_counter() - started, attempt)
+                if attempt >= self.max_retries or (method not in self.IDEMPOTENT_METHODS
+                                                   and isinstance(e, self.ambiguous_errors)):
+                    raise
+                self._sleep_backoff(attempt)
+                continue
+            
+            elapsed = time.perf_counter() - started
+            self._record(endpoint, elapsed, response.status_code, retried=attempt > 0)
+            self._update_rate_limit(response)
+            self._emit(method, endpoint, started, elapsed, attempt, response)
+            
+            if attempt < self.max_retries and self._should_retry(method, response):
+                # Retry-After থাকলে _pace() নিজেই অপেক্ষা করবে
+                if 'Retry-After' not in response.headers:
+                    self._sleep_backoff(attempt)
+                continue
+            
+            if method == 'GET':
+                if response.status_code == 304 and entry:
+                    return self._from_cache(entry, response)
+                if response.status_code == 200 and ('ETag' in response.headers
+                                                    or 'Last-Modified' in response.headers):
+                    self.cache.put(self.identity, url, response)
+            elif response.status_code < 300:
+                # Write হলে একই URL এর cached read আর valid নয়
+                self.cache.invalidate(self.identity, url)
+            return response
+    
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+    
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+    
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+    
+    def patch(self, path, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+    
+    def connections_opened(self):
+        """Pool এ এখন পর্যন্ত কয়টা TCP connection খোলা হয়েছে"""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+    
+    def summary(self):
+        endpoints = {}
+        for endpoint, stat in sorted(self.stats.items()):
+            endpoints[endpoint] = {
+                'calls': stat['calls'],
+                'retries': stat['retries'],
+                'errors': stat['errors'],
+                'not_modified': stat['not_modified'],
+                'avg_ms': round(stat['total_ms'] / max(stat['calls'], 1), 1),
+                'max_ms': round(stat['max_ms'], 1),
+                'total_ms': round(stat['total_ms'], 1)
+            }
+        return {
+            'calls': sum(stat['calls'] for stat in self.stats.values()),
+            'not_modified': sum(stat['not_modified'] for stat in self.stats.values()),
+            'connections': self.connections_opened(),
+            'rate_limit': self.rate_limit,
+            'rate_remaining': self.rate_remaining,
+            'endpoints': endpoints
+        }
+    
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n📊 API: {summary['calls']} calls ({summary['not_modified']} not modified) "
+              f"over {summary['connections']} connection(s)")
+        for endpoint, stat in summary['endpoints'].items():
+            print(f"  {endpoint}: {stat['calls']} calls, avg {stat['avg_ms']}ms, max {stat['max_ms']}ms")
+
+
+class SecretsProvisioner:
+    """Parallel secrets engine - cached repo public keys, one SealedBox per key_id"""
+    
+    def __init__(self, api, max_workers=8, cache_file=None):
+        self.api = api
+        self.max_workers = max_workers
+        self.cache_file = cache_file or os.path.join(CACHE_DIR, 'public_keys.json')
+        self.lock = threading.Lock()
+        self.keys = self._load_cache()
+        self.repo_locks = {}
+        self.boxes = {}
+    
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cache(self, repo):
+        """এই repo এর key file এ লেখো
+        
+        Fleet এ প্রতিটা account এর নিজের provisioner একই file এ লেখে, তাই flock
+        এর ভেতরে file পড়ে merge করো, আর প্রতিবার নিজস্ব tmp file।
+        """
+        import fcntl
+        import tempfile
+        
+        directory = os.path.dirname(self.cache_file) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(self.cache_file + '.lock', 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    keys = self._load_cache()
+                    keys[repo] = self.keys[repo]
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp',
+                                                    prefix=os.path.basename(self.cache_file) + '.')
+                    try:
+                        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                            json.dump(keys, f, indent=2)
+                        os.replace(tmp_path, self.cache_file)
+                    except OSError:
+                        os.unlink(tmp_path)
+                        raise
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+        except OSError:
+            pass
+    
+    def public_key(self, repo, stale_key_id=None):
+        """Repo এর (key_id, key) - cache থেকে, না থাকলে (বা stale হলে) API থেকে"""
+        with self.lock:
+            repo_lock = self.repo_locks.setdefault(repo, threading.Lock())
+        
+        # একই repo এর জন্য একবারই fetch হবে, বাকি threads cache পাবে
+        with repo_lock:
+            with self.lock:
+                cached = self.keys.get(repo)
+            if cached and cached['key_id'] != stale_key_id:
+                return cached['key_id'], cached['key']
+            
+            response = self.api.get(f'/repos/{repo}/actions/secrets/public-key', timeout=10)
+            if response.status_code != 200:
+                raise RuntimeError(f'public key status {response.status_code}')
+            key_data = response.json()
+            with self.lock:
+                self.keys[repo] = {'key_id': key_data['key_id'], 'key': key_data['key']}
+                self._save_cache(repo)
+            return key_data['key_id'], key_data['key']
+    
+    def sealed_box(self, key_id, public_key):
+        with self.lock:
+            box = self.boxes.get((key_id, public_key))
+            if box is None:
+                from nacl import public as nacl_public
+                box = nacl_public.SealedBox(nacl_public.PublicKey(base64.b64decode(public_key)))
+                self.boxes[(key_id, public_key)] = box
+        return box
+    
+    def encrypt(self, key_id, public_key, secret_value):
+        encrypted = self.sealed_box(key_id, public_key).encrypt(secret_value.encode('utf-8'))
+        return base64.b64encode(encrypted).decode('utf-8')
+    
+    def _put_secret(self, repo, name, value):
+        started = time.perf_counter()
+        result = {'repo': repo, 'name': name, 'ok': False, 'status': None, 'error': None}
+        try:
+            key_id, key = self.public_key(repo)
+            for attempt in range(2):
+                data = {'encrypted_value': self.encrypt(key_id, key, value), 'key_id': key_id}
+                response = self.api.put(f'/repos/{repo}/actions/secrets/{name}', json=data, timeout=10)
+                result['status'] = response.status_code
+                if response.status_code in [201, 204]:
+                    result['ok'] = True
+                    break
+                # Cached key পুরনো হলে (server rotate করেছে) একবার নতুন key দিয়ে চেষ্টা করো
+                if attempt == 0 and response.status_code in [400, 422]:
+                    new_key_id, key = self.public_key(repo, stale_key_id=key_id)
+                    if new_key_id != key_id:
+                        key_id = new_key_id
+                        continue
+                break
+        except Exception as e:
+            result['error'] = str(e)
+        result['ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+    
+    def provision(self, jobs):
+        """jobs: [(owner/repo, {name: value})] - সব secrets একসাথে set করো"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        repos = list(dict.fromkeys(repo for repo, _ in jobs))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Cold cache হলে keys আগে parallel এ আনো
+            missing = [repo for repo in repos if repo not in self.keys]
+            key_errors = dict(zip(missing, pool.map(bind_context(self._prefetch_key), missing)))
+            
+            futures = []
+            for repo, secrets in jobs:
+                for name, value in secrets.items():
+                    if key_errors.get(repo):
+                        futures.append({'repo': repo, 'name': name, 'ok': False,
+                                        'status': None, 'error': key_errors[repo], 'ms': 0.0})
+                    else:
+                        futures.append(pool.submit(bind_context(self._put_secret), repo, name, value))
+            return [f if isinstance(f, dict) else f.result() for f in futures]
+    
+    def _prefetch_key(self, repo):
+        try:
+            self.public_key(repo)
+            return None
+        except Exception as e:
+            return str(e)
+    
+    def set_secrets(self, repo, secrets):
+        return self.provision([(repo, secrets)])
+
+
+class StepGraph:
+    """Steps এর dependency graph (DAG) - যাদের dependencies শেষ, তারা একসাথে চলে
+    
+    প্রতিটা step নিজের thread এ, timeout পার হলে সেটা failed ধরা হয় আর তার
+    cancel event set হয়: step এর পরের GitHubAPI request (বা check_cancelled)
+    StepCancelled তোলে, তাই আর কোনো write যায় না। যে request ইতিমধ্যে চলছে
+    সেটা শেষ হয় - cancellation best-effort। Required step fail করলে তার
+    dependents skipped; fail_fast হলে বাকি সব pending step cancelled আর চলমান
+    steps এর cancel event set। required=False step fail করলেও
+    dependents চলে। group limits দিয়ে একই account এর in-flight steps সীমিত।
+    """
+    
+    def __init__(self, max_workers=8, fail_fast=True, limits=None):
+        self.max_workers = max_workers
+        self.fail_fast = fail_fast
+        self.limits = limits or {}
+        self.steps = {}
+        self.status = {}
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.cancel_events = {}
+    
+    def add(self, name, func, after=(), timeout=None, required=True, group=None):
+        if name in self.steps:
+            raise ValueError(f'duplicate step {name!r}')
+        self.steps[name] = {'func': func, 'after': list(after), 'timeout': timeout,
+                            'required': required, 'group': group}
+        return name
+    
+    def validate(self):
+        """Unknown dependency বা cycle থাকলে ValueError"""
+        for name, step in self.steps.items():
+            for dep in step['after']:
+                if dep not in self.steps:
+                    raise ValueError(f'step {name!r} depends on unknown step {dep!r}')
+        visiting, visited = set(), set()
+        
+        def visit(name, path):
+            if name in visiting:
+                raise ValueError('dependency cycle: ' + ' -> '.join(path + [name]))
+            if name not in visited:
+                visiting.add(name)
+                for dep in self.steps[name]['after']:
+                    visit(dep, path + [name])
+                visiting.discard(name)
+                visited.add(name)
+        
+        for name in self.steps:
+            visit(name, [])
+    
+    def _blocked(self, name):
+        """Dependency ব্যর্থ (required) বা skipped হলে True, এখনো চলছে হলে None"""
+        for dep in self.steps[name]['after']:
+            status = self.status.get(dep)
+            if status in (None, 'running'):
+                return None
+            if status != 'ok' and (self.steps[dep]['required'] or status in ('skipped', 'cancelled')):
+                return True
+        return False
+    
+    def _execute(self, name, done, cancel):
+        result, error = None, None
+        CURRENT_STEP_CANCEL.set(cancel)
+        try:
+            result = self.steps[name]['func']()
+            status = 'ok' if result else 'failed'
+        except StepCancelled as e:
+            status, error = 'cancelled', e
+        except Exception as e:
+            status, error = 'error', e
+        done.put((name, status, result, error, time.perf_counter()))
+    
+    def run(self):
+        """সব steps চালাও - {name: 'ok'|'failed'|'error'|'timeout'|'skipped'|'cancelled'}"""
+        import queue
+        
+        self.validate()
+        done = queue.Queue()
+        pending = list(self.steps)
+        running = {}
+        started = time.perf_counter()
+        
+        while pending or running:
+            for name in list(pending):
+                blocked = self._blocked(name)
+                if blocked:
+                    pending.remove(name)
+                    self.status[name] = 'skipped'
+                    continue
+                step = self.steps[name]
+                busy = sum(1 for other in running if self.steps[other]['group'] == step['group'])
+                if (blocked is None or len(running) >= self.max_workers
+                        or (step['group'] in self.limits and busy >= self.limits[step['group']])):
+                    continue
+                pending.remove(name)
+                self.status[name] = 'running'
+                now = time.perf_counter()
+                running[name] = now + step['timeout'] if step['timeout'] else None
+                self.timings[name] = [now - started, None]
+                self.cancel_events[name] = threading.Event()
+                # Run the step with the current context (SetupReport's step stack)
+                thread = threading.Thread(target=contextvars.copy_context().run,
+                                          args=(self._execute, name, done, self.cancel_events[name]),
+                                          daemon=True)
+                thread.start()
+            
+            if not running:
+                break
+            deadlines = [deadline for deadline in running.values() if deadline]
+            wait = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+            
+            finished = []
+            try:
+                finished.append(done.get(timeout=wait))
+                while True:
+                    finished.append(done.get_nowait())
+            except queue.Empty:
+                pass
+            now = time.perf_counter()
+            for name, deadline in list(running.items()):
+                if deadline and now >= deadline and not any(item[0] == name for item in finished):
+                    self.cancel_events[name].set()
+                    finished.append((name, 'timeout', None, TimeoutError(f'{name} timed out'), now))
+            
+            for name, status, result, error, ended in finished:
+                if name not in running:
+                    continue  # A thread that finished after its timeout
+                del running[name]
+                self.status[name] = status
+                self.results[name] = result
+                self.timings[name][1] = ended - started
+                if error is not None:
+                    self.errors[name] = error
+                if status != 'ok' and self.steps[name]['required'] and self.fail_fast:
+                    for other in running:
+                        self.cancel_events[other].set()
+                    for other in pending:
+                        self.status[other] = 'cancelled'
+                    pending = []
+        return dict(self.status)
+    
+    def duration(self, name):
+        start, end = self.timings.get(name, (None, None))
+        return end - start if start is not None and end is not None else 0.0
+    
+    def critical_path(self):
+        """সবচেয়ে লম্বা dependency chain - (seconds, [names])"""
+        best = {}
+        
+        def longest(name):
+            if name not in best:
+                chains = [longest(dep) for dep in self.steps[name]['after']]
+                seconds, path = max(chains, default=(0.0, []))
+                best[name] = (seconds + self.duration(name), path + [name])
+            return best[name]
+        
+        return max((longest(name) for name in self.steps), default=(0.0, []))
+    
+    def summary(self):
+        seconds, path = self.critical_path()
+        return {
+            'critical_path_s': round(seconds, 3),
+            'critical_path': path,
+            'step_sum_s': round(sum(self.duration(name) for name in self.steps), 3),
+            'steps': {name: {'status': self.status.get(name), 'seconds': round(self.duration(name), 3)}
+                      for name in self.steps}
+        }
+
+
+class SetupReport:
+    """GitHubAutoSetup.run এর প্রতিটা step এর সময় আর API হিসাব
+    
+    GitHubAPI এর listener হিসেবে প্রতিটা HTTP call যে step চলছে তাতে গোনা হয়:
+    calls, bytes, status codes, rate-limit budget (304 গোনা হয় না)। trace হলে
+    প্রতিটা call এর span ও থাকে। শেষে সব এক JSON file এ।
+    """
+    
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.started = time.perf_counter()
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.lock = threading.Lock()
+        # Step stack context এ - StepGraph আর bind_context করা pools এ সঠিক step পায়
+        self.stack = contextvars.ContextVar(f'setup_steps_{id(self)}', default=())
+        self.steps = []
+        self.spans = []
+        self.files = []
+        self.ok = None
+        self.wall_ms = None
+        self.graph = None
+        self.other = self._new_record('(outside steps)', None)
+    
+    @staticmethod
+    def _new_record(name, parent):
+        return {'name': name, 'parent': parent, 'ok': None, 'wall_ms': None,
+                'calls': 0, 'bytes_sent': 0, 'bytes_received': 0, 'statuses': {},
+                'rate_used': 0, 'rate_remaining': None, 'waits': {}}
+    
+    def _current(self):
+        stack = self.stack.get()
+        if stack:
+            return stack[-1]
+        # Context ছাড়া worker threads - শেষ শুরু হওয়া খোলা step এ গোনো
+        for record in reversed(self.steps):
+            if record['wall_ms'] is None:
+                return record
+        return self.other
+    
+    def step(self, name, func, *args, **kwargs):
+        """func চালাও আর সেটাকে একটা step হিসেবে মাপো - func এর result ফেরত দাও"""
+        stack = self.stack.get()
+        record = self._new_record(name, stack[-1]['name'] if stack else None)
+        with self.lock:
+            self.steps.append(record)
+        token = self.stack.set(stack + (record,))
+        started = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            self.stack.reset(token)
+            record['wall_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            record['ok'] = bool(result.get('repo') if isinstance(result, dict) else result)
+    
+    def wait(self, name, seconds):
+        """Polling / sleep এ কতক্ষণ গেল"""
+        record = self._current()
+        with self.lock:
+            record['waits'][name] = round(record['waits'].get(name, 0.0) + seconds, 3)
+    
+    def file(self, path, size, method, seconds, buffer_peak, traced_peak=None, ok=True):
+        """একটা file upload - upload path এ কত memory লাগলো"""
+        with self.lock:
+            self.files.append({'path': path, 'bytes': size, 'method': method, 'ok': ok,
+                               'seconds': round(seconds, 3), 'buffer_peak': buffer_peak,
+                               'traced_peak': traced_peak, 'step': self._current()['name']})
+    
+    def on_request(self, event):
+        """GitHubAPI listener - প্রতিটা attempt এ একবার"""
+        record = self._current()
+        with self.lock:
+            record['calls'] += 1
+            record['bytes_sent'] += event['sent']
+            record['bytes_received'] += event['received']
+            status = str(event['status'] or 'error')
+            record['statuses'][status] = record['statuses'].get(status, 0) + 1
+            if event['status'] not in (None, 304):
+                record['rate_used'] += 1
+            if event['rate_remaining'] is not None:
+                record['rate_remaining'] = event['rate_remaining']
+            if self.trace:
+                self.spans.append(dict(event, step=record['name'],
+                                       start_ms=round((event['start'] - self.started) * 1000, 1)))
+                del self.spans[-1]['start']
+    
+    def finish(self, ok):
+        self.ok = ok
+        self.wall_ms = round((time.perf_counter() - self.started) * 1000, 1)
+    
+    def totals(self):
+        # প্রতিটা call ঠিক একটা (সবচেয়ে ভেতরের) step এ গোনা - তাই সব records যোগ করলেই মোট
+        records = self.steps + [self.other]
+        totals = {'calls': 0, 'bytes_sent': 0, 'bytes_received': 0, 'rate_used': 0, 'statuses': {}}
+        for record in records:
+            for key in ('calls', 'bytes_sent', 'bytes_received', 'rate_used'):
+                totals[key] += record[key]
+            for status, count in record['statuses'].items():
+                totals['statuses'][status] = totals['statuses'].get(status, 0) + count
+        return totals
+    
+    def to_dict(self, api=None):
+        report = {
+            'started_at': self.started_at,
+            'ok': self.ok,
+            'wall_ms': self.wall_ms,
+            'steps': self.steps + ([self.other] if self.other['calls'] else []),
+            'totals': self.totals()
+        }
+        if self.graph is not None:
+            report['graph'] = self.graph
+        if self.files:
+            report['files'] = self.files
+        if api is not None:
+            report['api'] = api.summary()
+        if self.trace:
+            report['spans'] = self.spans
+        return report
+    
+    def write(self, path, api=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(api), f, indent=2)
+        return path
+    
+    def print_summary(self):
+        print("\n⏱️  Setup steps:")
+        for record in self.steps:
+            indent = '    ' if record['parent'] else '  '
+            waits = ', '.join(f'{name} {seconds:.1f}s' for name, seconds in record['waits'].items())
+            print(f"{indent}{'✅' if record['ok'] else '❌'} {record['name']}: {record['wall_ms']:.0f}ms, "
+                  f"{record['calls']} calls, {(record['bytes_sent'] + record['bytes_received']) / 1024:.1f} KB"
+                  f"{f', waited {waits}' if waits else ''}")
+        for record in self.files:
+            traced = f", traced {record['traced_peak'] / 1024:.0f} KB" if record['traced_peak'] is not None else ''
+            print(f"    {'📦' if record['ok'] else '❌'} {record['path']}: {record['bytes'] / 1048576:.1f} MB "
+                  f"via {record['method']} in {record['seconds']:.1f}s, "
+                  f"buffer peak {record['buffer_peak'] / 1024:.0f} KB{traced}")
+
+
+# Static build to use when FFMPEG_STATIC_SHA256 is set - pin both to one versioned release
+FFMPEG_STATIC_URL = ('https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/'
+                     'ffmpeg-n7.1-latest-linux64-gpl-7.1.tar.xz')
+
+# Workflow এর যে অংশগুলো validate_workflow check করে
+WORKFLOW_SCHEMA = {
+    'type': dict, 'required': ['name', 'on', 'jobs'],
+    'keys': {
+        'name': {'type': str},
+        'on': {'type': dict, 'keys': {
+            'schedule': {'type': list, 'items': {'type': dict, 'required': ['cron'],
+                                                 'keys': {'cron': {'type': str}}}},
+            'workflow_dispatch': {'type': (dict, type(None))},
+            'push': {'type': dict, 'keys': {'branches': {'type': list, 'items': {'type': str}}}}
+        }},
+        'env': {'type': dict},
+        'concurrency': {'type': dict, 'required': ['group'],
+                        'keys': {'group': {'type': str}, 'cancel-in-progress': {'type': bool}}},
+        'jobs': {'type': dict, 'values': {
+            'type': dict, 'required': ['runs-on', 'steps'],
+            'keys': {
+                'runs-on': {'type': str},
+                'timeout-minutes': {'type': int, 'min': 1, 'max': 360},
+                'env': {'type': dict},
+                'steps': {'type': list, 'items': {
+                    'type': dict,
+                    'keys': {name: {'type': str} for name in ('name', 'id', 'if', 'uses', 'run', 'shell')}
+                    | {'with': {'type': dict}, 'env': {'type': dict}}
+                }}
+            }
+        }}
+    }
+}
+
+
+def check_schema(value, schema, path='$', errors=None):
+    """ছোট schema checker: type, required, allowed keys, items, min/max"""
+    errors = [] if errors is None else errors
+    if not isinstance(value, schema['type']) or (isinstance(value, bool) and schema['type'] is int):
+        errors.append(f'{path}: expected {getattr(schema["type"], "__name__", schema["type"])}')
+        return errors
+    if 'min' in schema and value < schema['min'] or 'max' in schema and value > schema['max']:
+        errors.append(f'{path}: {value} outside {schema.get("min")}..{schema.get("max")}')
+    if isinstance(value, dict):
+        for key in schema.get('required', []):
+            if key not in value:
+                errors.append(f'{path}: missing {key!r}')
+        for key, item in value.items():
+            if 'keys' in schema and key not in schema['keys']:
+                errors.append(f'{path}: unknown key {key!r}')
+            elif 'keys' in schema:
+                check_schema(item, schema['keys'][key], f'{path}.{key}', errors)
+            elif 'values' in schema:
+                check_schema(item, schema['values'], f'{path}.{key}', errors)
+    if isinstance(value, list) and 'items' in schema:
+        for i, item in enumerate(value):
+            check_schema(item, schema['items'], f'{path}[{i}]', errors)
+    return errors
+
+
+def validate_workflow(doc):
+    """Schema + GitHub Actions এর নিয়ম যা schema দিয়ে ধরা যায় না - errors এর list"""
+    errors = check_schema(doc, WORKFLOW_SCHEMA)
+    if errors:
+        return errors
+    
+    for i, entry in enumerate(doc['on'].get('schedule', [])):
+        fields = entry['cron'].split()
+        if len(fields) != 5 or not all(re.fullmatch(r'[0-9*/,-]+', field) for field in fields):
+            errors.append(f'$.on.schedule[{i}].cron: invalid cron {entry["cron"]!r}')
+    
+    for job_name, job in doc['jobs'].items():
+        ids = set()
+        for i, step in enumerate(job['steps']):
+            where = f'$.jobs.{job_name}.steps[{i}]'
+            if ('uses' in step) == ('run' in step):
+                errors.append(f'{where}: needs exactly one of uses/run')
+            if 'uses' in step and not re.fullmatch(r'[\w.-]+/[\w./-]+@[\w.-]+', step['uses']):
+                errors.append(f'{where}.uses: invalid action reference {step["uses"]!r}')
+            if 'with' in step and 'uses' not in step:
+                errors.append(f'{where}: with requires uses')
+            for field in ('with', 'env'):
+                for key, value in step.get(field, {}).items():
+                    if not isinstance(value, (str, int, bool)):
+                        errors.append(f'{where}.{field}.{key}: must be a scalar')
+            if step.get('uses', '').startswith('actions/cache'):
+                key = step['with'].get('key', '')
+                if not key or ',' in key or len(key) > 512:
+                    errors.append(f'{where}.with.key: cache keys must be 1-512 chars without commas')
+                if not step['with'].get('path'):
+                    errors.append(f'{where}.with.path: required for actions/cache')
+            
+            # steps.<id> reference শুধু আগের steps এর id তে করা যায়
+            text = '\n'.join(str(item) for field in step.values()
+                              for item in (field.values() if isinstance(field, dict) else [field]))
+            if text.count('${{') != text.count('}}'):
+                errors.append(f'{where}: unbalanced ${{{{ }}}} expression')
+            for ref in re.findall(r'steps\.([\w-]+)\.', text):
+                if ref not in ids:
+                    errors.append(f'{where}: references unknown or later step {ref!r}')
+            if 'id' in step:
+                if step['id'] in ids:
+                    errors.append(f'{where}.id: duplicate {step["id"]!r}')
+                ids.add(step['id'])
+    return errors
+
+
+def to_yaml(value, indent=0):
+    """Workflow dict থেকে YAML - শুধু এই generator এর দরকারি অংশটুকু"""
+    pad = ' ' * indent
+    
+    def scalar(item):
+        if isinstance(item, bool):
+            return 'true' if item else 'false'
+        if item is None:
+            return ''
+        if isinstance(item, int):
+            return str(item)
+        if (re.fullmatch(r'[A-Za-z_][\w ./@-]*', item) and item == item.strip()
+                and item.lower() not in ('true', 'false', 'yes', 'no', 'on', 'off', 'null')):
+            return item
+        # JSON string YAML এর valid double-quoted scalar
+        return json.dumps(item, ensure_ascii=False)
+    
+    lines = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, str) and '\n' in item:
+                lines.append(f'{pad}{key}: |')
+                lines += [f'{pad}  {line}' if line else '' for line in item.rstrip('\n').split('\n')]
+            elif isinstance(item, (dict, list)) and item:
+                lines.append(f'{pad}{key}:')
+                lines.append(to_yaml(item, indent + 2))
+            elif isinstance(item, (dict, list)):
+                lines.append(f'{pad}{key}: {"{}" if isinstance(item, dict) else "[]"}')
+            else:
+                lines.append(f'{pad}{key}: {scalar(item)}'.rstrip())
+    else:
+        for item in value:
+            if isinstance(item, dict):
+                first, *rest = to_yaml(item, indent + 2).split('\n')
+                lines.append(f'{pad}- {first.lstrip()}')
+                lines += rest
+            else:
+                lines.append(f'{pad}- {scalar(item)}')
+    return '\n'.join(lines)
+
+
+class WorkflowGenerator:
+    """Settings থেকে .github/workflows/youtube-live.yml বানাও
+    
+    প্রতি scheduled run এ apt-get/pip এর বদলে: static ffmpeg build cache
+    (key = checksum সহ hash; checksum ছাড়া static build নয়, apt), stream mode stdlib-only তাই কোনো pip step
+    নেই, আর media/pre-transcode cache যার key = settings hash + directory
+    manifest hash - content বদলালেই শুধু নতুন করে save হয়।
+    
+    দুটো cron আর push একই সাথে চলতে পারে। lease_url (LEASE_URL) দেওয়া থাকলে
+    সেটা stream step এ যায় আর runs StreamLease দিয়ে handoff করে; না থাকলে
+    (setup এর default) workflow level concurrency group একসাথে একটাই run চালায়।
+    """
+    
+    PATH = '.github/workflows/youtube-live.yml'
+    SCHEDULE = ['0 */5 * * *', '30 */5 * * *']
+    
+    def __init__(self, schedule=None, timeout_minutes=330, branch='main', ffmpeg_url=None,
+                 ffmpeg_sha256=None, env=None, lease_url=None):
+        self.schedule = schedule or self.SCHEDULE
+        self.timeout_minutes = timeout_minutes
+        self.branch = branch
+        self.ffmpeg_url = ffmpeg_url or FFMPEG_STATIC_URL
+        self.ffmpeg_sha256 = ffmpeg_sha256.strip().lower() if ffmpeg_sha256 else None
+        if ffmpeg_url and not self.ffmpeg_sha256:
+            print("⚠️ FFMPEG_STATIC_URL without FFMPEG_STATIC_SHA256 - workflow will install ffmpeg via apt")
+        self.env = env or {}
+        self.lease_url = lease_url
+    
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        schedule = [cron.strip() for cron in env.get('WORKFLOW_SCHEDULE', '').split(';') if cron.strip()]
+        return cls(schedule=schedule or None,
+                   timeout_minutes=int(env.get('WORKFLOW_TIMEOUT', '330')),
+                   ffmpeg_url=env.get('FFMPEG_STATIC_URL') or None,
+                   ffmpeg_sha256=env.get('FFMPEG_STATIC_SHA256') or None,
+                   lease_url=env.get('LEASE_URL') or None)
+    
+    @property
+    def ffmpeg_key(self):
+        """Static build এর cache key - checksum না থাকলে None (cache step বাদ)"""
+        # A moving URL (e.g. a "latest" release) keeps its name when the build
+        # changes, so only a pinned checksum identifies what the cache holds
+        if not self.ffmpeg_sha256:
+            return None
+        build = f'{self.ffmpeg_url}\n{self.ffmpeg_sha256}'
+        return f'ffmpeg-static-{hashlib.sha256(build.encode("utf-8")).hexdigest()[:16]}'
+    
+    def install_ffmpeg_script(self):
+        if not self.ffmpeg_sha256:
+            return 'sudo apt-get update -qq && sudo apt-get install -y --no-install-recommends ffmpeg\n'
+        return f"""dir="$HOME/.cache/ffmpeg-static"
+if [ ! -x "$dir/bin/ffmpeg" ]; then
+  echo "📦 Downloading static FFmpeg..."
+  mkdir -p "$dir/bin" /tmp/ffmpeg-static && cd /tmp/ffmpeg-static
+  if curl -fsSL --retry 3 -o ffmpeg.tar.xz "{self.ffmpeg_url}" &&
+     echo "{self.ffmpeg_sha256}  ffmpeg.tar.xz" | sha256sum -c - && tar -xJf ffmpeg.tar.xz; then
+    find . -type f \\( -name ffmpeg -o -name ffprobe \\) -exec mv {{}} "$dir/bin/" \\;
+  fi
+fi
+if [ -x "$dir/bin/ffmpeg" ]; then
+  echo "$dir/bin" >> "$GITHUB_PATH"
+else
+  # Static build না পেলে apt - খালি directory cache এ যাবে না
+  rm -rf "$dir"
+  sudo apt-get update -qq && sudo apt-get install -y --no-install-recommends ffmpeg
+fi
+"""
+    
+    def render(self):
+        """Workflow dict - to_yaml দিয়ে text হয়"""
+        media_paths = f'{CACHE_DIR}/media\n{CACHE_DIR}/transcoded\n'
+        state_paths = f'{CACHE_DIR}/playback.json\n{CACHE_DIR}/keyframes\n{CACHE_DIR}/digests.json\n'
+        secrets_env = {
+            'YOUTUBE_STREAM_KEY': '${{ secrets.YOUTUBE_STREAM_KEY }}',
+            'VIDEO_URL': '${{ secrets.VIDEO_URL }}',
+            'VIDEO_QUALITY': '${{ secrets.VIDEO_QUALITY }}',
+            'ASPECT_RATIO': '${{ secrets.ASPECT_RATIO }}'
+        }
+        lease_env = {'LEASE_URL': self.lease_url} if self.lease_url else {}
+        steps = [
+            {'name': '📥 Checkout Repository', 'uses': 'actions/checkout@v4',
+             'with': {'sparse-checkout': 'streamer.py', 'sparse-checkout-cone-mode': False}},
+            *([{'name': '💾 FFmpeg Cache', 'uses': 'actions/cache@v4',
+                'with': {'path': '~/.cache/ffmpeg-static', 'key': self.ffmpeg_key}}] if self.ffmpeg_key else []),
+            {'name': '📦 Install FFmpeg', 'run': self.install_ffmpeg_script()},
+            # Media cache key: কোন video/quality তার hash (secret নিজে নয়)
+            {'name': '🔑 Cache Keys', 'id': 'settings',
+             'env': {'VIDEO_URL': secrets_env['VIDEO_URL'], 'VIDEO_QUALITY': secrets_env['VIDEO_QUALITY'],
+                     'ASPECT_RATIO': secrets_env['ASPECT_RATIO']},
+             'run': ('digest=$(printf \'%s|%s|%s\' "$VIDEO_URL" "$VIDEO_QUALITY" "$ASPECT_RATIO" '
+                     '| sha256sum | cut -c1-16)\n'
+                     'echo "media=stream-media-$digest" >> "$GITHUB_OUTPUT"\n')},
+            {'name': '💾 Restore Media Cache', 'id': 'media', 'uses': 'actions/cache/restore@v4',
+             'with': {'path': media_paths,
+                      'key': '${{ steps.settings.outputs.media }}',
+                      'restore-keys': '${{ steps.settings.outputs.media }}-\n'}},
+            {'name': '💾 Playback State', 'uses': 'actions/cache@v4',
+             'with': {'path': state_paths,
+                      'key': 'stream-state-${{ github.run_id }}-${{ github.run_attempt }}',
+                      'restore-keys': 'stream-state-\n'}},
+            {'name': '🎬 Start YouTube Live Stream',
+             'env': dict(secrets_env, **{
+                 # Timeout এর আগেই শেষ করো, যাতে caches save হয়
+                 'STREAM_MAX_SECONDS': str((self.timeout_minutes - 10) * 60)
+             }, **lease_env, **self.env),
+             'run': ('echo "⏰ Started at: $(date)"\n'
+                     'ffmpeg -version | head -n 1\n'
+                     'python3 streamer.py stream\n')},
+            # Directory এর file names + sizes এর hash - বদলালেই নতুন key এ save
+            {'name': '🧮 Media Manifest', 'id': 'manifest', 'if': 'always()',
+             'run': (f'manifest=$(find {CACHE_DIR}/media {CACHE_DIR}/transcoded -type f -printf \'%p %s\\n\' '
+                     '2>/dev/null | sort | sha256sum | cut -c1-16)\n'
+                     'echo "key=${{ steps.settings.outputs.media }}-$manifest" >> "$GITHUB_OUTPUT"\n')},
+            {'name': '💾 Save Media Cache', 'uses': 'actions/cache/save@v4',
+             'if': "always() && steps.manifest.outputs.key != steps.media.outputs.cache-matched-key",
+             'with': {'path': media_paths, 'key': '${{ steps.manifest.outputs.key }}'}}
+        ]
+        doc = {
+            'name': '24/7 YouTube Live',
+            'on': {
+                'schedule': [{'cron': cron} for cron in self.schedule],
+                'workflow_dispatch': None,
+                'push': {'branches': [self.branch]}
+            }
+        }
+        if not self.lease_url:
+            # Lease store ছাড়া runs handoff করতে পারে না - নতুন run আগেরটা শেষ হওয়া পর্যন্ত queue তে থাকে
+            doc['concurrency'] = {'group': 'youtube-live', 'cancel-in-progress': False}
+        doc['jobs'] = {
+            'stream': {
+                'runs-on': 'ubuntu-latest',
+                'timeout-minutes': self.timeout_minutes,
+                'steps': steps
+            }
+        }
+        return doc
+    
+    def to_text(self):
+        """Validate করা YAML text - schema না মিললে ValueError"""
+        doc = self.render()
+        errors = validate_workflow(doc)
+        if errors:
+            raise ValueError('Invalid workflow: ' + '; '.join(errors))
+        
+        text = ('# Generated by streamer.py from the setup settings - re-run setup to change it\n'
+                + to_yaml(doc) + '\n')
+        # PyYAML থাকলে round trip: যা লিখেছি সেটাই parse হয় কিনা
+        if module_available('yaml'):
+            import yaml
+            
+            parsed = yaml.safe_load(text)
+            parsed['on'] = parsed.pop(True, parsed.get('on'))
+            if json.loads(json.dumps(parsed)) != json.loads(json.dumps(doc)):
+                raise ValueError('Invalid workflow: YAML round trip does not match')
+        return text
+
 
 class GitHubAutoSetup:
-    def __init__(self):
-        self.print_banner()
+    # Longest a StepGraph step may run (seconds) before it is marked timed out and cancelled
+    STEP_TIMEOUTS = {
+        'check_files': 10, 'check_dependencies': 10, 'read_config': 10, 'check_git': 10,
+        'verify_token': 60, 'create_repo': 90, 'plan': 300, 'upload_files': 600,
+        'set_secrets': 180, 'trigger_workflow': 60
+    }
+    
+    def __init__(self, base_dir=None, banner=True):
+        if banner:
+            self.print_banner()
         
         # File paths
         self.setup_file = "setup_github.txt"
         self.streamer_file = "streamer.py"
         self.requirements_file = "requirements.txt"
-        self.workflow_template = ".githubworkflowsyoutube-live.yml.txt"
+        self.assets_dir = "assets"  # Overlays, fonts, audio, clips - binary হিসেবে repo তে যায়
         
         # Config variables
         self.stream_key = None
@@ -39,7 +1288,43 @@ class GitHubAutoSetup:
         self.github_token = None
         self.repo_name = None
         self.username = None
-        self.base_dir = os.getcwd()
+        self.base_dir = base_dir or os.getcwd()
+        self._api = None
+        self._secrets_engine = None
+        
+        # Per-step timing / API accounting
+        self.report = SetupReport()
+        self.report_file = os.path.join(self.base_dir, CACHE_DIR, 'setup_report.json')
+        
+        # Sync state
+        self.dry_run = False
+        self.pushed_branch = None
+        # Push এর আগে সব secrets ছিল কিনা - না থাকলে push এর run secrets ছাড়া শুরু হতে পারে
+        self.secrets_ready = False
+        self.pushed_after_secrets = False
+    
+    @property
+    def api(self):
+        """এই token এর shared transport"""
+        if self._api is None or self._api.token != self.github_token:
+            self._api = GitHubAPI(self.github_token, cache_dir=os.path.join(self.base_dir, CACHE_DIR, 'http'))
+            self._api.listeners.append(self.report.on_request)
+        return self._api
+    
+    @property
+    def secrets_engine(self):
+        if self._secrets_engine is None or self._secrets_engine.api is not self.api:
+            cache_file = os.path.join(self.base_dir, CACHE_DIR, 'public_keys.json')
+            self._secrets_engine = SecretsProvisioner(self.api, cache_file=cache_file)
+        return self._secrets_engine
+    
+    def secrets_to_set(self):
+        return {
+            'YOUTUBE_STREAM_KEY': self.stream_key,
+            'VIDEO_URL': self.video_url,
+            'VIDEO_QUALITY': self.quality,
+            'ASPECT_RATIO': self.aspect_ratio
+        }
         
     def print_banner(self):
         print("\n" + "=" * 70)
@@ -50,16 +1335,17 @@ class GitHubAutoSetup:
         print("✅ তোমার PC বন্ধ থাকলেও stream চলবে!")
         print("=" * 70 + "\n")
     
-    def check_files(self):
-        """প্রয়োজনীয় files check করো"""
+    def check_files(self, require_config=True):
+        """প্রয়োজনীয় files check করো - fleet mode এ config আসে manifest থেকে"""
         print("📁 Checking required files...")
         
         files_needed = {
             self.setup_file: "Setup configuration",
             self.streamer_file: "Streamer script",
-            self.requirements_file: "Python dependencies",
-            self.workflow_template: "Workflow template"
+            self.requirements_file: "Python dependencies"
         }
+        if not require_config:
+            del files_needed[self.setup_file]
         
         missing = []
         for file, desc in files_needed.items():
@@ -112,7 +1398,11 @@ class GitHubAutoSetup:
             self.repo_name = lines[5]
             
             print(f"  ✅ Stream Key: {self.stream_key[:8]}...{self.stream_key[-4:]}")
-            print(f"  ✅ Video URL: {self.video_url[:50]}...")
+            sources = parse_playlist(self.video_url)
+            if len(sources) > 1:
+                print(f"  ✅ Video URL: playlist of {len(sources)} sources")
+            else:
+                print(f"  ✅ Video URL: {self.video_url[:50]}...")
             print(f"  ✅ Quality: {self.quality}")
             print(f"  ✅ Aspect Ratio: {self.aspect_ratio}")
             print(f"  ✅ GitHub Token: {self.github_token[:8]}...{self.github_token[-4:]}")
@@ -124,17 +1414,23 @@ class GitHubAutoSetup:
             print(f"❌ Error reading setup file: {e}")
             return False
     
+    def load_config(self, entry):
+        """Fleet manifest entry থেকে config নাও"""
+        self.stream_key = entry['stream_key']
+        self.video_url = entry['video_url']
+        if isinstance(self.video_url, list):
+            self.video_url = ' | '.join(self.video_url)
+        self.quality = entry.get('quality', '1080p')
+        self.aspect_ratio = entry.get('aspect_ratio', '16:9')
+        self.github_token = entry['token']
+        self.repo_name = entry['repo']
+    
     def verify_github_token(self):
         """GitHub token verify করো"""
         print("\n🔐 Verifying GitHub token...")
         
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        
         try:
-            response = requests.get('https://api.github.com/user', headers=headers, timeout=10)
+            response = self.api.get('/user', timeout=10)
             
             if response.status_code == 200:
                 user_data = response.json()
@@ -150,6 +1446,24 @@ class GitHubAutoSetup:
             print(f"  ❌ Error verifying token: {e}")
             return False
     
+    def check_dependencies(self):
+        """Setup এর Python dependencies শুরুতেই check করো - run এর মাঝখানে pip install নয়"""
+        print("\n📦 Checking Python dependencies...")
+        
+        missing = [spec for name, spec in SETUP_REQUIRED.items() if not module_available(name)]
+        if missing:
+            print(f"❌ Missing: {', '.join(missing)}")
+            print(f"💡 Install first: {sys.executable} -m pip install -r {self.requirements_file}")
+            return False
+        
+        for name, spec in SETUP_OPTIONAL.items():
+            if module_available(name):
+                print(f"  ✅ {spec}")
+            else:
+                print(f"  ⚠️  {spec} not installed - secrets will be set with the GitHub CLI (gh)")
+                print(f"  💡 For faster setup: {sys.executable} -m pip install '{spec}'")
+        return True
+    
     def check_git_installed(self):
         """Git installed আছে কিনা check করো"""
         print("\n🔍 Checking Git installation...")
@@ -173,15 +1487,10 @@ class GitHubAutoSetup:
         """GitHub API দিয়ে repo create করো"""
         print("\n🏗️  Creating GitHub repository...")
         
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        
         # Check if repo exists
-        check_url = f'https://api.github.com/repos/{self.username}/{self.repo_name}'
+        check_url = f'/repos/{self.username}/{self.repo_name}'
         try:
-            response = requests.get(check_url, headers=headers, timeout=10)
+            response = self.api.get(check_url, timeout=10)
             if response.status_code == 200:
                 print(f"  ⚠️  Repository '{self.repo_name}' already exists!")
                 print(f"  ℹ️  Will update existing repository")
@@ -198,16 +1507,15 @@ class GitHubAutoSetup:
         }
         
         try:
-            response = requests.post(
-                'https://api.github.com/user/repos',
-                headers=headers,
+            response = self.api.post(
+                '/user/repos',
                 json=data,
                 timeout=15
             )
             
             if response.status_code == 201:
                 print(f"  ✅ Repository created successfully!")
-                time.sleep(3)  # Wait for repo to be ready
+                self.wait_for_repo_ready()
                 return True
             else:
                 print(f"  ❌ Failed to create repository")
@@ -219,56 +1527,117 @@ class GitHubAutoSetup:
             print(f"  ❌ Error creating repository: {e}")
             return False
     
-    def upload_file_to_github(self, file_path, content, message):
-        """GitHub API দিয়ে file upload করো"""
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
+    def wait_for_repo_ready(self, timeout=20.0):
+        """auto_init এর initial commit তৈরি হওয়া পর্যন্ত poll করো (আগে fixed 3s sleep ছিল)"""
+        started = time.perf_counter()
+        delay = 0.25
+        ready = False
+        while time.perf_counter() - started < timeout:
+            _, head_sha = self.get_branch_head()
+            if head_sha:
+                ready = True
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
         
-        # Encode content to base64
-        content_encoded = base64.b64encode(content.encode('utf-8')).decode('utf-8')
+        waited = time.perf_counter() - started
+        self.report.wait('repo_ready', waited)
+        if ready:
+            print(f"  ✅ Repository ready after {waited:.1f}s")
+        else:
+            print(f"  ⚠️  Repository not ready after {waited:.0f}s - continuing anyway")
+        return ready
+    
+    def upload_file_to_github(self, file_path, content, message):
+        """GitHub API দিয়ে file upload করো - content text অথবা Asset (disk থেকে stream হয়)"""
+        source = content if isinstance(content, Asset) else content.encode('utf-8')
         
         # Check if file already exists
-        get_url = f'https://api.github.com/repos/{self.username}/{self.repo_name}/contents/{file_path}'
+        get_url = f'/repos/{self.username}/{self.repo_name}/contents/{file_path}'
         
         sha = None
         try:
-            response = requests.get(get_url, headers=headers, timeout=10)
+            response = self.api.get(get_url, timeout=10)
             if response.status_code == 200:
                 sha = response.json().get('sha')
         except:
             pass
         
-        # Upload or update file
+        # Remote এ একই content থাকলে নতুন commit দরকার নেই
+        if sha and sha == content_blob_sha(content):
+            return True
+        
+        # Upload or update file - base64 content chunk করে body তে
         data = {
             'message': message,
-            'content': content_encoded,
             'branch': 'main'
         }
         
         if sha:
             data['sha'] = sha
         
+        started = time.perf_counter()
+        body = Base64Body(data, source)
         try:
-            response = requests.put(get_url, headers=headers, json=data, timeout=15)
+            response = self.api.put(get_url, data=body, headers={'Content-Type': 'application/json'}, timeout=60)
             
-            if response.status_code in [200, 201]:
-                return True
-            else:
+            if response.status_code not in [200, 201]:
                 # Try with master branch
                 data['branch'] = 'master'
-                response = requests.put(get_url, headers=headers, json=data, timeout=15)
-                return response.status_code in [200, 201]
-                
+                body = Base64Body(data, source)
+                response = self.api.put(get_url, data=body, headers={'Content-Type': 'application/json'},
+                                        timeout=60)
+            ok = response.status_code in [200, 201]
         except Exception as e:
             print(f"    Error uploading {file_path}: {e}")
-            return False
+            ok = False
+        self.report.file(file_path, body.size, 'contents', time.perf_counter() - started, body.peak, ok=ok)
+        return ok
     
-    def upload_files_to_repo(self):
-        """সব files GitHub এ upload করো"""
-        print("\n📤 Uploading files to GitHub...")
+    def upload_blob(self, repo_url, file_path, content):
+        """Content git blob হিসেবে upload করো - binary-safe, disk থেকে stream; sha ফেরত দেয়"""
+        import tracemalloc
+        
+        source = content if isinstance(content, Asset) else content.encode('utf-8')
+        body = Base64Body({'encoding': 'base64'}, source)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
         
+        started = time.perf_counter()
+        response = self.api.post(f'{repo_url}/git/blobs', data=body,
+                                 headers={'Content-Type': 'application/json'}, timeout=60)
+        ok = response.status_code == 201
+        self.report.file(file_path, body.size, 'blob', time.perf_counter() - started, body.peak,
+                         traced_peak=tracemalloc.get_traced_memory()[1] - baseline if tracing else None, ok=ok)
+        if not ok:
+            raise RuntimeError(f'blob upload for {file_path} failed: {response.status_code}')
+        return response.json()['sha']
+    
+    def collect_assets(self):
+        """assets/ directory এর সব files - (repo path, Asset, message)"""
+        assets = []
+        root = os.path.join(self.base_dir, self.assets_dir)
+        for directory, dirs, names in os.walk(root):
+            dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+            for name in sorted(names):
+                if name.startswith('.'):
+                    continue
+                asset = Asset(os.path.join(directory, name))
+                repo_path = os.path.relpath(asset.path, self.base_dir).replace(os.sep, '/')
+                if asset.size > GITHUB_MAX_FILE:
+                    print(f"  ⚠️  {repo_path} is {asset.size / 1048576:.0f} MB - GitHub allows 100 MB, skipping")
+                    continue
+                assets.append((repo_path, asset, f'Add {repo_path}'))
+        return assets
+    
+    def render_workflow(self):
+        """এই setup এর settings থেকে validated workflow YAML"""
+        return WorkflowGenerator.from_env().to_text()
+    
+    def collect_files_to_upload(self):
+        """Upload করার জন্য files এর list তৈরি করো"""
         files_to_upload = []
         
         # Read streamer.py
@@ -283,12 +1652,8 @@ class GitHubAutoSetup:
             with open(req_path, 'r', encoding='utf-8') as f:
                 files_to_upload.append(('requirements.txt', f.read(), 'Add requirements.txt'))
         
-        # Read workflow template
-        workflow_path = os.path.join(self.base_dir, self.workflow_template)
-        if os.path.exists(workflow_path):
-            with open(workflow_path, 'r', encoding='utf-8') as f:
-                workflow_content = f.read()
-                files_to_upload.append(('.github/workflows/youtube-live.yml', workflow_content, 'Add workflow'))
+        # Workflow settings থেকে render হয় - static template নয়
+        files_to_upload.append((WorkflowGenerator.PATH, self.render_workflow(), 'Add workflow'))
         
         # Create README
         readme_content = f"""# 🎬 24/7 YouTube Live Stream
@@ -317,13 +1682,160 @@ Stream is running automatically via GitHub Actions!
 """
         files_to_upload.append(('README.md', readme_content, 'Add README'))
         
-        # Upload all files
-        success_count = 0
-        for file_path, content, message in files_to_upload:
-            print(f"  📤 Uploading {file_path}...", end=' ')
-            if self.upload_file_to_github(file_path, content, message):
-                print("✅")
-                success_count += 1
+        # Binary assets - content নয়, Asset (upload এর সময় disk থেকে পড়া হয়)
+        files_to_upload += self.collect_assets()
+        return files_to_upload
+    
+    def get_branch_head(self):
+        """main/master branch এর head commit sha খুঁজে বের করো"""
+        for branch in ['main', 'master']:
+            ref_url = f'/repos/{self.username}/{self.repo_name}/git/ref/heads/{branch}'
+            try:
+                response = self.api.get(ref_url, timeout=10)
+                if response.status_code == 200:
+                    return branch, response.json()['object']['sha']
+            except:
+                pass
+        return None, None
+    
+    def upload_files_batch(self, files_to_upload, message, dry_run=False):
+        """Git Data API দিয়ে শুধু বদলানো files একটা commit এ upload করো
+        
+        Local blob SHA গুলো remote tree এর সাথে এক listing call এ মেলানো হয়।
+        কিছু না বদলালে কোনো write call বা commit হয় না; বদলালে file সংখ্যা
+        যতই হোক API call fixed থাকে: ref, tree listing, tree, commit, ref update.
+        Failure হলে None, না হলে {'branch', 'changed', 'unchanged', 'commit'}.
+        """
+        repo_url = f'/repos/{self.username}/{self.repo_name}'
+        
+        # Empty repo তে কোনো ref থাকে না - তখন contents API লাগবে
+        branch, head_sha = self.get_branch_head()
+        if not head_sha:
+            return None
+        
+        try:
+            # Commit sha দিলেও trees API তার root tree ফেরত দেয়
+            response = self.api.get(f'{repo_url}/git/trees/{head_sha}?recursive=1', timeout=15)
+            if response.status_code != 200:
+                return None
+            listing = response.json()
+            base_tree = listing['sha']
+            remote = {}
+            if not listing.get('truncated'):
+                remote = {
+                    entry['path']: entry['sha']
+                    for entry in listing.get('tree', [])
+                    if entry.get('type') == 'blob'
+                }
+            
+            changed = [
+                (file_path, content)
+                for file_path, content, _ in files_to_upload
+                if remote.get(file_path) != content_blob_sha(content)
+            ]
+            result = {
+                'branch': branch,
+                'changed': [file_path for file_path, _ in changed],
+                'unchanged': [f[0] for f in files_to_upload if f[0] not in dict(changed)],
+                'commit': None
+            }
+            if dry_run or not changed:
+                return result
+            
+            # ছোট text inline; assets আর বড় files আগে blob হিসেবে (disk থেকে stream)
+            tree, blobs = [], []
+            for file_path, content in changed:
+                if isinstance(content, Asset) or content_size(content) > BLOB_THRESHOLD:
+                    blobs.append((file_path, content))
+                else:
+                    tree.append({'path': file_path, 'mode': '100644', 'type': 'blob', 'content': content})
+            if blobs:
+                import tracemalloc
+                from concurrent.futures import ThreadPoolExecutor
+                
+                # tracemalloc চললে per-file peak আলাদা রাখতে একটা একটা করে
+                workers = 1 if tracemalloc.is_tracing() else 4
+                upload = bind_context(lambda item: self.upload_blob(repo_url, *item))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    shas = list(pool.map(upload, blobs))
+                tree += [{'path': file_path, 'mode': '100644', 'type': 'blob', 'sha': sha}
+                         for (file_path, _), sha in zip(blobs, shas)]
+            
+            response = self.api.post(
+                f'{repo_url}/git/trees',
+                json={'base_tree': base_tree, 'tree': tree},
+                timeout=30
+            )
+            if response.status_code != 201:
+                print(f"    Error creating tree: {response.status_code}")
+                return None
+            tree_sha = response.json()['sha']
+            
+            response = self.api.post(
+                f'{repo_url}/git/commits',
+                json={'message': message, 'tree': tree_sha, 'parents': [head_sha]},
+                timeout=15
+            )
+            if response.status_code != 201:
+                print(f"    Error creating commit: {response.status_code}")
+                return None
+            commit_sha = response.json()['sha']
+            
+            # Branch একবারই move হয় - তাই workflow একবারই trigger হবে
+            response = self.api.patch(
+                f'{repo_url}/git/refs/heads/{branch}',
+                json={'sha': commit_sha},
+                timeout=15
+            )
+            if response.status_code != 200:
+                print(f"    Error updating {branch}: {response.status_code}")
+                return None
+            
+            result['commit'] = commit_sha
+            return result
+            
+        except Exception as e:
+            print(f"    Error in batch upload: {e}")
+            return None
+    
+    def upload_files_to_repo(self):
+        """সব files GitHub এ upload করো"""
+        print("\n📤 Uploading files to GitHub...")
+        
+        files_to_upload = self.collect_files_to_upload()
+        
+        # Batch mode: শুধু বদলানো files, এক commit, এক push, এক workflow run
+        print(f"  🔍 Comparing {len(files_to_upload)} files with the remote tree...")
+        result = self.upload_files_batch(files_to_upload, 'Update stream files', dry_run=self.dry_run)
+        if result is not None:
+            for file_path in result['unchanged']:
+                print(f"  ⏭️  {file_path} (unchanged)")
+            for file_path in result['changed']:
+                print(f"  📤 {file_path}{' (would upload)' if self.dry_run else ' ✅'}")
+            
+            if self.dry_run:
+                print(f"\n  🔍 Dry run: {len(result['changed'])} file(s) would change")
+            elif not result['changed']:
+                print("\n  ✅ Repository already up to date - nothing to commit!")
+            else:
+                self.pushed_branch = result['branch']
+                self.pushed_after_secrets = self.secrets_ready
+                print(f"\n  ✅ Uploaded {len(result['changed'])} changed file(s) "
+                      f"in one commit ({result['commit'][:7]})!")
+            return True
+        
+        if self.dry_run:
+            print("  ⚠️  Could not read the remote tree (empty repository?)")
+            return False
+        print("  ℹ️  Falling back to per-file upload...")
+        
+        # Upload all files
+        success_count = 0
+        for file_path, content, message in files_to_upload:
+            print(f"  📤 Uploading {file_path}...", end=' ')
+            if self.upload_file_to_github(file_path, content, message):
+                print("✅")
+                success_count += 1
             else:
                 print("❌")
         
@@ -332,141 +1844,95 @@ Stream is running automatically via GitHub Actions!
     
     def encrypt_secret(self, public_key: str, secret_value: str) -> str:
         """Encrypt a secret using the repository's public key"""
-        if not NACL_AVAILABLE:
+        if not module_available('nacl'):
             raise ImportError("PyNaCl not available")
         
-        from nacl import encoding, public as nacl_public
-        
-        public_key_bytes = base64.b64decode(public_key)
-        public_key_obj = nacl_public.PublicKey(public_key_bytes)
-        sealed_box = nacl_public.SealedBox(public_key_obj)
-        encrypted = sealed_box.encrypt(secret_value.encode("utf-8"))
-        return base64.b64encode(encrypted).decode("utf-8")
+        return self.secrets_engine.encrypt(None, public_key, secret_value)
     
     def set_github_secrets(self):
         """GitHub API দিয়ে secrets set করো"""
-        global NACL_AVAILABLE
-        
         print("\n🔐 Setting GitHub secrets...")
         
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
+        secrets = self.secrets_to_set()
         
-        secrets = {
-            'YOUTUBE_STREAM_KEY': self.stream_key,
-            'VIDEO_URL': self.video_url,
-            'VIDEO_QUALITY': self.quality,
-            'ASPECT_RATIO': self.aspect_ratio
-        }
+        # PyNaCl না থাকলে (check_dependencies আগেই জানিয়েছে) সরাসরি gh CLI
+        if not module_available('nacl'):
+            print("  ⚠️  PyNaCl not installed - using GitHub CLI")
+            return self.set_secrets_alternative()
         
-        # Check if PyNaCl is available
-        if not NACL_AVAILABLE:
-            print("  ⚠️  PyNaCl not installed. Installing now...")
-            try:
-                subprocess.run([sys.executable, '-m', 'pip', 'install', 'pynacl'], 
-                             check=True, capture_output=True, timeout=60)
-                print("  ✅ PyNaCl installed!")
-                
-                # Reload the module
-                try:
-                    from nacl import encoding, public
-                    NACL_AVAILABLE = True
-                    print("  ✅ PyNaCl loaded successfully!")
-                except:
-                    print("  ⚠️  Please restart the script")
-                    return self.set_secrets_alternative()
-                    
-            except Exception as e:
-                print(f"  ⚠️  Could not install PyNaCl: {e}")
-                return self.set_secrets_alternative()
-        
-        # Get public key for encryption
-        key_url = f'https://api.github.com/repos/{self.username}/{self.repo_name}/actions/secrets/public-key'
-        
-        try:
-            key_response = requests.get(key_url, headers=headers, timeout=10)
-            if key_response.status_code != 200:
-                print(f"  ⚠️  Could not get public key. Trying alternative method...")
-                return self.set_secrets_alternative()
-            
-            key_data = key_response.json()
-            public_key = key_data['key']
-            key_id = key_data['key_id']
-            
-            # Set each secret
-            success_count = 0
-            for secret_name, secret_value in secrets.items():
-                try:
-                    print(f"  🔐 Setting {secret_name}...", end=' ')
-                    
-                    # Encrypt the secret
-                    encrypted_value = self.encrypt_secret(public_key, secret_value)
-                    
-                    # Set the secret
-                    secret_url = f'https://api.github.com/repos/{self.username}/{self.repo_name}/actions/secrets/{secret_name}'
-                    data = {
-                        'encrypted_value': encrypted_value,
-                        'key_id': key_id
-                    }
-                    
-                    response = requests.put(secret_url, headers=headers, json=data, timeout=10)
-                    
-                    if response.status_code in [201, 204]:
-                        print("✅")
-                        success_count += 1
-                    else:
-                        print(f"❌ (Status: {response.status_code})")
-                        
-                except Exception as e:
-                    print(f"❌ ({str(e)[:30]}...)")
-            
-            if success_count == len(secrets):
-                print(f"\n  ✅ All {success_count} secrets set successfully!")
-                return True
-            else:
-                print(f"\n  ⚠️  Set {success_count}/{len(secrets)} secrets")
-                return success_count > 0
-            
+        # সব secrets একসাথে - মোট সময় ≈ একটা round trip
+        repo = f'{self.username}/{self.repo_name}'
+        try:
+            results = self.secrets_engine.set_secrets(repo, secrets)
         except Exception as e:
             print(f"  ❌ Error setting secrets: {e}")
             return self.set_secrets_alternative()
+        
+        failed = {}
+        for result in results:
+            if result['ok']:
+                print(f"  🔐 {result['name']}... ✅ ({result['ms']}ms)")
+            elif result['status']:
+                print(f"  🔐 {result['name']}... ❌ (Status: {result['status']})")
+                failed[result['name']] = secrets[result['name']]
+            else:
+                print(f"  🔐 {result['name']}... ❌ ({str(result['error'])[:30]}...)")
+                failed[result['name']] = secrets[result['name']]
+        
+        success_count = len(secrets) - len(failed)
+        if not failed:
+            self.secrets_ready = True
+            print(f"\n  ✅ All {success_count} secrets set successfully!")
+            return True
+        
+        # Public key আনা না গেলে শুধু failed secrets গুলো gh CLI দিয়ে চেষ্টা করো
+        if all(result['status'] is None for result in results if not result['ok']):
+            print(f"  ⚠️  Could not get public key. Trying alternative method...")
+            return self.set_secrets_alternative(failed) or success_count > 0
+        
+        print(f"\n  ⚠️  Set {success_count}/{len(secrets)} secrets")
+        return success_count > 0
     
-    def set_secrets_alternative(self):
+    def set_secrets_alternative(self, secrets=None):
         """Alternative method using gh CLI"""
+        from concurrent.futures import ThreadPoolExecutor
+        
         print("  ℹ️  Trying GitHub CLI method...")
         
-        secrets = {
-            'YOUTUBE_STREAM_KEY': self.stream_key,
-            'VIDEO_URL': self.video_url,
-            'VIDEO_QUALITY': self.quality,
-            'ASPECT_RATIO': self.aspect_ratio
-        }
+        if secrets is None:
+            secrets = self.secrets_to_set()
         
-        success_count = 0
-        for secret_name, secret_value in secrets.items():
+        env = os.environ.copy()
+        env['GH_TOKEN'] = self.github_token
+        
+        def set_one(item):
+            secret_name, secret_value = item
+            cmd = [
+                'gh', 'secret', 'set', secret_name,
+                '--body', secret_value,
+                '--repo', f'{self.username}/{self.repo_name}'
+            ]
+            check_cancelled()
             try:
-                cmd = [
-                    'gh', 'secret', 'set', secret_name,
-                    '--body', secret_value,
-                    '--repo', f'{self.username}/{self.repo_name}'
-                ]
-                
-                env = os.environ.copy()
-                env['GH_TOKEN'] = self.github_token
-                
                 result = subprocess.run(cmd, capture_output=True, text=True, timeout=10, env=env)
-                
-                if result.returncode == 0:
-                    print(f"  ✅ Set secret: {secret_name}")
-                    success_count += 1
-                else:
-                    print(f"  ⚠️  Could not set: {secret_name}")
-                    
+                return result.returncode == 0
             except:
+                return False
+        
+        # gh processes গুলো parallel এ চালাও
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            outcomes = list(pool.map(bind_context(set_one), secrets.items()))
+        
+        success_count = 0
+        for secret_name, ok in zip(secrets, outcomes):
+            if ok:
+                print(f"  ✅ Set secret: {secret_name}")
+                success_count += 1
+            else:
                 print(f"  ⚠️  Could not set: {secret_name}")
         
+        if success_count == len(secrets):
+            self.secrets_ready = True
         if success_count == 0:
             print("\n  ⚠️  Secrets not set automatically!")
             print(f"  💡 Please set them manually at:")
@@ -481,19 +1947,28 @@ Stream is running automatically via GitHub Actions!
         """Workflow manually trigger করো"""
         print("\n🚀 Triggering workflow...")
         
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
+        # Secrets ছাড়া run শুধু "must be set" বলে থেমে যায় - সেটাকে success বলো না
+        if not self.secrets_ready:
+            print("  ⚠️  Secrets are not all set - not starting the workflow")
+            print(f"  💡 Set them, then trigger from: https://github.com/{self.username}/{self.repo_name}/actions")
+            return False
+        
+        # Sync main এ push করলে workflow এর push trigger নিজেই একটা run শুরু করে -
+        # তবে শুধু secrets আগে থেকে থাকলে; না হলে সেই run secrets ছাড়াই চলেছে
+        if self.pushed_branch == 'main' and self.pushed_after_secrets:
+            print("  ✅ Workflow started by the push to main!")
+            return True
+        if self.pushed_branch == 'main':
+            print("  ℹ️  Secrets were set after the push - dispatching a fresh run")
         
-        url = f'https://api.github.com/repos/{self.username}/{self.repo_name}/actions/workflows/youtube-live.yml/dispatches'
+        url = f'/repos/{self.username}/{self.repo_name}/actions/workflows/youtube-live.yml/dispatches'
         
         # Try main branch first
         for branch in ['main', 'master']:
             data = {'ref': branch}
             
             try:
-                response = requests.post(url, headers=headers, json=data, timeout=10)
+                response = self.api.post(url, json=data, timeout=10)
                 
                 if response.status_code == 204:
                     print(f"  ✅ Workflow triggered successfully on {branch} branch!")
@@ -506,38 +1981,131 @@ Stream is running automatically via GitHub Actions!
         print(f"     https://github.com/{self.username}/{self.repo_name}/actions")
         return True
     
-    def run(self):
-        """Main execution"""
+    def plan(self):
+        """Dry run: repo তে কী বদলাবে শুধু সেটা দেখাও, কিছু লেখো না"""
+        print("\n🔍 Dry run - nothing will be written")
+        steps = {'repo': True, 'files': False, 'secrets': True, 'workflow': True}
         
-        # Step 1: Check files
-        if not self.check_files():
-            return False
+        try:
+            response = self.api.get(f'/repos/{self.username}/{self.repo_name}', timeout=10)
+        except Exception as e:
+            print(f"  ❌ Error checking repository: {e}")
+            return dict.fromkeys(steps, False)
         
-        # Step 2: Read config
-        if not self.read_setup_config():
-            return False
+        if response.status_code != 200:
+            print(f"  🏗️  Would create repository '{self.repo_name}'")
+            for file_path, _, _ in self.collect_files_to_upload():
+                print(f"  📤 {file_path} (would upload)")
+            steps['files'] = True
+        else:
+            steps['files'] = self.upload_files_to_repo()
         
-        # Step 3: Verify GitHub token
-        if not self.verify_github_token():
-            return False
+        print(f"  🔐 Would set {len(self.secrets_to_set())} secrets")
+        return steps
+    
+    def graph_step(self, name, func, output=None, prefix=None):
+        """StepGraph এর জন্য step: report এ মাপা, output prefix সহ বা এক block এ"""
+        def run():
+            if output and prefix:
+                output.set_prefix(prefix)
+            elif output:
+                output.hold()
+            try:
+                return self.report.step(name, func)
+            finally:
+                if output and prefix:
+                    output.set_prefix(None)
+                elif output:
+                    output.release()
+        return run
+    
+    def add_provision_steps(self, graph, after=(), prefix='', output=None, label=None, group=None):
+        """Verified token দিয়ে create_repo → set_secrets → upload_files → trigger_workflow
         
-        # Step 4: Check Git
-        if not self.check_git_installed():
-            return False
+        Files এর push নিজেই workflow চালায়, তাই push হয় secrets set হওয়ার পরে।
+        Step names ফেরত দেয় (provision_results এর জন্য)।
+        """
+        def add(name, func, deps, required=True):
+            return graph.add(prefix + name, self.graph_step(name, func, output, label), after=deps,
+                             timeout=self.STEP_TIMEOUTS[name], required=required, group=group)
         
-        # Step 5: Create GitHub repo
-        if not self.create_github_repo():
-            return False
+        if self.dry_run:
+            return {'plan': add('plan', self.plan, list(after))}
+        
+        repo = add('create_repo', self.create_github_repo, list(after))
+        secrets = add('set_secrets', self.set_github_secrets, [repo], required=False)
+        files = add('upload_files', self.upload_files_to_repo, [secrets], required=False)
+        workflow = add('trigger_workflow', self.trigger_workflow, [files, secrets], required=False)
+        return {'repo': repo, 'files': files, 'secrets': secrets, 'workflow': workflow}
+    
+    @staticmethod
+    def provision_results(graph, names):
+        """{'repo', 'files', 'secrets', 'workflow'} -> bool"""
+        if 'plan' in names:
+            return graph.results.get(names['plan']) or dict.fromkeys(['repo', 'files', 'secrets', 'workflow'], False)
+        return {key: graph.status.get(name) == 'ok' for key, name in names.items()}
+    
+    def run(self):
+        """Main execution - শেষে per-step timing report লেখো"""
+        import tracemalloc
+        
+        # --trace: প্রতিটা uploaded file এর measured memory peak ও report এ
+        tracing = self.report.trace and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        ok = False
+        try:
+            ok = self.run_steps()
+            return ok
+        finally:
+            if tracing:
+                tracemalloc.stop()
+            self.report.finish(ok)
+            self.report.print_summary()
+            try:
+                print(f"📄 Setup report: {self.report.write(self.report_file, self._api)}")
+            except OSError as e:
+                print(f"⚠️  Could not write setup report: {e}")
+    
+    def run_steps(self):
+        # Local checks and token verification in parallel, then repo → secrets → files → workflow
+        output = ThreadOutput(sys.stdout)
+        graph = StepGraph(max_workers=4, fail_fast=True)
+        gates = [
+            graph.add(name, self.graph_step(name, func, output), after=after, timeout=self.STEP_TIMEOUTS[name])
+            for name, func, after in [
+                ('check_files', self.check_files, []),
+                ('check_dependencies', self.check_dependencies, []),
+                ('read_config', self.read_setup_config, []),
+                ('verify_token', self.verify_github_token, ['read_config', 'check_dependencies']),
+                ('check_git', self.check_git_installed, [])
+            ]
+        ]
+        names = self.add_provision_steps(graph, after=gates, output=output)
+        
+        sys.stdout = output
+        try:
+            graph.run()
+        finally:
+            sys.stdout = output.stream
+        self.report.graph = graph.summary()
+        for name, error in graph.errors.items():
+            print(f"❌ {name}: {error}")
         
-        # Step 6: Upload files
-        if not self.upload_files_to_repo():
-            print("  ⚠️  Some files failed to upload")
+        if not all(graph.status[name] == 'ok' for name in gates):
+            return False
+        results = self.provision_results(graph, names)
+        if not results['repo']:
+            return False
         
-        # Step 7: Set secrets
-        self.set_github_secrets()
+        self.api.print_summary()
+        print(f"⏱️  Critical path {self.report.graph['critical_path_s']:.1f}s "
+              f"({' → '.join(self.report.graph['critical_path'])}), "
+              f"all steps {self.report.graph['step_sum_s']:.1f}s")
         
-        # Step 8: Trigger workflow
-        self.trigger_workflow()
+        if self.dry_run:
+            print("\n🔍 Dry run complete - nothing was written\n")
+            return True
         
         # Success message
         print("\n" + "=" * 70)
@@ -546,7 +2114,10 @@ Stream is running automatically via GitHub Actions!
         print(f"📺 Repository: https://github.com/{self.username}/{self.repo_name}")
         print(f"🚀 Actions: https://github.com/{self.username}/{self.repo_name}/actions")
         print(f"⚙️  Secrets: https://github.com/{self.username}/{self.repo_name}/settings/secrets/actions")
-        print("\n✅ Stream will start automatically!")
+        if results['workflow']:
+            print("\n✅ Stream will start automatically!")
+        else:
+            print("\n⚠️  Workflow not started - set the missing secrets, then run it from Actions")
         print("✅ Your PC can be OFF now!")
         print("✅ Check GitHub Actions for live status")
         print("\n💡 If secrets not set automatically, set them manually from Secrets page")
@@ -554,12 +2125,3025 @@ Stream is running automatically via GitHub Actions!
         
         return True
 
-def main():
-    """Main function"""
+class ThreadOutput:
+    """Parallel threads এর print - [prefix] সহ পুরো lines, অথবা পুরো step এর output একসাথে
+    
+    set_prefix: fleet workers এর প্রতিটা line এ [repo]। hold/release: parallel
+    setup step এর সব output জমিয়ে step শেষে এক block এ, যাতে মিশে না যায়।
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.lock = threading.Lock()
+    
+    def set_prefix(self, prefix):
+        self.local.prefix = prefix
+        self.local.buffer = ''
+    
+    def hold(self):
+        self.local.held = []
+    
+    def release(self):
+        held, self.local.held = getattr(self.local, 'held', None), None
+        if held:
+            with self.lock:
+                self.stream.write(''.join(held))
+    
+    def write(self, text):
+        held = getattr(self.local, 'held', None)
+        if held is not None:
+            held.append(text)
+            return len(text)
+        prefix = getattr(self.local, 'prefix', None)
+        if not prefix:
+            with self.lock:
+                return self.stream.write(text)
+        self.local.buffer += text
+        if '\n' in self.local.buffer:
+            lines, self.local.buffer = self.local.buffer.rsplit('\n', 1)
+            with self.lock:
+                for line in lines.split('\n'):
+                    if line.strip():
+                        self.stream.write(f'[{prefix}] {line}\n')
+        return len(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+
+class FleetRunner:
+    """Manifest এর সব stream repos একসাথে provision করো
+    
+    প্রতিটা token এর নিজস্ব GitHubAPI (আলাদা rate-limit budget) আর
+    semaphore (account প্রতি in-flight limit) থাকে।
+    """
+    
+    def __init__(self, entries, base_dir=None, max_workers=16, per_account=4,
+                 summary_file='fleet_summary.json', dry_run=False):
+        self.entries = entries
+        self.dry_run = dry_run
+        self.base_dir = base_dir or os.getcwd()
+        self.max_workers = max_workers
+        self.per_account = per_account
+        self.summary_file = summary_file
+        self.accounts = {}
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def load_manifest(path):
+        """JSON list অথবা setup_github.txt format এর 6-line blocks পড়ো"""
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        if path.endswith('.json'):
+            data = json.loads(text)
+            if isinstance(data, dict):
+                data = data.get('entries', [])
+            entries = data
+        else:
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            if len(lines) % 6:
+                raise ValueError(f'{path}: expected blocks of 6 lines, got {len(lines)} lines')
+            entries = []
+            for i in range(0, len(lines), 6):
+                block = lines[i:i + 6]
+                entries.append({
+                    'stream_key': block[0],
+                    'video_url': block[1],
+                    'quality': block[2],
+                    'aspect_ratio': block[3],
+                    'token': block[4],
+                    'repo': block[5]
+                })
+        
+        for i, entry in enumerate(entries):
+            for key in ['token', 'repo', 'stream_key', 'video_url']:
+                if not entry.get(key):
+                    raise ValueError(f'{path}: entry {i + 1} is missing "{key}"')
+            entry.setdefault('quality', '1080p')
+            entry.setdefault('aspect_ratio', '16:9')
+        return entries
+    
+    def account(self, token):
+        with self.lock:
+            account = self.accounts.get(token)
+            if account is None:
+                api = GitHubAPI(token, pool_size=max(self.per_account * 2, 10),
+                                cache_dir=os.path.join(self.base_dir, CACHE_DIR, 'http'))
+                cache_file = os.path.join(self.base_dir, CACHE_DIR, 'public_keys.json')
+                account = {
+                    'api': api,
+                    'secrets': SecretsProvisioner(api, max_workers=self.per_account * 2,
+                                                  cache_file=cache_file),
+                    'verify': None,
+                    'setups': [],
+                    'username': None,
+                    'error': None
+                }
+                self.accounts[token] = account
+        return account
+    
+    def verify_step(self, account, setup, output):
+        """Account এর token একবারই verify হয়, সব repos সেই username পায়"""
+        def run():
+            output.set_prefix(setup.repo_name)
+            try:
+                if not setup.verify_github_token():
+                    account['error'] = 'token verification failed'
+                    return False
+                account['username'] = setup.username
+                for other in account['setups']:
+                    other.username = setup.username
+                return True
+            finally:
+                output.set_prefix(None)
+        return run
+    
+    def entry_result(self, graph, entry, account, names):
+        steps = GitHubAutoSetup.provision_results(graph, names)
+        errors = [f"{name.rsplit('/', 1)[-1]}: {graph.errors[name]}"
+                  for name in [account['verify']] + list(names.values()) if name in graph.errors]
+        timings = [graph.timings[name] for name in names.values()
+                   if name in graph.timings and graph.timings[name][1] is not None]
+        return {
+            'repo': entry['repo'],
+            'account': account['username'],
+            'ok': all(steps.values()),
+            'steps': steps,
+            'error': account['error'] or '; '.join(errors) or None,
+            'elapsed_s': round(max(end for _, end in timings) - min(start for start, _ in timings), 2)
+            if timings else 0.0
+        }
+    
+    def run(self):
+        print(f"🚚 Fleet: provisioning {len(self.entries)} repos "
+              f"({self.max_workers} workers, {self.per_account} per account)...\n")
+        
+        started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        started = time.perf_counter()
+        output = ThreadOutput(sys.stdout)
+        
+        # Every repo's pipeline in one graph - at most per_account in-flight steps per account
+        graph = StepGraph(max_workers=self.max_workers, fail_fast=False,
+                          limits={entry['token']: self.per_account for entry in self.entries})
+        pipelines = []
+        for i, entry in enumerate(self.entries):
+            account = self.account(entry['token'])
+            setup = GitHubAutoSetup(base_dir=self.base_dir, banner=False)
+            setup.load_config(entry)
+            setup.dry_run = self.dry_run
+            setup._api = account['api']
+            setup._secrets_engine = account['secrets']
+            account['setups'].append(setup)
+            if account['verify'] is None:
+                account['verify'] = graph.add(f'{i}:{entry["repo"]}/verify_token',
+                                              self.verify_step(account, setup, output),
+                                              timeout=GitHubAutoSetup.STEP_TIMEOUTS['verify_token'],
+                                              group=entry['token'])
+            names = setup.add_provision_steps(graph, after=[account['verify']], prefix=f'{i}:{entry["repo"]}/',
+                                              output=output, label=entry['repo'], group=entry['token'])
+            pipelines.append((entry, account, names))
+        
+        sys.stdout = output
+        try:
+            graph.run()
+        finally:
+            sys.stdout = output.stream
+        results = [self.entry_result(graph, *pipeline) for pipeline in pipelines]
+        
+        summary = {
+            'started_at': started_at,
+            'elapsed_s': round(time.perf_counter() - started, 2),
+            'total': len(results),
+            'succeeded': sum(1 for result in results if result['ok']),
+            'failed': sum(1 for result in results if not result['ok']),
+            'entries': results,
+            'accounts': [
+                dict(account['api'].summary(), username=account['username'], error=account['error'])
+                for account in self.accounts.values()
+            ]
+        }
+        
+        summary_path = os.path.join(self.base_dir, self.summary_file)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        
+        print("\n" + "=" * 70)
+        print(f"🚚 Fleet done in {summary['elapsed_s']}s: "
+              f"{summary['succeeded']} ok, {summary['failed']} failed")
+        for result in results:
+            status = "✅" if result['ok'] else "❌"
+            detail = result['error'] or ', '.join(k for k, v in result['steps'].items() if not v)
+            print(f"  {status} {result['repo']} ({result['elapsed_s']}s){' - ' + detail if detail else ''}")
+        print(f"📄 Summary: {summary_path}")
+        print("=" * 70 + "\n")
+        
+        return summary['failed'] == 0
+
+
+FFMPEG_BIN = os.environ.get('FFMPEG_BIN', 'ffmpeg')
+FFPROBE_BIN = os.environ.get('FFPROBE_BIN', 'ffprobe')
+DEFAULT_RTMP_URL = 'rtmp://a.rtmp.youtube.com/live2'
+
+# Quality -> (lines, video kbps, audio kbps) - YouTube এর recommended bitrates
+QUALITY_PRESETS = {
+    '240p': (240, 500, 64),
+    '360p': (360, 1000, 96),
+    '480p': (480, 2000, 128),
+    '720p': (720, 4000, 128),
+    '1080p': (1080, 6000, 160),
+    '1440p': (1440, 12000, 192),
+    '2160p': (2160, 25000, 192),
+}
+
+
+# x264 preset এর আনুমানিক relative CPU cost (ladder এ ওঠার আগে CPU হিসাবের জন্য)
+PRESET_COST = {
+    'ultrafast': 0.3, 'superfast': 0.45, 'veryfast': 0.6, 'faster': 0.8,
+    'fast': 0.9, 'medium': 1.0, 'slow': 1.5
+}
+
+
+def default_ladder(quality, preset):
+    """Configured quality থেকে 480p পর্যন্ত, প্রতিটায় configured আর superfast preset"""
+    order = ['2160p', '1440p', '1080p', '720p', '480p']
+    start = order.index(quality) if quality in order else len(order) - 1
+    presets = [preset] if preset == 'superfast' else [preset, 'superfast']
+    rungs = [(q, p) for q in order[start:] for p in presets]
+    return rungs or [(quality, preset)]
+
+
+def parse_ladder(spec, preset):
+    """ENCODE_LADDER="1080p:veryfast,720p:veryfast,480p" -> [(quality, preset)]"""
+    rungs = []
+    for item in spec.split(','):
+        quality, _, rung_preset = item.strip().lower().partition(':')
+        if quality in QUALITY_PRESETS:
+            rungs.append((quality, rung_preset or preset))
+    return rungs
+
+
+def parse_playlist(spec):
+    """VIDEO_URL="a.mp4 | b.mp4" (অথবা newline) -> sources; .m3u/.txt file হলে তার lines"""
+    spec = (spec or '').strip()
+    if spec.lower().endswith(('.m3u', '.m3u8', '.txt')) and os.path.isfile(spec):
+        base = os.path.dirname(spec)
+        with open(spec, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        return [line if '://' in line or os.path.isabs(line) else os.path.join(base, line) for line in lines]
+    return [item.strip() for item in re.split(r'[|\n]', spec) if item.strip()]
+
+
+class CpuSampler:
+    """/proc/stat থেকে পুরো machine এর CPU utilization (0-1)"""
+    
+    def __init__(self):
+        self.last = self._read()
+    
+    @staticmethod
+    def _read():
+        try:
+            with open('/proc/stat', 'r') as f:
+                fields = [float(x) for x in f.readline().split()[1:]]
+            return sum(fields), fields[3] + (fields[4] if len(fields) > 4 else 0.0)
+        except (OSError, ValueError, IndexError):
+            return None
+    
+    def sample(self):
+        current = self._read()
+        if current is None or self.last is None:
+            try:
+                return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+            except (OSError, AttributeError):
+                return None
+        total, idle = current[0] - self.last[0], current[1] - self.last[1]
+        self.last = current
+        if total <= 0:
+            return None
+        return max(0.0, 1.0 - idle / total)
+
+
+class AdaptiveController:
+    """Encode speed আর CPU দেখে encode ladder এ নামো/ওঠো
+    
+    অনেকক্ষণ real time এর নিচে থাকলে এক ধাপ নিচে। উপরের ধাপের আনুমানিক
+    CPU (pixels x preset cost) headroom এর মধ্যে থাকলে তবেই এক ধাপ উপরে।
+    উপরে ওঠার পরপরই আবার নামতে হলে পরের বার ওঠার আগে দ্বিগুণ অপেক্ষা।
+    """
+    
+    def __init__(self, ladder, size_of, down_speed=0.97, down_after=20.0, up_speed=0.99,
+                 up_cpu=0.8, up_after=120.0, warmup=10.0, flap_window=600.0, max_up_after=3600.0):
+        self.ladder = ladder
+        self.size_of = size_of
+        self.down_speed = down_speed
+        self.down_after = down_after
+        self.up_speed = up_speed
+        self.up_cpu = up_cpu
+        self.up_hold = up_after
+        self.warmup = warmup
+        self.flap_window = flap_window
+        self.max_up_after = max_up_after
+        self.level = 0
+        self.last_change = None
+        self.last_direction = None
+        self.reset_window()
+    
+    @property
+    def rung(self):
+        return self.ladder[self.level]
+    
+    @property
+    def at_bottom(self):
+        return self.level >= len(self.ladder) - 1
+    
+    def reset_window(self):
+        """নতুন ffmpeg process - আগের samples বাদ"""
+        self.started = time.monotonic()
+        self.slow_since = None
+        self.headroom_since = None
+    
+    def cost(self, level):
+        quality, preset = self.ladder[level]
+        width, height = self.size_of(quality)
+        return width * height * PRESET_COST.get(preset, 1.0)
+    
+    def observe(self, speed, cpu):
+        """প্রতি second এ একবার - level বদলাতে হলে 'down'/'up', না হলে None"""
+        now = time.monotonic()
+        if speed is None or now - self.started < self.warmup:
+            return None
+        
+        if speed < self.down_speed:
+            self.headroom_since = None
+            if self.slow_since is None:
+                self.slow_since = now
+            if now - self.slow_since >= self.down_after and not self.at_bottom:
+                if self.last_direction == 'up' and now - self.last_change < self.flap_window:
+                    self.up_hold = min(self.max_up_after, self.up_hold * 2)
+                return self._change(self.level + 1, 'down', now)
+            return None
+        self.slow_since = None
+        
+        if self.level == 0 or cpu is None or speed < self.up_speed:
+            self.headroom_since = None
+            return None
+        predicted = cpu * self.cost(self.level - 1) / self.cost(self.level)
+        if predicted >= self.up_cpu:
+            self.headroom_since = None
+            return None
+        if self.headroom_since is None:
+            self.headroom_since = now
+        if now - self.headroom_since >= self.up_hold:
+            return self._change(self.level - 1, 'up', now)
+        return None
+    
+    def _change(self, level, direction, now):
+        self.level = level
+        self.last_change = now
+        self.last_direction = direction
+        self.reset_window()
+        return direction
+
+
+class StreamConfig:
+    """Workflow এর environment variables থেকে streaming settings"""
+    
+    def __init__(self, stream_key, video_url, quality='1080p', aspect_ratio='16:9',
+                 rtmp_url=DEFAULT_RTMP_URL, output=None, preset='veryfast', fps=30,
+                 max_seconds=None, stall_timeout=15.0, slow_timeout=30.0, min_speed=0.95,
+                 max_backoff=30.0, adaptive=True, ladder=None, adaptive_down_after=20.0,
+                 adaptive_up_after=120.0, adaptive_up_cpu=0.8, media_cache=True,
+                 pretranscode='auto', playlist_loop=True, playlist_shuffle=False,
+                 extra_destinations=None, resume=True, state_file=None, checkpoint_interval=15.0,
+                 lease_file=None, lease_url=None, lease_ttl=30.0, run_id=None, readahead=(None, 20.0),
+                 metrics_file=None, metrics_port=None, metrics_interval=15.0, status_every=300.0):
+        self.stream_key = stream_key
+        self.video_url = video_url
+        self.quality = quality if quality in QUALITY_PRESETS else '1080p'
+        self.aspect_ratio = aspect_ratio or '16:9'
+        self.rtmp_url = rtmp_url.rstrip('/')
+        self.output = output
+        self.extra_destinations = list(extra_destinations or [])
+        self.preset = preset
+        self.fps = fps
+        self.max_seconds = max_seconds
+        
+        # Watchdog
+        self.stall_timeout = stall_timeout
+        self.slow_timeout = slow_timeout
+        self.min_speed = min_speed
+        self.max_backoff = max_backoff
+        
+        # Adaptive encode ladder (শুধু re-encode এর সময়)
+        self.adaptive = adaptive
+        self.ladder = ladder or default_ladder(self.quality, preset)
+        self.adaptive_down_after = adaptive_down_after
+        self.adaptive_up_after = adaptive_up_after
+        self.adaptive_up_cpu = adaptive_up_cpu
+        self.media_cache = media_cache
+        # Cache করা যায় না এমন remote source এর read-ahead: (max_bytes, seconds) অথবা None
+        self.readahead = readahead
+        
+        # 'auto': ready থাকলে ব্যবহার করো, না থাকলে background এ বানাও
+        # 'wait': stream শুরুর আগে বানাও, 'off': কখনো না
+        self.pretranscode = pretranscode
+        
+        # একাধিক source হলে একটাই ffmpeg এ playlist হিসেবে চালাও
+        self.playlist = parse_playlist(video_url)
+        self.playlist_loop = playlist_loop
+        self.playlist_shuffle = playlist_shuffle
+        
+        # আগের run যেখানে থেমেছিল সেখান থেকে
+        self.resume = resume
+        self.state_file = state_file or os.path.join(CACHE_DIR, 'playback.json')
+        self.checkpoint_interval = checkpoint_interval
+        
+        # একসাথে চলা runs এর handoff (LEASE_FILE অথবা LEASE_URL দিলে)
+        self.lease_file = lease_file
+        self.lease_url = lease_url
+        self.lease_ttl = lease_ttl
+        self.run_id = run_id or f'pid-{os.getpid()}-{random.getrandbits(32):08x}'
+        
+        # Telemetry: .prom (Prometheus textfile) অথবা .json, আর চাইলে local HTTP
+        self.metrics_file = metrics_file
+        self.metrics_port = metrics_port
+        self.metrics_interval = metrics_interval
+        self.status_every = status_every
+    
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        max_seconds = env.get('STREAM_MAX_SECONDS')
+        return cls(
+            stream_key=env.get('YOUTUBE_STREAM_KEY', '').strip(),
+            video_url=env.get('VIDEO_URL', '').strip(),
+            quality=env.get('VIDEO_QUALITY', '1080p').strip().lower(),
+            aspect_ratio=env.get('ASPECT_RATIO', '16:9').strip(),
+            rtmp_url=env.get('RTMP_URL', DEFAULT_RTMP_URL).strip(),
+            output=env.get('STREAM_OUTPUT') or None,
+            preset=env.get('X264_PRESET', 'veryfast'),
+            fps=int(env.get('STREAM_FPS', '30')),
+            max_seconds=float(max_seconds) if max_seconds else None,
+            stall_timeout=float(env.get('STALL_TIMEOUT', '15')),
+            slow_timeout=float(env.get('SLOW_TIMEOUT', '30')),
+            min_speed=float(env.get('MIN_SPEED', '0.95')),
+            max_backoff=float(env.get('RESTART_MAX_BACKOFF', '30')),
+            adaptive=env.get('ADAPTIVE', '1') not in ('0', 'false', 'no'),
+            ladder=parse_ladder(env.get('ENCODE_LADDER', ''), env.get('X264_PRESET', 'veryfast')) or None,
+            adaptive_down_after=float(env.get('ADAPTIVE_DOWN_AFTER', '20')),
+            adaptive_up_after=float(env.get('ADAPTIVE_UP_AFTER', '120')),
+            adaptive_up_cpu=float(env.get('ADAPTIVE_UP_CPU', '0.8')),
+            media_cache=env.get('MEDIA_CACHE', '1') not in ('0', 'false', 'no'),
+            pretranscode=env.get('PRETRANSCODE', 'auto').strip().lower(),
+            playlist_loop=env.get('PLAYLIST_LOOP', '1') not in ('0', 'false', 'no'),
+            playlist_shuffle=env.get('PLAYLIST_SHUFFLE', '0') not in ('0', 'false', 'no'),
+            extra_destinations=env.get('STREAM_DESTINATIONS', '').split(),
+            resume=env.get('RESUME', '1') not in ('0', 'false', 'no'),
+            state_file=env.get('STREAM_STATE_FILE') or None,
+            checkpoint_interval=float(env.get('CHECKPOINT_INTERVAL', '15')),
+            lease_file=env.get('LEASE_FILE') or None,
+            lease_url=env.get('LEASE_URL') or None,
+            lease_ttl=float(env.get('LEASE_TTL', '30')),
+            readahead=parse_readahead(env.get('READAHEAD', '20s')),
+            metrics_file=env.get('METRICS_FILE', os.path.join(CACHE_DIR, 'stream_metrics.prom')) or None,
+            metrics_port=int(env['METRICS_PORT']) if env.get('METRICS_PORT') else None,
+            metrics_interval=float(env.get('METRICS_INTERVAL', '15')),
+            status_every=float(env.get('STATUS_EVERY', '300')),
+            run_id=(f"{env['GITHUB_RUN_ID']}.{env.get('GITHUB_RUN_ATTEMPT', '1')}"
+                    if env.get('GITHUB_RUN_ID') else None)
+        )
+    
+    @property
+    def destinations(self):
+        """সব outputs - YOUTUBE_STREAM_KEY এ কমা দিয়ে একাধিক key, সাথে STREAM_DESTINATIONS URLs"""
+        if self.output:
+            return [self.output]
+        keys = [key for key in re.split(r'[\s,|]+', self.stream_key or '') if key]
+        return [f'{self.rtmp_url}/{key}' for key in keys] + self.extra_destinations
+    
+    @property
+    def destination(self):
+        """STREAM_OUTPUT (file / 'null') দিলে সেটা, না হলে প্রথম RTMP ingest URL"""
+        destinations = self.destinations
+        return destinations[0] if destinations else f'{self.rtmp_url}/{self.stream_key}'
+    
+    def target_size(self, quality=None):
+        """Quality আর aspect ratio থেকে (width, height) - দুটোই even"""
+        lines = QUALITY_PRESETS[quality or self.quality][0]
+        try:
+            a, b = (float(x) for x in self.aspect_ratio.split(':'))
+        except ValueError:
+            a, b = 16.0, 9.0
+        if a >= b:
+            width, height = lines * a / b, lines
+        else:
+            width, height = lines, lines * b / a
+        return int(round(width / 2)) * 2, int(round(height / 2)) * 2
+
+
+def probe_media(source, timeout=30):
+    """ffprobe দিয়ে source এর codecs, resolution, duration বের করো"""
+    cmd = [
+        FFPROBE_BIN, '-v', 'error',
+        '-show_entries', 'stream=codec_type,codec_name,width,height,pix_fmt,r_frame_rate,sample_rate,channels',
+        '-show_entries', 'format=duration',
+        '-of', 'json', source
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            return None
+        data = json.loads(result.stdout)
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
     
+    info = {'video': None, 'audio': None, 'duration': None}
+    for stream in data.get('streams', []):
+        kind = stream.get('codec_type')
+        if kind in info and info[kind] is None:
+            info[kind] = stream
     try:
-        setup = GitHubAutoSetup()
-        success = setup.run()
+        info['duration'] = float(data.get('format', {}).get('duration'))
+    except (TypeError, ValueError):
+        pass
+    return info
+
+
+class ProgressMonitor:
+    """ffmpeg এর -progress key=value output পড়ে stream এর অবস্থা track করো"""
+    
+    def __init__(self, stall_timeout=15.0, slow_timeout=30.0, min_speed=0.95, startup_timeout=30.0):
+        self.stall_timeout = stall_timeout
+        self.slow_timeout = slow_timeout
+        self.min_speed = min_speed
+        self.startup_timeout = startup_timeout
+        self.check_speed = True
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """নতুন ffmpeg process এর জন্য state শূন্য থেকে শুরু করো"""
+        now = time.monotonic()
+        with self.lock:
+            self.values = {}
+            self.fps = 0.0
+            self.bitrate_kbps = 0.0
+            self.speed = None
+            self.out_time = 0.0
+            self.frame = 0
+            self.total_size = 0
+            self.started_at = now
+            self.last_advance = None
+            self.slow_since = None
+            self.ended = False
+    
+    @staticmethod
+    def _number(value):
+        try:
+            return float(value.rstrip('x').replace('kbits/s', '').strip())
+        except (AttributeError, ValueError):
+            return None
+    
+    def feed(self, line):
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return
+        with self.lock:
+            self.values[key] = value.strip()
+            if key != 'progress':
+                return
+            
+            # এক block শেষ - সব values একসাথে apply করো
+            now = time.monotonic()
+            self.fps = self._number(self.values.get('fps')) or 0.0
+            self.bitrate_kbps = self._number(self.values.get('bitrate')) or 0.0
+            self.frame = int(self._number(self.values.get('frame')) or 0)
+            self.total_size = int(self._number(self.values.get('total_size')) or 0)
+            
+            out_us = self._number(self.values.get('out_time_us') or self.values.get('out_time_ms'))
+            if out_us is not None and out_us / 1e6 > self.out_time:
+                self.out_time = out_us / 1e6
+                self.last_advance = now
+            
+            self.speed = self._number(self.values.get('speed'))
+            if self.speed is not None and self.speed < self.min_speed:
+                if self.slow_since is None:
+                    self.slow_since = now
+            else:
+                self.slow_since = None
+            
+            if value.strip() == 'end':
+                self.ended = True
+    
+    def read(self, stream):
+        """Background thread: process এর stdout শেষ না হওয়া পর্যন্ত পড়ো"""
+        for raw in iter(stream.readline, b''):
+            self.feed(raw.decode('utf-8', 'replace'))
+    
+    def stalled(self):
+        """Stream আটকে গেলে কারণটা ফেরত দাও, না হলে None"""
+        now = time.monotonic()
+        with self.lock:
+            if self.last_advance is None:
+                if now - self.started_at > self.startup_timeout:
+                    return f'no output after {self.startup_timeout:.0f}s'
+                return None
+            if now - self.last_advance > self.stall_timeout:
+                return f'out_time stuck at {self.out_time:.1f}s for {now - self.last_advance:.0f}s'
+            if self.check_speed and self.slow_since is not None and now - self.slow_since > self.slow_timeout:
+                return f'speed {self.speed:.2f}x below {self.min_speed}x for {now - self.slow_since:.0f}s'
+        return None
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                'fps': self.fps,
+                'bitrate_kbps': self.bitrate_kbps,
+                'speed': self.speed,
+                'out_time': round(self.out_time, 2),
+                'frame': self.frame,
+                'total_size': self.total_size,
+                'drop_frames': int(self._number(self.values.get('drop_frames')) or 0),
+                'dup_frames': int(self._number(self.values.get('dup_frames')) or 0)
+            }
+
+
+class MediaFetcher:
+    """VIDEO_URL একবার download করে local cache এ রাখো
+    
+    File টা parallel HTTP Range chunks এ আসে, প্রতিটা chunk আলাদা .part file এ,
+    তাই মাঝপথে বন্ধ হলে পরের run সেখান থেকেই resume করে। Cache directory
+    এর নাম URL + ETag/Last-Modified + Content-Length থেকে, তাই origin এ file
+    বদলালে নতুন করে download হয়।
+    """
+    
+    BLOCK_SIZE = 1024 * 1024
+    # HLS/DASH manifests: local copy তে relative segment URIs আর resolve হয় না
+    MANIFEST_EXTENSIONS = ('.m3u8', '.mpd')
+    MANIFEST_TYPES = {'application/vnd.apple.mpegurl', 'application/x-mpegurl', 'audio/mpegurl',
+                      'audio/x-mpegurl', 'application/dash+xml'}
+    
+    def __init__(self, cache_dir=None, chunks=4, min_chunk=8 * 1024 * 1024, timeout=30, retries=5):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, 'media')
+        self.chunks = chunks
+        self.min_chunk = min_chunk
+        self.timeout = timeout
+        self.retries = retries
+        # fetch() None দিলে কেন: 'manifest', 'live' অথবা 'failed'
+        self.skipped = None
+    
+    @classmethod
+    def is_manifest(cls, url, content_type=None):
+        """HLS/DASH playlist কিনা - extension অথবা Content-Type দেখে"""
+        if url.split('?', 1)[0].lower().endswith(cls.MANIFEST_EXTENSIONS):
+            return True
+        return (content_type or '').split(';', 1)[0].strip().lower() in cls.MANIFEST_TYPES
+    
+    @classmethod
+    def cacheable(cls, url):
+        return url.lower().startswith(('http://', 'https://')) and not cls.is_manifest(url)
+    
+    def head(self, url):
+        """Size, validators আর Range support জানো (HEAD না চললে 1-byte Range GET)"""
+        import urllib.request
+        import urllib.error
+        
+        for method, headers in (('HEAD', {}), ('GET', {'Range': 'bytes=0-0'})):
+            request = urllib.request.Request(url, method=method, headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    length = response.headers.get('Content-Length')
+                    content_range = response.headers.get('Content-Range', '')
+                    if response.status == 206 and '/' in content_range:
+                        length = content_range.rsplit('/', 1)[1]
+                    accept_ranges = (response.status == 206
+                                     or response.headers.get('Accept-Ranges', '').lower() == 'bytes')
+                    return {
+                        'url': response.geturl(),
+                        'length': int(length) if length and length.isdigit() else None,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'accept_ranges': accept_ranges,
+                        'content_type': response.headers.get('Content-Type')
+                    }
+            except urllib.error.HTTPError as e:
+                if e.code in (403, 405, 501):
+                    continue
+                return None
+            except (OSError, ValueError):
+                return None
+        return None
+    
+    def cache_key(self, url, info):
+        identity = f"{url}\n{info.get('etag') or info.get('last_modified') or ''}\n{info['length']}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:24]
+    
+    def _index_path(self):
+        return os.path.join(self.cache_dir, 'index.json')
+    
+    def _load_index(self):
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self, index):
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self._index_path())
+    
+    def cached(self, url):
+        """Network ছাড়াই আগের complete download খুঁজে দেখো"""
+        entry = self._load_index().get(url)
+        if not entry:
+            return None
+        path = os.path.join(self.cache_dir, entry['key'], entry['name'])
+        if os.path.exists(path) and os.path.getsize(path) == entry['length']:
+            return path
+        return None
+    
+    def fetch(self, url):
+        """Local path ফেরত দাও - cache না করা গেলে (live stream, size অজানা) None"""
+        self.skipped = None
+        info = self.head(url)
+        if info is None:
+            cached = self.cached(url)
+            if cached:
+                print("  ⚠️  Origin unreachable - using cached copy")
+            else:
+                self.skipped = 'failed'
+            return cached
+        if self.is_manifest(info['url'], info['content_type']):
+            self.skipped = 'manifest'
+            return None
+        if not info['length']:
+            self.skipped = 'live'
+            return None
+        
+        key = self.cache_key(url, info)
+        directory = os.path.join(self.cache_dir, key)
+        suffix = os.path.splitext(url.split('?', 1)[0])[1][:8] or '.media'
+        name = 'media' + suffix
+        path = os.path.join(directory, name)
+        
+        if os.path.exists(path) and os.path.getsize(path) == info['length']:
+            print(f"  ✅ Media cache hit ({info['length'] / 1e6:.1f} MB)")
+            return path
+        
+        os.makedirs(directory, exist_ok=True)
+        started = time.monotonic()
+        if not self._download(info, directory, path):
+            self.skipped = 'failed'
+            return None
+        elapsed = max(time.monotonic() - started, 0.001)
+        print(f"  ✅ Downloaded {info['length'] / 1e6:.1f} MB in {elapsed:.1f}s "
+              f"({info['length'] * 8 / elapsed / 1e6:.1f} Mbit/s)")
+        
+        # পুরনো versions মুছে index update করো
+        index = self._load_index()
+        old = index.get(url)
+        if old and old['key'] != key:
+            import shutil
+            shutil.rmtree(os.path.join(self.cache_dir, old['key']), ignore_errors=True)
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        index[url] = {'key': key, 'name': name, 'length': info['length'], 'sha256': meta['sha256']}
+        self._save_index(index)
+        return path
+    
+    def ranges(self, info):
+        length = info['length']
+        if not info['accept_ranges'] or length < self.min_chunk * 2:
+            return [(0, length - 1)]
+        count = min(self.chunks, length // self.min_chunk)
+        size = -(-length // count)
+        return [(start, min(start + size, length) - 1) for start in range(0, length, size)]
+    
+    def _download(self, info, directory, path):
+        from concurrent.futures import ThreadPoolExecutor
+        
+        ranges = self.ranges(info)
+        print(f"  📥 Downloading media in {len(ranges)} chunk(s)...")
+        parts = [os.path.join(directory, f'part{i}') for i in range(len(ranges))]
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            results = list(pool.map(
+                lambda job: self._download_part(info, job[0], job[1], info['accept_ranges']),
+                zip(parts, ranges)
+            ))
+        if not all(results):
+            print("  ⚠️  Media download incomplete - will resume next time")
+            return False
+        
+        # Parts জোড়া লাগাও, সাথে content hash (pre-transcode cache key এর জন্য)
+        digest = hashlib.sha256()
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as out:
+            for part in parts:
+                with open(part, 'rb') as f:
+                    for block in iter(lambda: f.read(self.BLOCK_SIZE), b''):
+                        digest.update(block)
+                        out.write(block)
+        if os.path.getsize(tmp_path) != info['length']:
+            print("  ❌ Downloaded size does not match Content-Length")
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        for part in parts:
+            os.remove(part)
+        
+        meta = dict(info, sha256=digest.hexdigest(), downloaded_at=time.time())
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        return True
+    
+    def _download_part(self, info, part, byte_range, ranged):
+        """একটা chunk download করো - আগে যতটুকু এসেছে তার পর থেকে"""
+        import urllib.request
+        import urllib.error
+        
+        start, end = byte_range
+        expected = end - start + 1
+        for attempt in range(self.retries):
+            have = os.path.getsize(part) if os.path.exists(part) else 0
+            if have > expected or (have and not ranged):
+                have = 0
+                os.remove(part)
+            if have == expected:
+                return True
+            
+            headers = {}
+            if ranged:
+                headers['Range'] = f'bytes={start + have}-{end}'
+                # Origin এ file বদলে গেলে server পুরো file (200) পাঠাবে
+                if info.get('etag') or info.get('last_modified'):
+                    headers['If-Range'] = info.get('etag') or info.get('last_modified')
+            request = urllib.request.Request(info['url'], headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    if ranged and response.status != 206:
+                        print("  ⚠️  Origin changed during download")
+                        if os.path.exists(part):
+                            os.remove(part)
+                        return False
+                    with open(part, 'ab') as f:
+                        for block in iter(lambda: response.read(self.BLOCK_SIZE), b''):
+                            f.write(block)
+            except (OSError, urllib.error.URLError):
+                time.sleep(min(30, 2 ** attempt))
+                continue
+            if os.path.getsize(part) == expected:
+                return True
+        return False
+
+
+def parse_readahead(spec):
+    """READAHEAD="20s" / "16MB" / "8388608" -> (max_bytes, seconds); "0" হলে None"""
+    spec = (spec or '').strip().lower()
+    match = re.match(r'^(\d+(?:\.\d+)?)\s*(s|kb|mb|gb|b)?$', spec)
+    if not match or float(match.group(1)) <= 0:
+        return None
+    value, unit = float(match.group(1)), match.group(2) or 'b'
+    if unit == 's':
+        return None, value
+    return int(value * {'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3}[unit]), None
+
+
+class ReadAheadBuffer:
+    """Remote live source আর ffmpeg এর মাঝে in-memory read-ahead buffer
+    
+    Background reader thread source থেকে পড়ে buffer ভরে রাখে, writer thread
+    সেখান থেকে ffmpeg এর stdin এ লেখে, তাই network এর ছোট hiccup এ ffmpeg
+    আটকায় না। Connection ছিঁড়লে (বা source শেষ হলে) backoff দিয়ে চুপচাপ আবার
+    connect। Size seconds এ দিলে মাপা consumption rate দিয়ে bytes হয়।
+    """
+    
+    BLOCK_SIZE = 64 * 1024
+    MIN_RATE = 256 * 1024
+    MAX_BYTES = 256 * 1024 * 1024
+    REPORT_EVERY = 60.0
+    UNDERRUN_AFTER = 0.1
+    
+    def __init__(self, url, max_bytes=None, seconds=None, prebuffer=0.5, prebuffer_timeout=10.0,
+                 timeout=15, max_backoff=30.0):
+        from collections import deque
+        
+        self.url = url
+        self.max_bytes = max_bytes
+        self.seconds = seconds if max_bytes is None else None
+        self.prebuffer = prebuffer
+        self.prebuffer_timeout = prebuffer_timeout
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.blocks = deque()
+        self.fill = 0
+        self.rate = 0.0
+        self.changed = threading.Condition()
+        self.sink = None
+        self.attached = False
+        self.generation = 0
+        self.primed = False
+        self.stopping = False
+        self.min_fill_ratio = None
+        self.counters = {'connects': 0, 'reconnects': 0, 'underruns': 0, 'underrun_seconds': 0.0,
+                         'bytes_in': 0, 'bytes_out': 0}
+    
+    def capacity(self):
+        if self.seconds is None:
+            return self.max_bytes or 16 * 1024 * 1024
+        return int(min(self.MAX_BYTES, self.seconds * max(self.rate, self.MIN_RATE)))
+    
+    def start(self):
+        threading.Thread(target=self.read_source, daemon=True).start()
+        threading.Thread(target=self.write_sink, daemon=True).start()
+    
+    def attach(self, sink):
+        """নতুন ffmpeg এর stdin - আগে কেউ থাকলে নতুন process যাতে container এর শুরু পায়, তাই source reconnect"""
+        with self.changed:
+            if self.attached:
+                self.blocks.clear()
+                self.fill = 0
+                self.primed = False
+                self.generation += 1
+            self.attached = True
+            self.sink = sink
+            self.changed.notify_all()
+    
+    def put(self, block, generation):
+        """Buffer ভরা থাকলে জায়গা হওয়া পর্যন্ত অপেক্ষা (source এর দিকে backpressure)"""
+        with self.changed:
+            while (self.fill + len(block) > self.capacity() and self.blocks
+                   and not self.stopping and generation == self.generation):
+                self.changed.wait(timeout=0.5)
+            if self.stopping or generation != self.generation:
+                return False
+            self.blocks.append(block)
+            self.fill += len(block)
+            self.counters['bytes_in'] += len(block)
+            self.changed.notify_all()
+            return True
+    
+    def read_source(self):
+        """Background thread: source থেকে পড়ো, ভুল হলে backoff দিয়ে reconnect"""
+        import urllib.request
+        import urllib.error
+        
+        failures = 0
+        while not self.stopping:
+            generation = self.generation
+            received = 0
+            reason = 'source ended'
+            try:
+                with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                    self.counters['connects'] += 1
+                    for block in iter(lambda: response.read1(self.BLOCK_SIZE), b''):
+                        if not self.put(block, generation):
+                            break
+                        received += len(block)
+            except (OSError, ValueError, urllib.error.URLError) as e:
+                reason = str(e)
+            if self.stopping:
+                break
+            if generation != self.generation:
+                continue
+            
+            # কিছু data আসার পরে ছিঁড়লে সেটা নতুন failure streak
+            failures = 1 if received else failures + 1
+            delay = min(self.max_backoff, 0.5 * 2 ** (failures - 1))
+            self.counters['reconnects'] += 1
+            print(f"  ⚠️  Source read failed ({reason}) - reconnecting in {delay:.1f}s "
+                  f"({self.fill / 1e6:.1f} MB buffered)")
+            deadline = time.monotonic() + delay
+            while not self.stopping and time.monotonic() < deadline:
+                time.sleep(0.1)
+    
+    def write_sink(self):
+        """Background thread: buffer থেকে ffmpeg এর stdin এ লেখো"""
+        last_report = time.monotonic()
+        window_start, window_bytes = time.monotonic(), 0
+        while not self.stopping:
+            with self.changed:
+                while self.sink is None and not self.stopping:
+                    self.changed.wait(timeout=1.0)
+                
+                if not self.primed:
+                    # শুরুতে (আর reconnect এর পরে) কিছুটা ভরে নাও
+                    deadline = time.monotonic() + self.prebuffer_timeout
+                    while (self.fill < self.capacity() * self.prebuffer and not self.stopping
+                           and time.monotonic() < deadline):
+                        self.changed.wait(timeout=0.2)
+                    self.primed = True
+                
+                underrun_since = None
+                while not self.blocks and not self.stopping:
+                    if underrun_since is None:
+                        underrun_since = time.monotonic()
+                    self.changed.wait(timeout=0.5)
+                if underrun_since is not None:
+                    waited = time.monotonic() - underrun_since
+                    self.counters['underrun_seconds'] += waited
+                    # Block এর মাঝের কয়েক ms এর ফাঁক underrun নয়
+                    if waited >= self.UNDERRUN_AFTER:
+                        self.counters['underruns'] += 1
+                if self.stopping:
+                    break
+                
+                block = self.blocks.popleft()
+                self.fill -= len(block)
+                sink = self.sink
+                ratio = self.fill / max(self.capacity(), 1)
+                self.min_fill_ratio = ratio if self.min_fill_ratio is None else min(self.min_fill_ratio, ratio)
+                self.changed.notify_all()
+            
+            try:
+                sink.write(block)
+                sink.flush()
+            except (OSError, ValueError):
+                with self.changed:
+                    if self.sink is sink:
+                        self.sink = None
+                continue
+            self.counters['bytes_out'] += len(block)
+            
+            # Consumption rate (ffmpeg -re তে media bitrate এর সমান)
+            now = time.monotonic()
+            window_bytes += len(block)
+            if now - window_start >= 5.0:
+                measured = window_bytes / (now - window_start)
+                self.rate = measured if not self.rate else self.rate * 0.7 + measured * 0.3
+                window_start, window_bytes = now, 0
+            if now - last_report >= self.REPORT_EVERY:
+                last_report = now
+                self.report()
+    
+    def stats(self):
+        with self.changed:
+            capacity = self.capacity()
+            stats = dict(self.counters)
+            stats.update(
+                fill_bytes=self.fill,
+                capacity_bytes=capacity,
+                fill_ratio=round(self.fill / capacity, 3) if capacity else 0.0,
+                fill_seconds=round(self.fill / self.rate, 2) if self.rate else None,
+                min_fill_ratio=self.min_fill_ratio,
+                rate_bytes=round(self.rate),
+                underrun_seconds=round(self.counters['underrun_seconds'], 2)
+            )
+            return stats
+    
+    def report(self):
+        """এক লাইনে buffer এর অবস্থা - per-block log নয়"""
+        stats = self.stats()
+        self.min_fill_ratio = None
+        seconds = f", {stats['fill_seconds']:.0f}s" if stats['fill_seconds'] else ''
+        print(f"  📦 Read-ahead {stats['fill_ratio'] * 100:.0f}% full "
+              f"(min {(stats['min_fill_ratio'] or 0) * 100:.0f}%{seconds}), "
+              f"{stats['underruns']} underruns ({stats['underrun_seconds']:.1f}s), "
+              f"{stats['reconnects']} reconnects")
+    
+    def stop(self):
+        with self.changed:
+            self.stopping = True
+            self.changed.notify_all()
+
+
+def source_digest(path):
+    """Media file এর sha256 - MediaFetcher এর meta.json থাকলে সেখান থেকে, না হলে হিসাব করে memo তে রাখো"""
+    meta_path = os.path.join(os.path.dirname(path), 'meta.json')
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            digest = json.load(f).get('sha256')
+        if digest:
+            return digest
+    except (OSError, ValueError):
+        pass
+    
+    stat = os.stat(path)
+    memo_path = os.path.join(CACHE_DIR, 'digests.json')
+    memo_key = f'{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}'
+    try:
+        with open(memo_path, 'r', encoding='utf-8') as f:
+            memo = json.load(f)
+    except (OSError, ValueError):
+        memo = {}
+    if memo_key in memo:
+        return memo[memo_key]
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    memo[memo_key] = digest.hexdigest()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(memo_path, 'w', encoding='utf-8') as f:
+        json.dump(memo, f, indent=2)
+    return memo[memo_key]
+
+
+def keyframe_index(path, timeout=600):
+    """Media এর video keyframes এর pts (seconds) - একবার ffprobe, তারপর cache থেকে
+    
+    শুধু packet flags পড়ে (decode নেই), তাই লম্বা file এও দ্রুত।
+    """
+    cache_path = os.path.join(CACHE_DIR, 'keyframes', f'{source_digest(path)[:24]}.json')
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    
+    cmd = [FFPROBE_BIN, '-v', 'error', '-select_streams', 'v:0',
+           '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    
+    index = []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(',')
+        if 'K' in flags:
+            try:
+                index.append(round(float(pts), 3))
+            except ValueError:
+                continue
+    index.sort()
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    return index
+
+
+def nearest_keyframe(index, position):
+    """position এর আগের (বা সমান) শেষ keyframe - সেখানে input seek এ decode লাগে না"""
+    import bisect
+    
+    if not index:
+        return position
+    i = bisect.bisect_right(index, position)
+    return index[i - 1] if i else index[0]
+
+
+class PlaybackState:
+    """Run থেকে run এ playback position মনে রাখো
+    
+    ছোট একটা JSON (workflow cache এ cache directory এর সাথে থাকে)। VIDEO_URL
+    বদলালে পুরনো position বাদ।
+    """
+    
+    def __init__(self, path, video_url, interval=15.0):
+        self.path = path
+        self.video_url = video_url
+        self.interval = interval
+        self.last_save = 0.0
+    
+    def load(self):
+        """আগের run এর {'source', 'position'} - না থাকলে None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('video_url') != self.video_url or not state.get('source'):
+            return None
+        return state
+    
+    def save(self, source, position):
+        state = {'video_url': self.video_url, 'source': source,
+                 'position': round(position, 3), 'updated_at': time.time()}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.last_save = time.monotonic()
+    
+    def checkpoint(self, source, position):
+        """প্রতি interval এ একবার save করো"""
+        if source is None or position is None:
+            return
+        if time.monotonic() - self.last_save >= self.interval:
+            try:
+                self.save(source, position)
+            except OSError:
+                pass
+
+
+class PreTranscoder:
+    """Source কে একবার RTMP-ready H.264/AAC MPEG-TS segments এ convert করো
+    
+    Fixed GOP (2s) আর segment boundary তে keyframe, তাই পরের সব run শুধু
+    concat + -c copy। Output এর key = (source sha256, quality, aspect, fps, preset),
+    থাকে CACHE_DIR/transcoded/<key>/ এ। মাঝপথে থামলে শেষ complete segment এর
+    পর থেকে resume হয়।
+    """
+    
+    VERSION = 1
+    SEGMENT_SECONDS = 10
+    
+    def __init__(self, config, cache_dir=None):
+        self.config = config
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, 'transcoded')
+        self.process = None
+        self.stopping = False
+    
+    def key(self, source):
+        config = self.config
+        identity = (f'{self.VERSION}|{source_digest(source)}|{config.quality}|'
+                    f'{config.aspect_ratio}|{config.fps}|{config.preset}')
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:24]
+    
+    def ready(self, source):
+        """আগে থেকে complete হলে manifest, না হলে None"""
+        directory = os.path.join(self.cache_dir, self.key(source))
+        try:
+            with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        manifest['playlist'] = os.path.join(directory, 'playlist.ffconcat')
+        return manifest if os.path.exists(manifest['playlist']) else None
+    
+    @staticmethod
+    def probe_info(manifest):
+        """Manifest থেকেই probe এর মত info - ffprobe চালানোর দরকার নেই"""
+        return {
+            'video': {'codec_name': 'h264', 'pix_fmt': 'yuv420p',
+                      'width': manifest['width'], 'height': manifest['height']},
+            'audio': {'codec_name': 'aac'},
+            'duration': manifest.get('duration')
+        }
+    
+    def encode_args(self, has_audio=True):
+        """Source (input 0, silent audio input 1) থেকে fixed-GOP H.264/AAC"""
+        config = self.config
+        width, height = config.target_size()
+        _, video_kbps, audio_kbps = QUALITY_PRESETS[config.quality]
+        gop = config.fps * 2
+        return [
+            '-map', '0:v:0', '-map', '0:a:0' if has_audio else '1:a:0',
+            '-vf', (f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
+                    f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={config.fps}'),
+            '-c:v', 'libx264', '-preset', config.preset, '-pix_fmt', 'yuv420p',
+            '-b:v', f'{video_kbps}k', '-maxrate', f'{video_kbps}k', '-bufsize', f'{video_kbps * 2}k',
+            '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0',
+            '-force_key_frames', f'expr:gte(t,n_forced*{gop // config.fps})',
+            '-c:a', 'aac', '-b:a', f'{audio_kbps}k', '-ar', '44100', '-ac', '2'
+        ]
+    
+    def build_command(self, source, directory, start_number=0, probe=None):
+        has_audio = bool((probe or {}).get('audio')) or probe is None
+        
+        cmd = [FFMPEG_BIN, '-hide_banner', '-loglevel', 'error', '-nostdin', '-y']
+        if start_number:
+            # Transcode এর সময় -ss frame-accurate, তাই segment boundary ঠিক থাকে
+            cmd += ['-ss', str(start_number * self.SEGMENT_SECONDS)]
+        cmd += ['-i', source]
+        if not has_audio:
+            cmd += ['-f', 'lavfi', '-i', 'anullsrc=channel_layout=stereo:sample_rate=44100', '-shortest']
+        cmd += self.encode_args(has_audio)
+        cmd += [
+            '-f', 'segment', '-segment_time', str(self.SEGMENT_SECONDS),
+            '-segment_format', 'mpegts', '-segment_start_number', str(start_number),
+            '-reset_timestamps', '1',
+            os.path.join(directory, 'seg%05d.ts')
+        ]
+        return cmd
+    
+    def run(self, source, background=False):
+        """Blocking transcode - শেষ হলে manifest, না হলে None"""
+        key = self.key(source)
+        directory = os.path.join(self.cache_dir, key)
+        partial = directory + '.partial'
+        os.makedirs(partial, exist_ok=True)
+        
+        # শেষ segment টা অসম্পূর্ণ হতে পারে - বাদ দিয়ে তার থেকে resume করো
+        segments = sorted(name for name in os.listdir(partial) if name.endswith('.ts'))
+        if segments:
+            os.remove(os.path.join(partial, segments.pop()))
+        start_number = len(segments)
+        
+        probe = probe_media(source)
+        cmd = self.build_command(source, partial, start_number, probe)
+        print(f"  🛠️  Pre-transcoding to {self.config.quality}"
+              f"{f' (resuming at {start_number * self.SEGMENT_SECONDS}s)' if start_number else ''}...")
+        
+        started = time.monotonic()
+        preexec = None
+        if background and hasattr(os, 'nice'):
+            # শুধু idle CPU ব্যবহার করো - live stream এর ভাগে হাত দিও না
+            preexec = lambda: os.nice(19)
+        try:
+            self.process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, preexec_fn=preexec)
+        except OSError as e:
+            print(f"  ❌ Could not start ffmpeg: {e}")
+            return None
+        returncode = self.process.wait()
+        if returncode != 0 or self.stopping:
+            if not self.stopping:
+                print(f"  ⚠️  Pre-transcode failed (code {returncode}) - will resume next time")
+            return None
+        
+        segments = sorted(name for name in os.listdir(partial) if name.endswith('.ts'))
+        with open(os.path.join(partial, 'playlist.ffconcat'), 'w', encoding='utf-8') as f:
+            f.write('ffconcat version 1.0\n')
+            for name in segments:
+                f.write(f"file '{name}'\n")
+        
+        width, height = self.config.target_size()
+        manifest = {
+            'version': self.VERSION,
+            'key': key,
+            'source_sha256': source_digest(source),
+            'quality': self.config.quality,
+            'aspect_ratio': self.config.aspect_ratio,
+            'fps': self.config.fps,
+            'width': width,
+            'height': height,
+            'segment_seconds': self.SEGMENT_SECONDS,
+            'segments': len(segments),
+            'duration': (probe or {}).get('duration'),
+            'created_at': time.time()
+        }
+        with open(os.path.join(partial, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        if os.path.exists(directory):
+            import shutil
+            shutil.rmtree(directory, ignore_errors=True)
+        os.replace(partial, directory)
+        
+        elapsed = time.monotonic() - started
+        duration = manifest['duration'] or 0
+        print(f"  ✅ Pre-transcoded {len(segments)} segments in {elapsed:.0f}s"
+              f"{f' ({duration / max(elapsed, 0.001):.1f}x real time)' if duration else ''}")
+        return self.ready(source)
+    
+    def start_background(self, source):
+        thread = threading.Thread(target=self.run, args=(source, True), daemon=True)
+        thread.start()
+        return thread
+    
+    def stop(self):
+        self.stopping = True
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+
+class PlaylistFeeder:
+    """Playlist এর items একটার পর একটা MPEG-TS হিসেবে relay ffmpeg এর stdin এ পাঠাও
+    
+    Relay ffmpeg (-c copy -> RTMP) পুরো সময় একটাই চলে, তাই item বদলালে RTMP
+    reconnect বা encoder re-init হয় না। প্রতিটা item এর জন্য ছোট একটা feeder
+    ffmpeg pre-transcoded segments stream copy করে (না থাকলে একই settings এ
+    encode করে), আর -output_ts_offset দিয়ে আগের item যেখানে শেষ সেখান থেকে
+    timestamps চালায়। এক item চলার সময় পরেরটা background এ download আর
+    pre-transcode হয়।
+    """
+    
+    BLOCK_SIZE = 188 * 1024
+    
+    def __init__(self, config, sources=None):
+        self.config = config
+        self.sources = list(sources or config.playlist)
+        self.queue = []
+        self.passes = 0
+        self.current = None
+        self.offset = 0.0
+        self.sink = None
+        self.sink_changed = threading.Condition()
+        self.process = None
+        self.stopping = False
+        self.finished = False
+        self.prepared = {}
+        self.preparing = {}
+        self.transcoders = []
+        self.start_at = {}
+        self.timeline = []
+        self.counters = {'items': 0, 'copies': 0, 'live_encodes': 0, 'failed': 0, 'replays': 0}
+    
+    def upcoming(self):
+        """পরের item (queue থেকে সরায় না) - loop বন্ধ আর playlist শেষ হলে None"""
+        if not self.queue:
+            if self.passes and not self.config.playlist_loop:
+                return None
+            order = list(self.sources)
+            if self.config.playlist_shuffle and len(order) > 1:
+                random.shuffle(order)
+                # নতুন pass এর শুরুতে একই item পরপর দুবার না
+                if order[0] == self.current:
+                    order.append(order.pop(0))
+            self.queue = order
+            self.passes += 1
+        return self.queue[0]
+    
+    def resume(self, source, position):
+        """আগের run এর item থেকে শুরু করো, প্রথমবার position থেকে"""
+        if source not in self.sources:
+            return False
+        self.upcoming()
+        if not self.config.playlist_shuffle:
+            self.queue = self.sources[self.sources.index(source):]
+        elif source in self.queue:
+            self.queue.remove(source)
+            self.queue.insert(0, source)
+        self.start_at[source] = position
+        return True
+    
+    def position(self, relay_time):
+        """Relay এর out_time থেকে (source, item এর ভেতরের position)"""
+        for offset, source, start in reversed(self.timeline):
+            if relay_time >= offset:
+                return source, start + relay_time - offset
+        return None, None
+    
+    def seek_point(self, path, start, manifest):
+        """start এর আগের keyframe - input seek তখন instant"""
+        if manifest:
+            # Pre-transcoded segments এ প্রতি 2s এ keyframe
+            return start - start % 2
+        if os.path.isfile(path):
+            return nearest_keyframe(keyframe_index(path), start)
+        return start
+    
+    def resolve(self, source):
+        """Local path (media cache থেকে) - cache করা না গেলে source নিজেই"""
+        if source in self.prepared:
+            return self.prepared[source]
+        path = source
+        if self.config.media_cache and MediaFetcher.cacheable(source):
+            fetcher = MediaFetcher()
+            path = fetcher.cached(source) or fetcher.fetch(source) or source
+        self.prepared[source] = path
+        return path
+    
+    def warm_up(self):
+        """প্রথম item টা relay শুরুর আগেই তৈরি রাখো (startup watchdog এর জন্য)"""
+        source = self.upcoming()
+        if source is None:
+            return False
+        if self.config.pretranscode == 'wait':
+            self._prefetch(source)
+        else:
+            self.resolve(source)
+        return True
+    
+    def prefetch(self, source):
+        if source in self.preparing:
+            return
+        thread = threading.Thread(target=self._prefetch, args=(source,), daemon=True)
+        self.preparing[source] = thread
+        thread.start()
+    
+    def _prefetch(self, source):
+        try:
+            path = self.resolve(source)
+            if self.config.pretranscode != 'off' and os.path.isfile(path) and not self.stopping:
+                transcoder = PreTranscoder(self.config)
+                if transcoder.ready(path) is None:
+                    self.transcoders.append(transcoder)
+                    transcoder.run(path, background=True)
+        finally:
+            self.preparing.pop(source, None)
+    
+    def item_command(self, source, start=0.0):
+        """Item এর feeder ffmpeg command, সেটা stream copy কিনা, আর আসল start"""
+        config = self.config
+        thread = self.preparing.get(source)
+        if thread and config.pretranscode == 'wait':
+            thread.join()
+        # Download এখনো চলছে - একই part files এ দ্বিতীয় download না করে সরাসরি পড়ো
+        path = self.prepared.get(source) or (source if thread else self.resolve(source))
+        
+        manifest = None
+        if config.pretranscode != 'off' and os.path.isfile(path):
+            manifest = PreTranscoder(config).ready(path)
+        
+        cmd = [FFMPEG_BIN, '-hide_banner', '-loglevel', 'error', '-nostdin',
+               '-progress', 'pipe:2', '-nostats']
+        if start:
+            start = self.seek_point(path, start, manifest)
+            cmd += ['-ss', f'{start:.3f}']
+        if manifest:
+            cmd += ['-f', 'concat', '-safe', '0', '-i', manifest['playlist'],
+                    '-map', '0:v:0', '-map', '0:a:0', '-c', 'copy']
+        else:
+            probe = probe_media(path)
+            has_audio = bool((probe or {}).get('audio')) or probe is None
+            cmd += ['-i', path]
+            if not has_audio:
+                cmd += ['-f', 'lavfi', '-i', 'anullsrc=channel_layout=stereo:sample_rate=44100', '-shortest']
+            cmd += PreTranscoder(config).encode_args(has_audio)
+        cmd += ['-output_ts_offset', f'{self.offset:.3f}', '-f', 'mpegts', 'pipe:1']
+        return cmd, bool(manifest), start
+    
+    def attach(self, sink):
+        """নতুন relay process এর stdin - তার timestamps আবার শূন্য থেকে"""
+        with self.sink_changed:
+            self.sink = sink
+            self.offset = 0.0
+            self.timeline = []
+            self.sink_changed.notify_all()
+    
+    def wait_sink(self):
+        with self.sink_changed:
+            while self.sink is None and not self.stopping:
+                self.sink_changed.wait(timeout=1.0)
+            return self.sink
+    
+    def start(self):
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Background thread: playlist শেষ (অথবা stop) না হওয়া পর্যন্ত items পাঠাও"""
+        while not self.stopping:
+            source = self.upcoming()
+            if source is None:
+                break
+            sink = self.wait_sink()
+            if sink is None:
+                break
+            
+            self.current = self.queue.pop(0)
+            following = self.upcoming()
+            if following is not None and following != source:
+                self.prefetch(following)
+            
+            played = self.play(source, sink)
+            if played is None:
+                # Relay বন্ধ হয়ে গেছে - নতুন relay এ একই item, যেখানে থেমেছিল তার আগের keyframe থেকে
+                self.queue.insert(0, source)
+                self.counters['replays'] += 1
+            elif not played:
+                self.counters['failed'] += 1
+                time.sleep(1.0)
+        
+        self.finished = not self.stopping
+        with self.sink_changed:
+            if self.sink is not None:
+                try:
+                    self.sink.close()
+                except OSError:
+                    pass
+    
+    def play(self, source, sink):
+        """একটা item relay এ পাঠাও - শেষ হলে True, item fail হলে False, relay গেলে None"""
+        cmd, copy, start = self.item_command(source, self.start_at.pop(source, 0.0))
+        monitor = ProgressMonitor()
+        try:
+            self.process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL,
+                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"  ❌ Could not start ffmpeg: {e}")
+            return False
+        threading.Thread(target=monitor.read, args=(self.process.stderr,), daemon=True).start()
+        
+        name = os.path.basename(source.split('?', 1)[0]) or source
+        self.counters['items'] += 1
+        self.counters['copies' if copy else 'live_encodes'] += 1
+        self.timeline = self.timeline[-3:] + [(self.offset, source, start)]
+        print(f"  ▶️  Playlist: {name} ({'stream copy' if copy else 'live encode'}, "
+              f"at {self.offset:.0f}s{f', from {start:.0f}s' if start else ''})")
+        
+        written = 0
+        for block in iter(lambda: self.process.stdout.read1(self.BLOCK_SIZE), b''):
+            try:
+                sink.write(block)
+                sink.flush()
+            except (OSError, ValueError):
+                with self.sink_changed:
+                    if self.sink is sink:
+                        self.sink = None
+                self.stop_item()
+                # item_command এটাকে seek_point দিয়ে keyframe এ নামিয়ে আনে
+                self.start_at[source] = start + monitor.out_time
+                return None
+            written += len(block)
+        
+        returncode = self.process.wait()
+        if returncode != 0 or not written:
+            if not self.stopping:
+                print(f"  ⚠️  Playlist item {name} failed (code {returncode}) - skipping")
+            return False
+        # -progress এর out_time এ output_ts_offset ধরা হয় না - এটাই item এর duration
+        self.offset += monitor.out_time
+        return True
+    
+    def stop_item(self):
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+    
+    def stop(self):
+        self.stopping = True
+        with self.sink_changed:
+            self.sink_changed.notify_all()
+        self.stop_item()
+        for transcoder in self.transcoders:
+            transcoder.stop()
+
+
+def output_args(destination):
+    """Destination (RTMP URL, file, অথবা 'null') এর ffmpeg output arguments"""
+    if destination == 'null':
+        return ['-f', 'null', '-']
+    if '://' in destination or destination.endswith('.flv'):
+        return ['-f', 'flv', destination]
+    return ['-y', destination]
+
+
+def mask_destination(destination):
+    """Logs এ stream key এর শুধু শেষ 4 অক্ষর দেখাও"""
+    if '://' not in destination:
+        return destination
+    base, _, key = destination.rpartition('/')
+    return f'{base}/...{key[-4:]}'
+
+
+class FanOutTarget:
+    """একটা destination: নিজস্ব -c copy relay ffmpeg, queue আর backoff"""
+    
+    STABLE_AFTER = 60.0
+    
+    def __init__(self, url, max_queue=32 * 1024 * 1024, max_backoff=30.0):
+        from collections import deque
+        
+        self.url = url
+        self.name = mask_destination(url)
+        self.max_queue = max_queue
+        self.max_backoff = max_backoff
+        self.blocks = deque()
+        self.queued = 0
+        self.ready = threading.Condition()
+        self.process = None
+        self.started_at = None
+        self.retry_at = 0.0
+        self.failures = 0
+        self.stopping = False
+        self.counters = {'connects': 0, 'failures': 0, 'overflows': 0, 'bytes': 0}
+    
+    def command(self):
+        return ([FFMPEG_BIN, '-hide_banner', '-loglevel', 'error',
+                 '-f', 'mpegts', '-i', 'pipe:0', '-map', '0', '-c', 'copy']
+                + output_args(self.url))
+    
+    def put(self, block):
+        """Encoder এর reader thread থেকে - কখনো block করে না"""
+        with self.ready:
+            if self.process is None:
+                # Reconnect এর অপেক্ষায় - পুরনো data জমিয়ে লাভ নেই
+                return
+            if self.queued + len(block) > self.max_queue:
+                self.counters['overflows'] += 1
+                self.blocks.clear()
+                self.queued = 0
+                self.fail('ingest too slow, queue overflowed')
+                return
+            self.blocks.append(block)
+            self.queued += len(block)
+            self.ready.notify()
+    
+    def connect(self):
+        try:
+            process = subprocess.Popen(self.command(), stdin=subprocess.PIPE)
+        except OSError as e:
+            print(f"  ❌ Could not start ffmpeg for {self.name}: {e}")
+            return False
+        with self.ready:
+            self.process = process
+            self.started_at = time.monotonic()
+        self.counters['connects'] += 1
+        return True
+    
+    def fail(self, reason):
+        """Relay বন্ধ করো আর backoff দিয়ে পরের reconnect ঠিক করো (lock ধরে রেখে ডাকো)"""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.kill()
+        if time.monotonic() - self.started_at >= self.STABLE_AFTER:
+            self.failures = 0
+        self.failures += 1
+        self.counters['failures'] += 1
+        delay = min(self.max_backoff, 2 ** (self.failures - 1))
+        self.retry_at = time.monotonic() + delay
+        self.blocks.clear()
+        self.queued = 0
+        if not self.stopping:
+            print(f"  ⚠️  {self.name}: {reason} - reconnecting in {delay}s")
+    
+    def restart(self):
+        """Encoder নতুন করে শুরু হয়েছে - timestamps আবার শূন্য থেকে, তাই relay ও নতুন"""
+        with self.ready:
+            process, self.process = self.process, None
+            self.blocks.clear()
+            self.queued = 0
+            self.retry_at = 0.0
+            self.ready.notify()
+        if process is not None and process.poll() is None:
+            process.kill()
+    
+    def run(self):
+        """Background thread: queue থেকে relay এর stdin এ লেখো"""
+        while not self.stopping:
+            if self.process is None:
+                if time.monotonic() < self.retry_at or not self.connect():
+                    time.sleep(0.2)
+                    continue
+            
+            with self.ready:
+                while not self.blocks and not self.stopping and self.process is not None:
+                    self.ready.wait(timeout=1.0)
+                    if self.process is not None and self.process.poll() is not None:
+                        self.fail(f'ffmpeg exited with code {self.process.returncode}')
+                if not self.blocks:
+                    continue
+                block = self.blocks.popleft()
+                self.queued -= len(block)
+                process = self.process
+            
+            try:
+                process.stdin.write(block)
+                process.stdin.flush()
+                self.counters['bytes'] += len(block)
+            except (OSError, ValueError):
+                with self.ready:
+                    if self.process is process:
+                        self.fail(f'ffmpeg exited with code {process.poll()}')
+        
+        with self.ready:
+            process, self.process = self.process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+    
+    def stop(self):
+        with self.ready:
+            self.stopping = True
+            self.ready.notify_all()
+
+
+class FanOut:
+    """একবার encode করা stream অনেকগুলো destination এ পাঠাও
+    
+    Encoder ffmpeg MPEG-TS লেখে একটা os.pipe এ (stdout -progress এর জন্য থাকে),
+    আর প্রতিটা destination এর নিজস্ব FanOutTarget। কোনো ingest মরে গেলে বা
+    পিছিয়ে পড়লে শুধু সেটাই backoff দিয়ে reconnect করে - encoder আর বাকি
+    destinations চলতেই থাকে, তাই destination বাড়লেও encode CPU একই।
+    """
+    
+    BLOCK_SIZE = 188 * 1024
+    
+    def __init__(self, destinations, max_backoff=30.0):
+        self.targets = [FanOutTarget(url, max_backoff=max_backoff) for url in destinations]
+        # Write end টা আমরাও খোলা রাখি, তাই encoder restart হলেও reader EOF পায় না
+        self.read_fd, self.write_fd = os.pipe()
+        self.stopping = False
+    
+    def start(self):
+        for target in self.targets:
+            threading.Thread(target=target.run, daemon=True).start()
+        threading.Thread(target=self.read, daemon=True).start()
+    
+    def read(self):
+        while not self.stopping:
+            try:
+                block = os.read(self.read_fd, self.BLOCK_SIZE)
+            except OSError:
+                break
+            if not block:
+                break
+            for target in self.targets:
+                target.put(block)
+        os.close(self.read_fd)
+    
+    def restart(self):
+        for target in self.targets:
+            target.restart()
+    
+    def stop(self):
+        self.stopping = True
+        for target in self.targets:
+            target.stop()
+        os.close(self.write_fd)
+
+
+class FileLeaseStore:
+    """Lease record একটা local JSON file এ - flock দিয়ে read-modify-write"""
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def update(self, change):
+        """change(record) নতুন record দিলে লেখো (None হলে কিছু না) - শেষ record ফেরত দাও"""
+        import fcntl
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                record = self.read()
+                updated = change(dict(record))
+                if updated is None:
+                    return record
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(updated, f, indent=2)
+                os.replace(tmp_path, self.path)
+                return updated
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class HTTPLeaseStore:
+    """Lease record একটা HTTP URL এ - GET + ETag, PUT + If-Match (compare-and-swap)
+    
+    LeaseServer (lease-server command) এই protocol বলে; একই protocol এর যেকোনো
+    ছোট key-value service ও চলবে।
+    """
+    
+    def __init__(self, url, timeout=5, retries=10):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+    
+    def _get(self):
+        import urllib.request
+        import urllib.error
+        
+        try:
+            with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8') or '{}'), response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return {}, None
+            raise
+    
+    def read(self):
+        return self._get()[0]
+    
+    def update(self, change):
+        import urllib.request
+        import urllib.error
+        
+        for attempt in range(self.retries):
+            record, etag = self._get()
+            updated = change(dict(record))
+            if updated is None:
+                return record
+            headers = {'Content-Type': 'application/json'}
+            if etag:
+                headers['If-Match'] = etag
+            else:
+                headers['If-None-Match'] = '*'
+            request = urllib.request.Request(self.url, data=json.dumps(updated).encode('utf-8'),
+                                             method='PUT', headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    return updated
+            except urllib.error.HTTPError as e:
+                if e.code != 412:
+                    raise
+                # অন্য কেউ আগে লিখেছে - নতুন record পড়ে আবার চেষ্টা
+                time.sleep(random.uniform(0.01, 0.05) * (attempt + 1))
+        raise OSError('lease store busy - too many conflicting updates')
+
+
+class LeaseServer:
+    """Tests আর local runs এর জন্য ছোট HTTP lease store (প্রতি path এ একটা JSON document)"""
+    
+    def __init__(self, host='127.0.0.1', port=0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        documents = {}
+        lock = threading.Lock()
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def _reply(self, status, body=b'', etag=None):
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_GET(self):
+                with lock:
+                    document = documents.get(self.path)
+                if document is None:
+                    return self._reply(404)
+                version, body = document
+                self._reply(200, body, f'"{version}"')
+            
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with lock:
+                    current = documents.get(self.path)
+                    etag = f'"{current[0]}"' if current else None
+                    if_match = self.headers.get('If-Match')
+                    if (if_match and if_match != etag) or (self.headers.get('If-None-Match') == '*' and current):
+                        return self._reply(412)
+                    version = (current[0] if current else 0) + 1
+                    documents[self.path] = (version, body)
+                self._reply(200, etag=f'"{version}"')
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f'http://{host}:{self.server.server_address[1]}'
+    
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StreamLease:
+    """একই stream key এ একসাথে চলা runs এর মধ্যে কে stream করবে
+    
+    Holder heartbeat দিয়ে lease ধরে রাখে। নতুন run successor হিসেবে নাম লেখায়,
+    holder stream করতে থাকা অবস্থাতেই warm up (download, pre-transcode, index)
+    করে, তারপর ready জানায়। Holder পরের keyframe boundary তে থেমে position সহ
+    lease ছেড়ে দেয়, আর successor সেখান থেকেই শুরু করে। Holder আর successor
+    দুটোই থাকলে তৃতীয় run সাথে সাথে বেরিয়ে যায়। Heartbeat বন্ধ হলে (run মরে
+    গেলে) ttl পরে lease নিজেই expire হয়। Store একদম না পাওয়া গেলে run lease
+    ছাড়াই holder হিসেবে stream করে, আর store ফিরলে heartbeat lease নেয় (অন্য
+    কেউ ততক্ষণে নিয়ে থাকলে এই run থেমে যায়)।
+    """
+    
+    def __init__(self, store, holder_id, ttl=30.0, poll=0.25):
+        self.store = store
+        self.id = holder_id
+        self.ttl = ttl
+        self.poll = poll
+        self.role = None
+        self.leased = False
+        self.stopping = False
+    
+    @classmethod
+    def from_config(cls, config):
+        if config.lease_url:
+            store = HTTPLeaseStore(config.lease_url)
+        elif config.lease_file:
+            store = FileLeaseStore(config.lease_file)
+        else:
+            return None
+        return cls(store, config.run_id, ttl=config.lease_ttl)
+    
+    def _alive(self, record, who):
+        expires = record.get('expires' if who == 'holder' else 'successor_expires', 0)
+        return bool(record.get(who)) and expires > time.time()
+    
+    def _take(self, record):
+        """Holder হও - আগের holder এর handoff info রেখে দাও"""
+        return {'holder': self.id, 'expires': time.time() + self.ttl,
+                'successor': None, 'successor_ready': False,
+                'handoff': record.get('handoff')}
+    
+    def acquire(self, timeout=None):
+        """'holder', 'successor' অথবা 'duplicate'
+        
+        Store unreachable হলে timeout (default ttl) পর্যন্ত চেষ্টা, তারপর lease ছাড়াই 'holder'।
+        """
+        def change(record):
+            if not self._alive(record, 'holder') or record.get('holder') == self.id:
+                self.role = 'holder'
+                return self._take(record)
+            if not self._alive(record, 'successor') or record.get('successor') == self.id:
+                self.role = 'successor'
+                record.update(successor=self.id, successor_expires=time.time() + self.ttl,
+                              successor_ready=False)
+                return record
+            self.role = 'duplicate'
+            return None
+        
+        deadline = time.monotonic() + (self.ttl if timeout is None else timeout)
+        delay = 0.5
+        while True:
+            try:
+                self.store.update(change)
+                self.leased = True
+                return self.role
+            except OSError as e:
+                if time.monotonic() + delay > deadline:
+                    print(f"  ⚠️  Lease store unreachable ({e}) - streaming without the lease")
+                    self.role = 'holder'
+                    return self.role
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+    
+    def heartbeat(self):
+        """Lease renew করো - এখনকার record ফেরত দাও (হারালে role None)"""
+        def change(record):
+            if self.role == 'holder' and not self.leased:
+                # Outage এর পর store ফিরেছে - খালি থাকলে lease নাও, অন্য কেউ নিলে থামো
+                if self._alive(record, 'holder') and record.get('holder') != self.id:
+                    self.role = None
+                    return None
+                return self._take(record)
+            if self.role == 'holder':
+                if record.get('holder') != self.id:
+                    self.role = None
+                    return None
+                record['expires'] = time.time() + self.ttl
+                return record
+            if self.role == 'successor':
+                if record.get('successor') != self.id:
+                    self.role = None
+                    return None
+                record['successor_expires'] = time.time() + self.ttl
+                return record
+            return None
+        
+        record = self.store.update(change)
+        if self.role == 'holder':
+            self.leased = True
+        return record
+    
+    def mark_ready(self):
+        def change(record):
+            if record.get('successor') != self.id:
+                return None
+            record.update(successor_ready=True, successor_expires=time.time() + self.ttl)
+            return record
+        
+        return self.store.update(change).get('successor_ready', False)
+    
+    def wait_for_takeover(self, cancelled=lambda: False):
+        """Holder ছেড়ে দেওয়া (বা মরে যাওয়া) পর্যন্ত অপেক্ষা - holder হলে handoff info, না পারলে None"""
+        def change(record):
+            if record.get('successor') != self.id:
+                return None
+            if self._alive(record, 'holder'):
+                return None
+            self.role = 'holder'
+            return self._take(record)
+        
+        while not cancelled():
+            try:
+                record = self.store.update(change)
+            except OSError:
+                record = {}
+            if self.role == 'holder':
+                return record.get('handoff') or {}
+            if record and record.get('successor') != self.id:
+                return None
+            time.sleep(self.poll)
+        return None
+    
+    def start_heartbeat(self, on_handoff=None, on_lost=None):
+        """Background thread: ttl/3 পরপর renew; successor ready হলে on_handoff, lease হারালে on_lost"""
+        def loop():
+            handoff_requested = False
+            while not self.stopping:
+                time.sleep(min(self.ttl / 3, 5.0))
+                if self.stopping:
+                    break
+                try:
+                    record = self.heartbeat()
+                except OSError as e:
+                    print(f"  ⚠️  Lease store unreachable: {e}")
+                    continue
+                if self.role is None:
+                    if on_lost:
+                        on_lost()
+                    break
+                if (self.role == 'holder' and not handoff_requested and on_handoff
+                        and record.get('successor_ready') and self._alive(record, 'successor')):
+                    handoff_requested = True
+                    on_handoff()
+        
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+    
+    def release(self, handoff=None):
+        """Holder: lease ছেড়ে দাও, successor এর জন্য position রেখে যাও"""
+        self.stopping = True
+        
+        def change(record):
+            if record.get('holder') != self.id:
+                return None
+            record.update(holder=None, expires=0, handoff=handoff)
+            return record
+        
+        try:
+            self.store.update(change)
+        except OSError:
+            pass
+
+
+class LogLimiter:
+    """ffmpeg এর stderr aggregate করো - একই ধরনের line বারবার print হয় না
+    
+    সংখ্যা বাদ দিয়ে line গুলো group হয়; প্রতিটা group window এ একবার print,
+    বাকিগুলো গোনা হয়, আর প্রতি minute এ মোট line এর একটা cap। Window শেষে
+    কতগুলো চাপা পড়লো এক লাইনে জানানো হয়, তাই 5 ঘণ্টার run এও log ছোট থাকে।
+    """
+    
+    NUMBERS = re.compile(r'0x[0-9a-f]+|\d+(?:\.\d+)?', re.IGNORECASE)
+    
+    def __init__(self, prefix='ffmpeg', window=60.0, per_window=20):
+        self.prefix = prefix
+        self.window = window
+        self.per_window = per_window
+        self.lock = threading.Lock()
+        self.reset()
+        self.total = 0
+    
+    def reset(self):
+        self.window_start = time.monotonic()
+        self.printed = 0
+        self.seen = {}
+    
+    def flush(self):
+        """Window শেষ - চাপা পড়া lines এর হিসাব দাও"""
+        suppressed = {key: entry for key, entry in self.seen.items() if entry[1]}
+        if suppressed:
+            count = sum(entry[1] for entry in suppressed.values())
+            example = max(suppressed.values(), key=lambda entry: entry[1])[0]
+            print(f"  🔇 {self.prefix}: {count} repeated line(s) suppressed, e.g. {example[:120]}")
+        self.reset()
+    
+    def line(self, text):
+        text = text.rstrip()
+        if not text:
+            return
+        with self.lock:
+            self.total += 1
+            if time.monotonic() - self.window_start >= self.window:
+                self.flush()
+            key = self.NUMBERS.sub('#', text)
+            entry = self.seen.get(key)
+            if entry is None and self.printed < self.per_window:
+                self.seen[key] = [text, 0]
+                self.printed += 1
+                print(f"  [{self.prefix}] {text}")
+            elif entry is None:
+                self.seen[key] = [text, 1]
+            else:
+                entry[1] += 1
+    
+    def read(self, stream):
+        """Background thread: process এর stderr শেষ না হওয়া পর্যন্ত পড়ো"""
+        for raw in iter(stream.readline, b''):
+            self.line(raw.decode('utf-8', 'replace'))
+        with self.lock:
+            self.flush()
+
+
+class StreamMetrics:
+    """Streaming এর health metrics: Prometheus textfile / JSON, আর চাইলে local HTTP
+    
+    ffmpeg এর -progress (ProgressMonitor) আর supervisor এর counters থেকে,
+    restarts পার হয়েও cumulative। প্রতি interval এ file atomically লেখা হয়,
+    আর status_every পরপর Actions log এ এক লাইনের status।
+    """
+    
+    METRICS = [
+        # (name, type, help)
+        ('stream_up', 'gauge', 'ffmpeg is currently running'),
+        ('stream_uptime_seconds', 'counter', 'Seconds since the streamer started'),
+        ('stream_fps', 'gauge', 'Current output frames per second'),
+        ('stream_fps_avg', 'gauge', 'Average output frames per second since start'),
+        ('stream_bitrate_kbps', 'gauge', 'Current output bitrate'),
+        ('stream_speed', 'gauge', 'Encode speed relative to real time'),
+        ('stream_frames_total', 'counter', 'Frames written'),
+        ('stream_dropped_frames_total', 'counter', 'Frames dropped by ffmpeg'),
+        ('stream_duplicated_frames_total', 'counter', 'Frames duplicated by ffmpeg'),
+        ('stream_bytes_sent_total', 'counter', 'Bytes written by the output muxer'),
+        ('stream_starts_total', 'counter', 'ffmpeg processes started'),
+        ('stream_restarts_total', 'counter', 'ffmpeg restarts after a failure'),
+        ('stream_stalls_total', 'counter', 'Stalls detected by the watchdog'),
+        ('stream_downshifts_total', 'counter', 'Adaptive ladder steps down'),
+        ('stream_upshifts_total', 'counter', 'Adaptive ladder steps up'),
+        ('stream_quality_lines', 'gauge', 'Current output height'),
+        ('stream_readahead_fill_ratio', 'gauge', 'Read-ahead buffer fill level'),
+        ('stream_readahead_underruns_total', 'counter', 'Read-ahead buffer underruns'),
+        ('stream_readahead_reconnects_total', 'counter', 'Source reconnects'),
+        ('stream_destination_up', 'gauge', 'Fan-out destination relay is connected'),
+        ('stream_destination_failures_total', 'counter', 'Fan-out destination failures'),
+        ('stream_destination_bytes_total', 'counter', 'Bytes sent to a fan-out destination'),
+    ]
+    
+    def __init__(self, streamer, path=None, interval=15.0, port=None, status_every=300.0):
+        self.streamer = streamer
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self.status_every = status_every
+        self.started = time.monotonic()
+        self.stopping = False
+        self.server = None
+    
+    def collect(self):
+        """এখনকার সব metrics: name -> value অথবা [(labels, value)]"""
+        streamer = self.streamer
+        snapshot = streamer.monitor.snapshot()
+        totals = streamer.totals
+        counters = streamer.counters
+        frames = totals['frames'] + snapshot['frame']
+        active = totals['seconds'] + streamer.active_seconds()
+        running = streamer.process is not None and streamer.process.poll() is None
+        quality, _ = streamer.current_rung()
+        
+        values = {
+            'stream_up': 1 if running else 0,
+            'stream_uptime_seconds': round(time.monotonic() - self.started, 1),
+            'stream_fps': snapshot['fps'] if running else 0.0,
+            'stream_fps_avg': round(frames / active, 2) if active > 0 else 0.0,
+            'stream_bitrate_kbps': snapshot['bitrate_kbps'] if running else 0.0,
+            'stream_speed': snapshot['speed'] if running and snapshot['speed'] is not None else 0.0,
+            'stream_frames_total': frames,
+            'stream_dropped_frames_total': totals['drop_frames'] + snapshot['drop_frames'],
+            'stream_duplicated_frames_total': totals['dup_frames'] + snapshot['dup_frames'],
+            'stream_bytes_sent_total': totals['bytes'] + snapshot['total_size'],
+            'stream_starts_total': counters['starts'],
+            'stream_restarts_total': counters['restarts'],
+            'stream_stalls_total': counters['stalls'],
+            'stream_downshifts_total': counters['downshifts'],
+            'stream_upshifts_total': counters['upshifts'],
+            'stream_quality_lines': QUALITY_PRESETS[quality][0]
+        }
+        if streamer.readahead:
+            stats = streamer.readahead.stats()
+            values['stream_readahead_fill_ratio'] = stats['fill_ratio']
+            values['stream_readahead_underruns_total'] = stats['underruns']
+            values['stream_readahead_reconnects_total'] = stats['reconnects']
+        if streamer.fanout:
+            targets = streamer.fanout.targets
+            values['stream_destination_up'] = [
+                ({'destination': t.name}, 1 if t.process is not None else 0) for t in targets]
+            values['stream_destination_failures_total'] = [
+                ({'destination': t.name}, t.counters['failures']) for t in targets]
+            values['stream_destination_bytes_total'] = [
+                ({'destination': t.name}, t.counters['bytes']) for t in targets]
+        return values
+    
+    def prometheus(self, values=None):
+        values = self.collect() if values is None else values
+        lines = []
+        for name, kind, help_text in self.METRICS:
+            if name not in values:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            samples = values[name] if isinstance(values[name], list) else [({}, values[name])]
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{text}"' for key, text in labels.items())
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+    
+    def as_json(self, values=None):
+        values = self.collect() if values is None else values
+        data = {}
+        for name, value in values.items():
+            if isinstance(value, list):
+                value = {labels['destination']: sample for labels, sample in value}
+            data[name] = value
+        return json.dumps(data, indent=2)
+    
+    def write(self):
+        values = self.collect()
+        text = self.as_json(values) if self.path.endswith('.json') else self.prometheus(values)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+    
+    def status(self):
+        values = self.collect()
+        uptime = int(values['stream_uptime_seconds'])
+        print(f"  📈 {values['stream_fps']:.1f} fps (avg {values['stream_fps_avg']:.1f}), "
+              f"{values['stream_bitrate_kbps']:.0f} kbps, {values['stream_speed']:.2f}x, "
+              f"{values['stream_bytes_sent_total'] / 1e9:.2f} GB sent, up {uptime // 3600}h{uptime % 3600 // 60:02d}m, "
+              f"{values['stream_restarts_total']} restarts, {values['stream_dropped_frames_total']} dropped")
+    
+    def serve(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        metrics = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body, content_type = metrics.as_json(), 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body, content_type = metrics.prometheus(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"  📊 Metrics on http://127.0.0.1:{self.server.server_address[1]}/metrics")
+    
+    def start(self):
+        if self.port is not None:
+            self.serve()
+        threading.Thread(target=self.loop, daemon=True).start()
+    
+    def loop(self):
+        last_status = time.monotonic()
+        while not self.stopping:
+            time.sleep(self.interval)
+            if self.stopping:
+                break
+            if self.path:
+                try:
+                    self.write()
+                except OSError as e:
+                    print(f"  ⚠️  Could not write metrics: {e}")
+            if self.status_every and time.monotonic() - last_status >= self.status_every:
+                last_status = time.monotonic()
+                self.status()
+    
+    def stop(self):
+        self.stopping = True
+        if self.path:
+            try:
+                self.write()
+            except OSError:
+                pass
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class FFmpegStreamer:
+    """ffmpeg চালিয়ে VIDEO_URL থেকে RTMP এ stream করো
+    
+    -progress output দেখে stall (out_time আটকে আছে, অথবা অনেকক্ষণ real time
+    এর চেয়ে ধীর) ধরা পড়লে ffmpeg restart হয়; বারবার fail করলে exponential
+    backoff, আর কিছুক্ষণ ঠিকঠাক চললে backoff আবার শূন্য থেকে। Re-encode এর
+    সময় AdaptiveController runner এর ক্ষমতা অনুযায়ী encode ladder বদলায়।
+    """
+    
+    STABLE_AFTER = 60.0
+    STOP_GRACE = 5.0
+    
+    def __init__(self, config):
+        self.config = config
+        self.process = None
+        self.stopping = False
+        self.monitor = ProgressMonitor(
+            stall_timeout=config.stall_timeout,
+            slow_timeout=config.slow_timeout,
+            min_speed=config.min_speed
+        )
+        self.counters = {'starts': 0, 'restarts': 0, 'stalls': 0, 'exits': 0,
+                         'downshifts': 0, 'upshifts': 0}
+        self.adaptive = None
+        self.cpu = CpuSampler()
+        self.deadline = None
+        self.source = config.video_url
+        self.source_format = None
+        self.transcoder = None
+        self.feeder = None
+        self.fanout = None
+        self.readahead = None
+        self.duration = None
+        # Where in a single source the current ffmpeg process started (input -ss)
+        self.seek_from = 0.0
+        self.process_started = None
+        self.process_ended = None
+        self.totals = {'frames': 0, 'drop_frames': 0, 'dup_frames': 0, 'bytes': 0, 'seconds': 0.0}
+        self.log = LogLimiter()
+        self.metrics = None
+        if config.metrics_file or config.metrics_port is not None:
+            self.metrics = StreamMetrics(self, config.metrics_file, config.metrics_interval,
+                                         config.metrics_port, config.status_every)
+        self.handoff_requested = False
+        self.handoff_at = None
+        self.handoff = None
+        self.state = None
+        if config.resume:
+            self.state = PlaybackState(config.state_file, config.video_url, config.checkpoint_interval)
+    
+    def current_rung(self):
+        """এখনকার (quality, preset)"""
+        if self.adaptive:
+            return self.adaptive.rung
+        return self.config.quality, self.config.preset
+    
+    def copy_plan(self, probe):
+        """কোন streams re-encode ছাড়াই (-c copy) পাঠানো যাবে"""
+        width, height = self.config.target_size()
+        video = (probe or {}).get('video') or {}
+        audio = (probe or {}).get('audio') or {}
+        video_copy = (
+            video.get('codec_name') == 'h264'
+            and video.get('pix_fmt') in ('yuv420p', 'yuvj420p')
+            and (video.get('width'), video.get('height')) == (width, height)
+        )
+        audio_copy = audio.get('codec_name') == 'aac'
+        return video_copy, audio_copy
+    
+    def build_command(self, probe=None, duration=None):
+        config = self.config
+        quality, preset = self.current_rung()
+        width, height = config.target_size(quality)
+        _, video_kbps, audio_kbps = QUALITY_PRESETS[quality]
+        video_copy, audio_copy = self.copy_plan(probe)
+        has_audio = bool((probe or {}).get('audio')) or probe is None
+        
+        cmd = [FFMPEG_BIN, '-hide_banner', '-loglevel', 'warning', '-nostdin',
+               '-progress', 'pipe:1', '-nostats',
+               '-re']
+        if self.feeder:
+            # Playlist: feeder থেকে আসা continuous MPEG-TS
+            cmd += ['-f', 'mpegts']
+        elif not self.readahead:
+            cmd += ['-stream_loop', '-1']
+        if self.source_format:
+            cmd += ['-f', self.source_format, '-safe', '0']
+        if self.seek_from:
+            cmd += ['-ss', f'{self.seek_from:.3f}']
+        cmd += ['-i', self.source]
+        if not has_audio:
+            # YouTube audio ছাড়া stream নেয় না - silent track যোগ করো
+            cmd += ['-f', 'lavfi', '-i', 'anullsrc=channel_layout=stereo:sample_rate=44100']
+        cmd += ['-map', '0:v:0', '-map', '0:a:0' if has_audio else '1:a:0']
+        
+        if video_copy:
+            cmd += ['-c:v', 'copy']
+        else:
+            gop = config.fps * 2
+            cmd += [
+                '-vf', (f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
+                        f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={config.fps}'),
+                '-c:v', 'libx264', '-preset', preset, '-pix_fmt', 'yuv420p',
+                '-b:v', f'{video_kbps}k', '-maxrate', f'{video_kbps}k', '-bufsize', f'{video_kbps * 2}k',
+                '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0'
+            ]
+        
+        if audio_copy and has_audio:
+            cmd += ['-c:a', 'copy']
+        else:
+            cmd += ['-c:a', 'aac', '-b:a', f'{audio_kbps}k', '-ar', '44100', '-ac', '2']
+        
+        if duration:
+            cmd += ['-t', f'{duration:.3f}']
+        
+        if self.fanout:
+            cmd += ['-f', 'mpegts', f'pipe:{self.fanout.write_fd}']
+        else:
+            cmd += output_args(config.destination)
+        return cmd
+    
+    def prepare_source(self):
+        """Source ঠিক করো (media cache, pre-transcoded segments, playlist) - probe info ফেরত দাও"""
+        config = self.config
+        saved = self.state.load() if self.state else None
+        if len(config.playlist) > 1 or (saved and saved.get('position', 0) > 0):
+            # Resume এর প্রথম pass টা feeder দিয়ে, যাতে পরের loops আবার শূন্য থেকে
+            return self.prepare_playlist(saved)
+        
+        source = config.video_url
+        fetcher = MediaFetcher()
+        if MediaFetcher.is_manifest(source):
+            print("  ℹ️  HLS/DASH source - ffmpeg reads the manifest directly")
+        elif config.media_cache and MediaFetcher.cacheable(source):
+            path = fetcher.fetch(source)
+            if path:
+                source = path
+            elif fetcher.skipped == 'manifest':
+                print("  ℹ️  HLS/DASH source - ffmpeg reads the manifest directly")
+            elif config.readahead:
+                max_bytes, seconds = config.readahead
+                print(f"  ℹ️  Source is not cacheable - reading it through a "
+                      f"{f'{seconds:.0f}s' if seconds else f'{max_bytes / 1e6:.0f} MB'} read-ahead buffer")
+                self.readahead = ReadAheadBuffer(source, max_bytes=max_bytes, seconds=seconds,
+                                                 max_backoff=config.max_backoff)
+                self.readahead.start()
+                self.source = 'pipe:0'
+                return probe_media(source)
+            else:
+                print("  ℹ️  Source is not cacheable - reading it directly")
+        self.source = source
+        
+        if config.pretranscode == 'off' or not os.path.isfile(source):
+            return probe_media(source)
+        
+        transcoder = PreTranscoder(config)
+        manifest = transcoder.ready(source)
+        if manifest is None and config.pretranscode == 'wait':
+            manifest = transcoder.run(source)
+        if manifest:
+            self.source = manifest['playlist']
+            self.source_format = 'concat'
+            print(f"  ⚡ Using {manifest['segments']} pre-transcoded segments - stream copy only")
+            return PreTranscoder.probe_info(manifest)
+        
+        probe = probe_media(source)
+        if probe and not all(self.copy_plan(probe)) and config.pretranscode == 'auto':
+            self.transcoder = transcoder
+            transcoder.start_background(source)
+            print("  🛠️  Pre-transcoding in the background on idle CPU for the next run")
+        return probe
+    
+    def warm_up(self):
+        """Handoff এর আগে: media download, pre-transcode, keyframe index - সব cache এ"""
+        config = self.config
+        for source in config.playlist[:2]:
+            path = source
+            if config.media_cache and MediaFetcher.cacheable(source):
+                path = MediaFetcher().fetch(source) or source
+            if not os.path.isfile(path):
+                continue
+            transcoder = PreTranscoder(config)
+            if config.pretranscode == 'wait' and not transcoder.ready(path):
+                transcoder.run(path)
+            if not transcoder.ready(path):
+                keyframe_index(path)
+    
+    def request_handoff(self):
+        """Successor ready - পরের keyframe boundary তে থামো"""
+        print("  🤝 Successor is ready - handing off at the next keyframe")
+        self.handoff_requested = True
+    
+    def prepare_playlist(self, saved=None):
+        """Feeder চালু করো - relay সবসময় একই format এর stream পায়, তাই শুধু copy"""
+        config = self.config
+        if len(config.playlist) > 1:
+            print(f"  📃 Playlist: {len(config.playlist)} items"
+                  f"{', loop' if config.playlist_loop else ''}{', shuffle' if config.playlist_shuffle else ''}")
+        self.feeder = PlaylistFeeder(config)
+        if saved and self.feeder.resume(saved['source'], saved.get('position', 0)):
+            name = os.path.basename(saved['source'].split('?', 1)[0])
+            print(f"  ⏩ Resuming {name} at {saved.get('position', 0):.0f}s")
+        self.feeder.warm_up()
+        self.feeder.start()
+        self.source = 'pipe:0'
+        width, height = config.target_size()
+        return PreTranscoder.probe_info({'width': width, 'height': height})
+    
+    def run(self):
+        """ffmpeg supervise করো - বন্ধ হয়ে গেলে আবার শুরু করো"""
+        config = self.config
+        destinations = config.destinations
+        print(f"🎬 Streaming {config.quality} ({config.aspect_ratio}) "
+              f"-> {'RTMP' if not config.output else config.output}"
+              f"{f' x{len(destinations)}' if len(destinations) > 1 else ''}")
+        if len(destinations) > 1:
+            # Encode একবার - প্রতিটা destination আলাদা relay এ, আলাদা করে reconnect
+            self.fanout = FanOut(destinations, max_backoff=config.max_backoff)
+            self.fanout.start()
+            for target in self.fanout.targets:
+                print(f"  📡 {target.name}")
+        
+        probe = self.prepare_source()
+        self.duration = (probe or {}).get('duration')
+        if probe:
+            video_copy, audio_copy = self.copy_plan(probe)
+            print(f"  ℹ️  Source: {(probe.get('video') or {}).get('codec_name')} "
+                  f"{(probe.get('video') or {}).get('width')}x{(probe.get('video') or {}).get('height')}, "
+                  f"video {'copy' if video_copy else 're-encode'}, audio {'copy' if audio_copy else 're-encode'}")
+        else:
+            print("  ⚠️  Could not probe source - re-encoding everything")
+        
+        video_copy, _ = self.copy_plan(probe)
+        if config.adaptive and not video_copy and len(config.ladder) > 1:
+            self.adaptive = AdaptiveController(
+                config.ladder,
+                config.target_size,
+                down_after=config.adaptive_down_after,
+                up_after=config.adaptive_up_after,
+                up_cpu=config.adaptive_up_cpu
+            )
+            print(f"  📶 Adaptive ladder: {' > '.join(f'{q}/{p}' for q, p in config.ladder)}")
+        
+        if self.metrics:
+            self.metrics.start()
+        
+        started = time.monotonic()
+        self.deadline = started + config.max_seconds if config.max_seconds else None
+        failures = 0
+        while not self.stopping:
+            remaining = None
+            if config.max_seconds:
+                remaining = config.max_seconds - (time.monotonic() - started)
+                if remaining <= 0:
+                    return True
+            
+            if self.counters['starts']:
+                # A restarted single source continues where the last process stopped, not at 0
+                self.seek_from = self.restart_point()
+            if not self.start_process(self.build_command(probe, duration=remaining)):
+                return False
+            reason = self.watch()
+            if self.stopping or reason == 'handoff' or (self.deadline and time.monotonic() >= self.deadline):
+                break
+            
+            if reason in ('down', 'up'):
+                # Ladder বদলানো failure নয় - backoff ছাড়াই নতুন settings এ চালাও
+                quality, preset = self.current_rung()
+                self.counters['downshifts' if reason == 'down' else 'upshifts'] += 1
+                print(f"  {'📉' if reason == 'down' else '📈'} Encoder "
+                      f"{'cannot keep up' if reason == 'down' else 'has headroom'} "
+                      f"- switching to {quality}/{preset}")
+                continue
+            
+            if reason is None:
+                # Process নিজে শেষ হয়েছে
+                if self.feeder and self.feeder.finished:
+                    print("  ✅ Playlist finished")
+                    break
+                if self.process.returncode == 0 and config.max_seconds:
+                    continue
+                self.counters['exits'] += 1
+                reason = f'ffmpeg exited with code {self.process.returncode}'
+            
+            # ঠিকঠাক অনেকক্ষণ চললে backoff reset
+            if time.monotonic() - self.process_started >= self.STABLE_AFTER:
+                failures = 0
+            failures += 1
+            delay = min(config.max_backoff, 2 ** (failures - 1))
+            self.counters['restarts'] += 1
+            print(f"  ⚠️  {reason} - restarting in {delay}s "
+                  f"(restart #{self.counters['restarts']}, {self.counters['stalls']} stalls)")
+            self.sleep(delay)
+        
+        self.stop_process()
+        if self.state:
+            self.state.last_save = 0.0
+            self.state.checkpoint(*self.playback_position())
+        if self.transcoder:
+            self.transcoder.stop()
+        if self.feeder:
+            self.feeder.stop()
+        if self.fanout:
+            self.fanout.stop()
+        if self.readahead:
+            self.readahead.report()
+            self.readahead.stop()
+        if self.metrics:
+            self.metrics.status()
+            self.metrics.stop()
+        return True
+    
+    def active_seconds(self):
+        """এখনকার ffmpeg process কতক্ষণ চলেছে"""
+        if self.process_started is None:
+            return 0.0
+        return (self.process_ended or time.monotonic()) - self.process_started
+    
+    def accumulate(self):
+        """শেষ হওয়া process এর counters মোট হিসাবে যোগ করো (restart পার হয়ে metrics)"""
+        snapshot = self.monitor.snapshot()
+        self.totals['frames'] += snapshot['frame']
+        self.totals['drop_frames'] += snapshot['drop_frames']
+        self.totals['dup_frames'] += snapshot['dup_frames']
+        self.totals['bytes'] += snapshot['total_size']
+        self.totals['seconds'] += self.active_seconds()
+    
+    def start_process(self, cmd):
+        self.accumulate()
+        self.monitor.reset()
+        if self.adaptive:
+            self.adaptive.reset_window()
+            # নিচে নামার সুযোগ থাকলে ধীর speed ladder সামলাবে, watchdog নয়
+            self.monitor.check_speed = self.adaptive.at_bottom
+        if self.fanout and self.counters['starts']:
+            self.fanout.restart()
+        try:
+            piped = self.feeder or self.readahead
+            self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE if piped else subprocess.DEVNULL,
+                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                            pass_fds=(self.fanout.write_fd,) if self.fanout else ())
+        except OSError as e:
+            print(f"  ❌ Could not start ffmpeg: {e}")
+            return False
+        if self.feeder:
+            self.feeder.attach(self.process.stdin)
+        if self.readahead:
+            self.readahead.attach(self.process.stdin)
+        self.process_started = time.monotonic()
+        self.process_ended = None
+        self.counters['starts'] += 1
+        threading.Thread(target=self.monitor.read, args=(self.process.stdout,), daemon=True).start()
+        threading.Thread(target=self.log.read, args=(self.process.stderr,), daemon=True).start()
+        return True
+    
+    def watch(self):
+        """Process শেষ/stall/ladder change পর্যন্ত অপেক্ষা করো
+        
+        Process নিজে শেষ হলে None, stall হলে কারণ, ladder বদলাতে হলে 'down'/'up'।
+        """
+        while not self.stopping:
+            try:
+                self.process.wait(timeout=0.2 if self.handoff_requested else 1.0)
+                self.process_ended = time.monotonic()
+                return None
+            except subprocess.TimeoutExpired:
+                pass
+            
+            # -t media time গোনে; ধীর encode এ wall clock এর limit আলাদা করে মানো
+            if self.deadline and time.monotonic() >= self.deadline:
+                self.stop_process()
+                return None
+            reason = self.monitor.stalled()
+            if reason:
+                self.counters['stalls'] += 1
+                self.stop_process()
+                return f'stall detected ({reason})'
+            
+            if self.adaptive:
+                direction = self.adaptive.observe(self.monitor.speed, self.cpu.sample())
+                if direction:
+                    self.stop_process()
+                    return direction
+            if self.state:
+                self.state.checkpoint(*self.playback_position())
+            
+            if self.handoff_requested:
+                if self.handoff_at is None:
+                    # 2s GOP - successor ঠিক এখানে keyframe পাবে
+                    self.handoff_at = (int(self.monitor.out_time) // 2 + 1) * 2
+                if self.monitor.out_time >= self.handoff_at:
+                    source, position = self.playback_position()
+                    self.handoff = {'source': source, 'position': position}
+                    self.stop_process()
+                    return 'handoff'
+        return None
+    
+    def playback_position(self):
+        """এখন কোন source এর কোথায় - (source, seconds)"""
+        if self.feeder:
+            return self.feeder.position(self.monitor.out_time)
+        if self.readahead:
+            # Live source - resume এর কোনো মানে নেই
+            return None, None
+        position = self.seek_from + self.monitor.out_time
+        if self.duration:
+            position %= self.duration
+        return self.config.playlist[0] if self.config.playlist else None, position
+    
+    def restart_point(self):
+        """Restart এর পরে single source এর seek point - শেষ position এর আগের keyframe
+        
+        Playlist/feeder নিজেই position রাখে, আর read-ahead (live) source এ seek নেই।
+        """
+        if self.feeder or self.readahead or not self.duration:
+            return 0.0
+        _, position = self.playback_position()
+        if self.source_format == 'concat':
+            # Pre-transcoded segments have a keyframe every 2s
+            return position - position % 2
+        if os.path.isfile(self.source):
+            return nearest_keyframe(keyframe_index(self.source), position)
+        return 0.0
+    
+    def stop_process(self):
+        """আগে terminate, grace period এর পরে kill"""
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=self.STOP_GRACE)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        self.process_ended = time.monotonic()
+    
+    def sleep(self, seconds):
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(0.2, deadline - time.monotonic()))
+    
+    def stop(self):
+        self.stopping = True
+        self.stop_process()
+        if self.transcoder:
+            self.transcoder.stop()
+        if self.feeder:
+            self.feeder.stop()
+        if self.fanout:
+            self.fanout.stop()
+        if self.readahead:
+            self.readahead.stop()
+        if self.metrics:
+            self.metrics.stop()
+
+
+def run_stream():
+    """Streaming mode: workflow runner এ ffmpeg দিয়ে live stream চালাও"""
+    config = StreamConfig.from_env()
+    if not config.video_url or not config.destinations:
+        print("❌ YOUTUBE_STREAM_KEY and VIDEO_URL must be set for streaming")
+        return False
+    
+    streamer = FFmpegStreamer(config)
+    lease = StreamLease.from_config(config)
+    try:
+        if lease:
+            role = lease.acquire()
+            if role == 'duplicate':
+                print("⏭️  Another run is streaming and one is already waiting to take over - exiting")
+                return True
+            lease.start_heartbeat(on_handoff=streamer.request_handoff, on_lost=streamer.stop)
+            if role == 'successor':
+                print("⏳ Another run is streaming - warming up to take over")
+                started = time.monotonic()
+                streamer.warm_up()
+                lease.mark_ready()
+                handoff = lease.wait_for_takeover(lambda: streamer.stopping)
+                if handoff is None:
+                    print("⏭️  Lost the successor slot - exiting")
+                    return True
+                print(f"  🤝 Took over after {time.monotonic() - started:.0f}s")
+                if handoff.get('source') and streamer.state:
+                    streamer.state.save(handoff['source'], handoff['position'])
+        return streamer.run()
+    except KeyboardInterrupt:
+        streamer.stop()
+        raise
+    finally:
+        if lease and lease.role == 'holder':
+            source, position = streamer.playback_position()
+            lease.release(streamer.handoff or ({'source': source, 'position': position} if source else None))
+
+
+def run_prepare():
+    """Stream শুরুর আগেই media download আর pre-transcode সেরে রাখো"""
+    config = StreamConfig.from_env()
+    if not config.video_url:
+        print("❌ VIDEO_URL must be set")
+        return False
+    
+    print(f"🛠️  Preparing {config.quality} ({config.aspect_ratio}) stream media...")
+    success = True
+    for item in config.playlist:
+        source = item
+        if config.media_cache and MediaFetcher.cacheable(source):
+            source = MediaFetcher().fetch(source) or source
+        if not os.path.isfile(source):
+            print(f"  ℹ️  {item[:50]} is not a file - nothing to pre-transcode")
+            continue
+        
+        transcoder = PreTranscoder(config)
+        if transcoder.ready(source):
+            print("  ✅ Pre-transcoded segments already cached")
+            continue
+        success = transcoder.run(source) is not None and success
+    return success
+
+
+def run_lease_server(args):
+    """Local HTTP lease store - LEASE_URL=http://host:port/<name> দিয়ে ব্যবহার করো"""
+    server = LeaseServer(args.host, args.port)
+    print(f"🔒 Lease store listening on {server.url}")
+    try:
+        server.server.serve_forever()
+    finally:
+        server.server.server_close()
+    return True
+
+
+def run_fleet(args):
+    """Fleet mode: manifest এর সব repos provision করো"""
+    setup = GitHubAutoSetup()
+    if (not setup.check_files(require_config=False) or not setup.check_dependencies()
+            or not setup.check_git_installed()):
+        return False
+    
+    try:
+        entries = FleetRunner.load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading manifest: {e}")
+        return False
+    
+    fleet = FleetRunner(entries, base_dir=setup.base_dir, max_workers=args.workers,
+                        per_account=args.per_account, summary_file=args.summary,
+                        dry_run=args.dry_run)
+    return fleet.run()
+
+
+def run_workflow(args):
+    """Workflow render করে schema দিয়ে validate করো - GitHub এ push না করেই"""
+    try:
+        text = WorkflowGenerator.from_env().to_text()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    
+    if not args.output:
+        print(text, end='')
+        return True
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"✅ Workflow valid - written to {args.output}")
+    return True
+
+
+def clear_cache():
+    """HTTP response cache মুছে ফেলো"""
+    cache = ResponseCache(os.path.join(os.getcwd(), CACHE_DIR, 'http'))
+    removed = cache.invalidate()
+    print(f"🧹 Removed {removed} cached response(s)")
+    return True
+
+
+def parse_args(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='GitHub YouTube Streamer')
+    subparsers = parser.add_subparsers(dest='command')
+    setup = subparsers.add_parser('setup', help='Provision one repo from setup_github.txt (default)')
+    setup.add_argument('--dry-run', action='store_true', help='Only report which files would change')
+    setup.add_argument('--report', help='Where to write the per-step JSON timing report')
+    setup.add_argument('--trace', action='store_true', help='Include a span for every HTTP call in the report')
+    
+    fleet = subparsers.add_parser('fleet', help='Provision many repos from a manifest')
+    fleet.add_argument('manifest', help='JSON list or 6-line blocks like setup_github.txt')
+    fleet.add_argument('--workers', type=int, default=16, help='Repos provisioned in parallel')
+    fleet.add_argument('--per-account', type=int, default=4, help='In-flight repos per GitHub account')
+    fleet.add_argument('--summary', default='fleet_summary.json', help='Where to write the JSON summary')
+    fleet.add_argument('--dry-run', action='store_true', help='Only report which files would change')
+    
+    workflow = subparsers.add_parser('workflow', help='Render and validate the GitHub Actions workflow')
+    workflow.add_argument('--output', help='Write the workflow here instead of printing it')
+    
+    subparsers.add_parser('clear-cache', help='Remove cached GitHub API responses')
+    subparsers.add_parser('stream', help='Stream VIDEO_URL to YOUTUBE_STREAM_KEY with ffmpeg')
+    subparsers.add_parser('prepare', help='Download and pre-transcode VIDEO_URL into the cache')
+    
+    lease = subparsers.add_parser('lease-server', help='Serve a local HTTP lease store for stream handoff')
+    lease.add_argument('--host', default='127.0.0.1')
+    lease.add_argument('--port', type=int, default=8765)
+    
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function"""
+    
+    try:
+        args = parse_args()
+        
+        # Workflow runner এ stream key আর video URL থাকলে streaming mode
+        streaming_env = os.environ.get('YOUTUBE_STREAM_KEY') and os.environ.get('VIDEO_URL')
+        if args.command == 'stream' or (args.command is None and streaming_env):
+            success = run_stream()
+        elif args.command == 'prepare':
+            success = run_prepare()
+        elif args.command == 'lease-server':
+            success = run_lease_server(args)
+        elif args.command == 'fleet':
+            success = run_fleet(args)
+        elif args.command == 'workflow':
+            success = run_workflow(args)
+        elif args.command == 'clear-cache':
+            success = clear_cache()
+        else:
+            setup = GitHubAutoSetup()
+            setup.dry_run = getattr(args, 'dry_run', False)
+            setup.report.trace = getattr(args, 'trace', False)
+            if getattr(args, 'report', None):
+                setup.report_file = args.report
+            success = setup.run()
         
         if success:
             sys.exit(0)
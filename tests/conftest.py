@@ -0,0 +1,29 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# streamer.py আর benchmark.py repo root এ - tests সেখান থেকে import করে
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import benchmark  # noqa: E402
+import streamer  # noqa: E402
+
+
+@pytest.fixture
+def fake_github():
+    """benchmark.FakeGitHub - প্রতি test এ নতুন server"""
+    fake = benchmark.FakeGitHub().start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def workspace(fake_github, monkeypatch):
+    """setup_github.txt সহ base_dir, API calls যায় fake_github এ"""
+    monkeypatch.setattr(streamer, 'GITHUB_API_URL', fake_github.url)
+    base_dir = benchmark.make_workspace()
+    yield base_dir
+    shutil.rmtree(base_dir, ignore_errors=True)
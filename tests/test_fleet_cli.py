@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import benchmark
+
+
+def run_fleet(fake, base_dir, *args):
+    env = dict(os.environ, GITHUB_API_URL=fake.url)
+    env.pop('YOUTUBE_STREAM_KEY', None)
+    env.pop('STREAMER_CACHE_DIR', None)
+    return subprocess.run([sys.executable, 'streamer.py', 'fleet', *args], cwd=base_dir, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def entries(base_dir, count):
+    name = os.path.basename(base_dir)
+    return [{'stream_key': f'key-{i}', 'video_url': 'https://example.com/video.mp4',
+             'token': f'token-{i % 2}', 'repo': f'fleet-{name}-{i}'} for i in range(count)]
+
+
+def test_fleet_subcommand_without_setup_file(fake_github):
+    base_dir = benchmark.make_workspace()
+    try:
+        os.remove(os.path.join(base_dir, 'setup_github.txt'))
+        with open(os.path.join(base_dir, 'fleet.json'), 'w', encoding='utf-8') as f:
+            json.dump(entries(base_dir, 3), f)
+
+        result = run_fleet(fake_github, base_dir, 'fleet.json', '--workers', '3', '--summary', 'summary.json')
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert 'setup_github.txt' not in result.stdout
+        with open(os.path.join(base_dir, 'summary.json'), encoding='utf-8') as f:
+            summary = json.load(f)
+        assert (summary['total'], summary['succeeded']) == (3, 3)
+        assert all(entry['steps'] == dict.fromkeys(['repo', 'files', 'secrets', 'workflow'], True)
+                   for entry in summary['entries'])
+        repos = {f"bench-user/{entry['repo']}" for entry in entries(base_dir, 3)}
+        assert repos <= set(fake_github.repos)
+        for repo in repos:
+            assert fake_github.repos[repo]['secrets']
+            assert '.github/workflows/youtube-live.yml' in fake_github._tree_of(
+                fake_github.repos[repo]['refs']['main'])[1]
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def test_fleet_subcommand_reports_bad_manifest(fake_github):
+    base_dir = benchmark.make_workspace()
+    try:
+        with open(os.path.join(base_dir, 'fleet.txt'), 'w', encoding='utf-8') as f:
+            f.write('only\nfive\nlines\nin\nhere\n')
+
+        result = run_fleet(fake_github, base_dir, 'fleet.txt')
+
+        assert result.returncode == 1
+        assert 'Error reading manifest' in result.stdout
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def test_public_key_cache_keeps_every_account(fake_github):
+    base_dir = benchmark.make_workspace()
+    try:
+        os.remove(os.path.join(base_dir, 'setup_github.txt'))
+        fleet = [dict(entry, token=f'token-{i % 4}') for i, entry in enumerate(entries(base_dir, 12))]
+        with open(os.path.join(base_dir, 'fleet.json'), 'w', encoding='utf-8') as f:
+            json.dump(fleet, f)
+
+        result = run_fleet(fake_github, base_dir, 'fleet.json', '--workers', '12')
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        with open(os.path.join(base_dir, '.streamer_cache', 'public_keys.json'), encoding='utf-8') as f:
+            keys = json.load(f)
+        for entry in fleet:
+            repo = f"bench-user/{entry['repo']}"
+            assert keys[repo]['key_id'] == fake_github.repos[repo]['key_id']
+        leftovers = [name for name in os.listdir(os.path.join(base_dir, '.streamer_cache'))
+                     if name.endswith('.tmp')]
+        assert leftovers == []
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
@@ -0,0 +1,57 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from streamer import GitHubAPI
+
+
+@pytest.fixture
+def failing_server():
+    """প্রতিটা request এ একই status - method অনুযায়ী কয়বার এলো গোনে"""
+    hits = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        status = 502
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self):
+            hits[self.command] = hits.get(self.command, 0) + 1
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_response(Handler.status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        do_GET = do_POST = do_PUT = do_PATCH = _reply
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.hits = hits
+    server.handler = Handler
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def api_for(server):
+    return GitHubAPI('token', base_url=server.url, max_retries=3, backoff=0.001)
+
+
+@pytest.mark.parametrize('method', ['GET', 'PUT', 'PATCH'])
+def test_5xx_is_retried_for_idempotent_methods(failing_server, method):
+    assert api_for(failing_server).request(method, '/x', json={}).status_code == 502
+    assert failing_server.hits[method] == 4
+
+
+def test_5xx_is_not_retried_for_post(failing_server):
+    assert api_for(failing_server).post('/x', json={}).status_code == 502
+    assert failing_server.hits['POST'] == 1
+
+
+def test_rate_limit_is_retried_for_post(failing_server):
+    failing_server.handler.status = 429
+    assert api_for(failing_server).post('/x', json={}).status_code == 429
+    assert failing_server.hits['POST'] == 4
@@ -0,0 +1,156 @@
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from streamer import FFmpegStreamer, MediaFetcher, StreamConfig
+
+PLAYLIST = b'#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXTINF:2.0,\nseg0.ts\n#EXTINF:2.0,\nseg1.ts\n'
+
+
+class RangeServer:
+    """একটা file serve করে - HEAD, Range, If-Range সহ; কোন Range চাওয়া হলো মনে রাখে"""
+
+    def __init__(self, payload, etag='"v1"', path='/video.mp4', content_type='video/mp4'):
+        self.payload = payload
+        self.etag = etag
+        self.content_type = content_type
+        self.ranges = []
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _headers(self, status, length, content_range=None):
+                self.send_response(status)
+                self.send_header('Content-Length', str(length))
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('ETag', owner.etag)
+                self.send_header('Content-Type', owner.content_type)
+                if content_range:
+                    self.send_header('Content-Range', content_range)
+                self.end_headers()
+
+            def do_HEAD(self):
+                self._headers(200, len(owner.payload))
+
+            def do_GET(self):
+                payload = owner.payload
+                requested = self.headers.get('Range')
+                if_range = self.headers.get('If-Range')
+                match = re.match(r'bytes=(\d+)-(\d*)$', requested or '')
+                if not match or (if_range and if_range != owner.etag):
+                    self._headers(200, len(payload))
+                    self.wfile.write(payload)
+                    return
+                owner.ranges.append(requested)
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else len(payload) - 1
+                body = payload[start:end + 1]
+                self._headers(206, len(body), f'bytes {start}-{end}/{len(payload)}')
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}{path}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def origin():
+    server = RangeServer(os.urandom(8192))
+    yield server
+    server.stop()
+
+
+def fetcher(tmp_path):
+    return MediaFetcher(cache_dir=str(tmp_path / 'media'), chunks=2, min_chunk=1024, retries=2)
+
+
+def test_resumes_each_chunk_from_its_partial_file(origin, tmp_path):
+    media = fetcher(tmp_path)
+    info = media.head(origin.url)
+    assert media.ranges(info) == [(0, 4095), (4096, 8191)]
+
+    directory = os.path.join(media.cache_dir, media.cache_key(origin.url, info))
+    os.makedirs(directory)
+    with open(os.path.join(directory, 'part0'), 'wb') as f:
+        f.write(origin.payload[:1000])
+    with open(os.path.join(directory, 'part1'), 'wb') as f:
+        f.write(origin.payload[4096:7096])
+
+    path = media.fetch(origin.url)
+
+    with open(path, 'rb') as f:
+        assert f.read() == origin.payload
+    assert sorted(origin.ranges) == ['bytes=1000-4095', 'bytes=7096-8191']
+    assert not os.path.exists(os.path.join(directory, 'part0'))
+
+
+def test_complete_download_is_served_from_cache(origin, tmp_path):
+    media = fetcher(tmp_path)
+    path = media.fetch(origin.url)
+    origin.ranges.clear()
+
+    assert media.fetch(origin.url) == path
+    assert origin.ranges == []
+    assert media.cached(origin.url) == path
+
+
+def test_origin_change_discards_partial_chunk(origin, tmp_path):
+    media = fetcher(tmp_path)
+    info = media.head(origin.url)
+    directory = os.path.join(media.cache_dir, media.cache_key(origin.url, info))
+    part = os.path.join(directory, 'part0')
+    os.makedirs(directory)
+    with open(part, 'wb') as f:
+        f.write(origin.payload[:1000])
+
+    # head() এর পরে origin এ নতুন version - If-Range আর মেলে না, server পুরো file পাঠায়
+    origin.etag = '"v2"'
+    assert not media._download(info, directory, os.path.join(directory, 'media.mp4'))
+    assert not os.path.exists(part)
+
+
+def test_manifest_extensions_are_not_cacheable():
+    assert not MediaFetcher.cacheable('https://cdn.example.com/live/index.m3u8?token=1')
+    assert not MediaFetcher.cacheable('https://cdn.example.com/live/manifest.MPD')
+    assert MediaFetcher.cacheable('https://cdn.example.com/video.mp4')
+
+
+def test_manifest_content_type_is_not_downloaded(tmp_path):
+    origin = RangeServer(PLAYLIST, path='/live', content_type='application/vnd.apple.mpegurl')
+    try:
+        media = fetcher(tmp_path)
+        assert media.fetch(origin.url) is None
+        assert media.skipped == 'manifest'
+        assert origin.ranges == []
+        assert not os.path.exists(media.cache_dir)
+    finally:
+        origin.stop()
+
+
+@pytest.mark.parametrize('path, content_type', [('/live.m3u8', 'text/plain'),
+                                                ('/live', 'application/vnd.apple.mpegurl')])
+def test_stream_passes_manifest_url_to_ffmpeg(tmp_path, monkeypatch, path, content_type):
+    monkeypatch.chdir(tmp_path)
+    origin = RangeServer(PLAYLIST, path=path, content_type=content_type)
+    try:
+        config = StreamConfig.from_env({'YOUTUBE_STREAM_KEY': 'key', 'VIDEO_URL': origin.url,
+                                        'RESUME': '0', 'METRICS_FILE': ''})
+        engine = FFmpegStreamer(config)
+        engine.prepare_source()
+
+        assert engine.source == origin.url
+        assert engine.readahead is None
+        cmd = engine.build_command()
+        assert cmd[cmd.index('-i') + 1] == origin.url
+    finally:
+        origin.stop()
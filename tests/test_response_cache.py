@@ -0,0 +1,47 @@
+from streamer import GitHubAPI, ResponseCache
+
+
+def test_second_get_is_a_304_served_from_cache(fake_github, tmp_path):
+    api = GitHubAPI('token-a', base_url=fake_github.url, cache_dir=str(tmp_path))
+
+    first = api.get('/user')
+    second = api.get('/user')
+
+    assert first.status_code == 200 and not getattr(first, 'from_cache', False)
+    assert second.status_code == 200 and second.from_cache
+    assert second.json() == first.json() == {'login': 'bench-user'}
+    assert api.summary()['endpoints']['GET /user']['not_modified'] == 1
+
+
+def test_cache_is_per_token(fake_github, tmp_path):
+    GitHubAPI('token-a', base_url=fake_github.url, cache_dir=str(tmp_path)).get('/user')
+    other = GitHubAPI('token-b', base_url=fake_github.url, cache_dir=str(tmp_path)).get('/user')
+
+    assert not getattr(other, 'from_cache', False)
+
+
+def test_write_invalidates_cached_read(fake_github, tmp_path):
+    api = GitHubAPI('token-a', base_url=fake_github.url, cache_dir=str(tmp_path))
+    path = '/repos/bench-user/demo/contents/notes.txt'
+    api.post('/user/repos', json={'name': 'demo'})
+    api.put(path, json={'message': 'add', 'content': 'djE='})
+    first = api.get(path).json()
+
+    assert api.cache.get(api.identity, api.url(path))
+    api.put(path, json={'message': 'update', 'content': 'djI='})
+    assert api.cache.get(api.identity, api.url(path)) is None
+    assert api.get(path).json()['sha'] != first['sha']
+
+
+def test_eviction_keeps_the_newest_entries(tmp_path):
+    class Response:
+        headers = {'ETag': '"x"'}
+        text = '{}'
+
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    for i in range(4):
+        cache.put('id', f'https://api.github.com/{i}', Response())
+
+    assert cache.get('id', 'https://api.github.com/0') is None
+    assert cache.get('id', 'https://api.github.com/3') is not None
+    assert cache.invalidate() == 2
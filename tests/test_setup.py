@@ -0,0 +1,37 @@
+import benchmark
+
+DISPATCH = 'POST /repos/{owner}/{repo}/actions/workflows/youtube-live.yml/dispatches'
+
+
+class RecordingSetup(benchmark.BenchSetup):
+    def __init__(self, base_dir, secrets_ok=True):
+        super().__init__(base_dir)
+        self.secrets_ok = secrets_ok
+        self.order = []
+
+    def set_github_secrets(self):
+        self.order.append('secrets')
+        return super().set_github_secrets() if self.secrets_ok else False
+
+    def upload_files_to_repo(self):
+        self.order.append('files')
+        return super().upload_files_to_repo()
+
+
+def test_files_are_pushed_after_secrets(workspace):
+    setup = RecordingSetup(workspace)
+
+    assert setup.run()
+    assert setup.order == ['secrets', 'files']
+    steps = setup.report.graph['steps']
+    assert all(step['status'] == 'ok' for step in steps.values())
+    assert setup.report.graph['critical_path'][-3:] == ['set_secrets', 'upload_files', 'trigger_workflow']
+
+
+def test_failed_secrets_do_not_report_a_started_workflow(fake_github, workspace):
+    setup = RecordingSetup(workspace, secrets_ok=False)
+
+    setup.run()
+
+    assert setup.report.graph['steps']['trigger_workflow']['status'] == 'failed'
+    assert fake_github.requests.get(DISPATCH, 0) == 0
@@ -0,0 +1,177 @@
+import threading
+import time
+
+import streamer
+from streamer import StepGraph
+
+
+def recorder():
+    events = []
+    lock = threading.Lock()
+
+    def step(name, result=True, sleep=0.0):
+        def run():
+            with lock:
+                events.append(('start', name))
+            time.sleep(sleep)
+            with lock:
+                events.append(('end', name))
+            return result
+        return run
+    return events, step
+
+
+def test_dependencies_run_in_order_and_independent_steps_overlap():
+    events, step = recorder()
+    graph = StepGraph(max_workers=4)
+    graph.add('a', step('a', sleep=0.05))
+    graph.add('b', step('b'), after=['a'])
+    graph.add('c', step('c'), after=['b'])
+    graph.add('d', step('d', sleep=0.05))
+
+    assert graph.run() == dict.fromkeys('abcd', 'ok')
+    assert events.index(('end', 'a')) < events.index(('start', 'b'))
+    assert events.index(('end', 'b')) < events.index(('start', 'c'))
+    # Neither a nor d waits for the other
+    assert events.index(('start', 'd')) < events.index(('end', 'a'))
+    assert graph.critical_path()[1] == ['a', 'b', 'c']
+
+
+def test_required_failure_skips_dependents_and_cancels_the_rest():
+    _, step = recorder()
+    graph = StepGraph(max_workers=1, fail_fast=True)
+    graph.add('gate', step('gate', result=False))
+    graph.add('after_gate', step('after_gate'), after=['gate'])
+    graph.add('later', step('later'), after=['gate', 'after_gate'])
+
+    status = graph.run()
+
+    assert status['gate'] == 'failed'
+    assert status['after_gate'] in ('skipped', 'cancelled')
+    assert status['later'] in ('skipped', 'cancelled')
+
+
+def test_optional_failure_still_runs_dependents():
+    _, step = recorder()
+    graph = StepGraph(fail_fast=True)
+    graph.add('secrets', step('secrets', result=False), required=False)
+    graph.add('files', step('files'), after=['secrets'])
+
+    assert graph.run() == {'secrets': 'failed', 'files': 'ok'}
+
+
+def test_exception_is_recorded_as_error():
+    def boom():
+        raise RuntimeError('boom')
+
+    graph = StepGraph(fail_fast=False)
+    graph.add('boom', boom)
+    graph.add('other', lambda: True)
+
+    assert graph.run() == {'boom': 'error', 'other': 'ok'}
+    assert str(graph.errors['boom']) == 'boom'
+
+
+def test_timeout_marks_step_and_does_not_wait_for_it():
+    _, step = recorder()
+    graph = StepGraph(fail_fast=False)
+    graph.add('slow', step('slow', sleep=2.0), timeout=0.1)
+    graph.add('after_slow', step('after_slow'), after=['slow'])
+
+    started = time.perf_counter()
+    status = graph.run()
+
+    assert time.perf_counter() - started < 1.0
+    assert status == {'slow': 'timeout', 'after_slow': 'skipped'}
+    assert isinstance(graph.errors['slow'], TimeoutError)
+
+
+def test_group_limit_caps_in_flight_steps():
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def step():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.03)
+        with lock:
+            running[0] -= 1
+        return True
+
+    graph = StepGraph(max_workers=8, limits={'account': 2})
+    for i in range(6):
+        graph.add(f'repo{i}', step, group='account')
+
+    assert set(graph.run().values()) == {'ok'}
+    assert peak[0] == 2
+
+
+def test_cycle_and_unknown_dependency_are_rejected():
+    graph = StepGraph()
+    graph.add('a', lambda: True, after=['b'])
+    graph.add('b', lambda: True, after=['a'])
+    try:
+        graph.run()
+    except ValueError as e:
+        assert 'cycle' in str(e)
+    else:
+        raise AssertionError('cycle not detected')
+
+    graph = StepGraph()
+    graph.add('a', lambda: True, after=['missing'])
+    try:
+        graph.validate()
+    except ValueError as e:
+        assert 'unknown step' in str(e)
+    else:
+        raise AssertionError('unknown dependency not detected')
+
+
+def test_timed_out_step_stops_before_its_next_request(fake_github):
+    api = streamer.GitHubAPI('token', base_url=fake_github.url)
+    calls = []
+    release = threading.Event()
+
+    def slow_writer():
+        calls.append(api.get('/user').status_code)
+        release.wait(2)
+        # Past the timeout - this request must never be sent
+        calls.append(api.post('/user/repos', json={'name': 'late'}).status_code)
+        return True
+
+    graph = StepGraph(fail_fast=False)
+    graph.add('slow', slow_writer, timeout=0.1)
+    assert graph.run() == {'slow': 'timeout'}
+    release.set()
+    time.sleep(0.2)
+
+    assert calls == [200]
+    assert 'bench-user/late' not in fake_github.repos
+
+
+def test_fail_fast_cancels_running_steps():
+    started = threading.Event()
+    outcome = []
+
+    def worker():
+        started.set()
+        for _ in range(100):
+            time.sleep(0.01)
+            streamer.check_cancelled()
+        outcome.append('finished')
+        return True
+
+    def gate():
+        started.wait(1)
+        return False
+
+    graph = StepGraph(max_workers=2, fail_fast=True)
+    graph.add('worker', worker)
+    graph.add('gate', gate)
+
+    status = graph.run()
+
+    assert status == {'worker': 'cancelled', 'gate': 'failed'}
+    assert isinstance(graph.errors['worker'], streamer.StepCancelled)
+    assert outcome == []
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+import streamer
+from streamer import FFmpegStreamer, StreamConfig
+
+H264_1080P = {'video': {'codec_name': 'h264', 'pix_fmt': 'yuv420p', 'width': 1920, 'height': 1080},
+              'audio': {'codec_name': 'aac'}, 'duration': 60.0}
+
+
+@pytest.fixture(autouse=True)
+def in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def config_from(**env):
+    return StreamConfig.from_env(dict({'YOUTUBE_STREAM_KEY': 'abcd-1234', 'VIDEO_URL': 'video.mp4',
+                                       'RESUME': '0', 'METRICS_FILE': ''}, **env))
+
+
+def test_config_reads_the_workflow_environment():
+    config = config_from(VIDEO_QUALITY=' 720P ', ASPECT_RATIO='9:16', STREAM_MAX_SECONDS='19200',
+                         GITHUB_RUN_ID='42', GITHUB_RUN_ATTEMPT='2')
+
+    assert config.quality == '720p'
+    assert config.max_seconds == 19200.0
+    assert config.run_id == '42.2'
+    assert config.destination == f'{streamer.DEFAULT_RTMP_URL}/abcd-1234'
+    # Portrait এ width ছোট দিক - দুটোই even
+    width, height = config.target_size()
+    assert (width, height) == (720, 1280)
+
+
+def test_unknown_quality_falls_back_to_1080p():
+    assert config_from(VIDEO_QUALITY='8k').quality == '1080p'
+
+
+def test_several_keys_and_extra_destinations():
+    config = config_from(YOUTUBE_STREAM_KEY='key-1, key-2', STREAM_DESTINATIONS='rtmp://other/live/x')
+
+    assert config.destinations == [f'{streamer.DEFAULT_RTMP_URL}/key-1', f'{streamer.DEFAULT_RTMP_URL}/key-2',
+                                   'rtmp://other/live/x']
+    assert config_from(STREAM_OUTPUT='out.flv').destinations == ['out.flv']
+
+
+def test_matching_source_is_stream_copied():
+    cmd = FFmpegStreamer(config_from(STREAM_OUTPUT='out.flv')).build_command(H264_1080P, duration=30)
+
+    assert cmd[0] == streamer.FFMPEG_BIN
+    assert cmd[cmd.index('-c:v') + 1] == 'copy'
+    assert cmd[cmd.index('-c:a') + 1] == 'copy'
+    assert cmd[cmd.index('-t') + 1] == '30.000'
+    assert cmd[-3:] == ['-f', 'flv', 'out.flv']
+
+
+def test_other_sources_are_encoded_with_a_silent_track_when_needed():
+    probe = {'video': {'codec_name': 'vp9', 'width': 1280, 'height': 720}, 'audio': None}
+    cmd = FFmpegStreamer(config_from(VIDEO_QUALITY='720p', STREAM_OUTPUT='null')).build_command(probe)
+
+    assert cmd[cmd.index('-c:v') + 1] == 'libx264'
+    assert 'anullsrc=channel_layout=stereo:sample_rate=44100' in cmd
+    assert cmd[cmd.index('-map', cmd.index('-map') + 1) + 1] == '1:a:0'
+    assert cmd[-3:] == ['-f', 'null', '-']
+    # Live stream এ GOP = 2s, scene cut এ নতুন keyframe নয়
+    assert cmd[cmd.index('-g') + 1] == '60'
+
+
+def test_run_stream_needs_key_and_video(monkeypatch, capsys):
+    monkeypatch.delenv('YOUTUBE_STREAM_KEY', raising=False)
+    monkeypatch.delenv('VIDEO_URL', raising=False)
+
+    assert streamer.run_stream() is False
+    assert 'must be set' in capsys.readouterr().out
+
+
+def restarting_engine(monkeypatch, positions):
+    """run() যেখানে প্রতিটা ffmpeg process positions এর পরের out_time এ stall করে"""
+    with open('video.mp4', 'wb') as f:
+        f.write(b'\0')
+    engine = FFmpegStreamer(config_from(STREAM_OUTPUT='out.flv'))
+    commands = []
+    monkeypatch.setattr(streamer, 'keyframe_index', lambda path: [0.0, 10.0, 20.0, 30.0, 40.0, 50.0])
+    monkeypatch.setattr(engine, 'prepare_source', lambda: H264_1080P)
+    monkeypatch.setattr(engine, 'sleep', lambda seconds: None)
+
+    def start_process(cmd):
+        commands.append(cmd)
+        engine.counters['starts'] += 1
+        engine.process_started = time.monotonic()
+        engine.monitor.out_time = positions[len(commands) - 1]
+        return True
+
+    def watch():
+        if len(commands) == len(positions):
+            engine.stopping = True
+        return 'stall detected (no progress)'
+
+    monkeypatch.setattr(engine, 'start_process', start_process)
+    monkeypatch.setattr(engine, 'watch', watch)
+    return engine, commands
+
+
+def test_restart_seeks_a_single_file_to_the_last_keyframe(monkeypatch):
+    engine, commands = restarting_engine(monkeypatch, [25.0, 30.0, 1.0])
+
+    assert engine.run()
+
+    seeks = [cmd[cmd.index('-ss') + 1] if '-ss' in cmd else None for cmd in commands]
+    # 25s -> keyframe 20; 20 + 30 = 50; 50 + 1 = 51 -> keyframe 50
+    assert seeks == [None, '20.000', '50.000']
+    assert all(cmd.index('-ss') < cmd.index('-i') for cmd in commands[1:])
+    assert engine.playback_position() == ('video.mp4', 51.0)
+
+
+def test_restart_point_wraps_and_follows_segment_keyframes():
+    engine = FFmpegStreamer(config_from())
+    engine.duration = 60.0
+    engine.source, engine.source_format = 'segments.txt', 'concat'
+    engine.seek_from, engine.monitor.out_time = 50.0, 15.0
+
+    assert engine.restart_point() == 4.0
+    engine.readahead = object()
+    assert engine.restart_point() == 0.0
@@ -0,0 +1,116 @@
+import os
+import threading
+
+import pytest
+
+from streamer import FileLeaseStore, HTTPLeaseStore, LeaseServer, StreamLease
+
+
+@pytest.fixture(params=['file', 'http'])
+def store(request, tmp_path):
+    if request.param == 'file':
+        return FileLeaseStore(str(tmp_path / 'lease.json'))
+    server = LeaseServer().start()
+    request.addfinalizer(server.stop)
+    return HTTPLeaseStore(f'{server.url}/stream')
+
+
+def test_roles_holder_successor_duplicate(store):
+    holder = StreamLease(store, 'run-1')
+    successor = StreamLease(store, 'run-2')
+    duplicate = StreamLease(store, 'run-3')
+
+    assert holder.acquire() == 'holder'
+    assert successor.acquire() == 'successor'
+    assert duplicate.acquire() == 'duplicate'
+    # একই run আবার acquire করলে নিজের role ই পায়
+    assert holder.acquire() == 'holder'
+
+
+def test_handoff_passes_position_to_successor(store):
+    holder = StreamLease(store, 'run-1')
+    successor = StreamLease(store, 'run-2', poll=0.01)
+    holder.acquire()
+    successor.acquire()
+
+    assert successor.mark_ready()
+    assert holder.heartbeat()['successor_ready']
+
+    taken = {}
+    thread = threading.Thread(target=lambda: taken.update(handoff=successor.wait_for_takeover()))
+    thread.start()
+    holder.release({'source': 'video.mp4', 'position': 42.0})
+    thread.join(timeout=5)
+
+    assert taken['handoff'] == {'source': 'video.mp4', 'position': 42.0}
+    assert successor.role == 'holder'
+    assert store.read()['holder'] == 'run-2'
+
+
+def test_expired_holder_is_replaced(store):
+    holder = StreamLease(store, 'run-1', ttl=0.05)
+    holder.acquire()
+    threading.Event().wait(0.1)
+
+    assert StreamLease(store, 'run-2').acquire() == 'holder'
+    holder.heartbeat()
+    assert holder.role is None
+
+
+def test_heartbeat_requests_handoff_when_successor_is_ready(store):
+    holder = StreamLease(store, 'run-1', ttl=0.3)
+    successor = StreamLease(store, 'run-2', ttl=0.3)
+    holder.acquire()
+    successor.acquire()
+    successor.mark_ready()
+
+    requested = threading.Event()
+    holder.start_heartbeat(on_handoff=requested.set)
+    try:
+        assert requested.wait(timeout=2)
+    finally:
+        holder.release()
+
+
+def unused_port():
+    server = LeaseServer().start()
+    port = int(server.url.rsplit(':', 1)[1])
+    server.stop()
+    return port
+
+
+def test_unreachable_store_streams_without_lease_then_takes_it():
+    port = unused_port()
+    lease = StreamLease(HTTPLeaseStore(f'http://127.0.0.1:{port}/stream', timeout=1), 'run-1')
+
+    assert lease.acquire(timeout=0.2) == 'holder'
+    assert not lease.leased
+
+    server = LeaseServer(port=port).start()
+    try:
+        record = lease.heartbeat()
+        assert record['holder'] == 'run-1'
+        assert lease.role == 'holder' and lease.leased
+    finally:
+        server.stop()
+
+
+def test_unreachable_store_yields_to_a_run_that_took_the_lease():
+    port = unused_port()
+    lease = StreamLease(HTTPLeaseStore(f'http://127.0.0.1:{port}/stream', timeout=1), 'run-1')
+    assert lease.acquire(timeout=0.2) == 'holder'
+
+    server = LeaseServer(port=port).start()
+    try:
+        other = StreamLease(HTTPLeaseStore(f'{server.url}/stream'), 'run-2')
+        assert other.acquire() == 'holder'
+
+        lease.heartbeat()
+        assert lease.role is None
+    finally:
+        server.stop()
+
+
+def test_file_store_survives_missing_directory(tmp_path):
+    store = FileLeaseStore(os.path.join(str(tmp_path), 'nested', 'lease.json'))
+    assert StreamLease(store, 'run-1').acquire() == 'holder'
@@ -0,0 +1,24 @@
+import benchmark
+
+DISPATCH = 'POST /repos/{owner}/{repo}/actions/workflows/youtube-live.yml/dispatches'
+REF_UPDATE = 'PATCH /repos/{owner}/{repo}/git/refs/heads/main'
+
+
+def test_push_after_secrets_starts_the_run(fake_github, workspace):
+    setup = benchmark.BenchSetup(workspace)
+
+    assert setup.run()
+    assert setup.pushed_branch == 'main' and setup.pushed_after_secrets
+    # Push এর run ই workflow চালায় - আলাদা dispatch লাগে না
+    assert fake_github.requests.get(DISPATCH, 0) == 0
+
+
+def test_unchanged_files_are_not_pushed_and_the_workflow_is_dispatched(fake_github, workspace):
+    assert benchmark.BenchSetup(workspace).run()
+    fake_github.reset_counts()
+
+    setup = benchmark.BenchSetup(workspace)
+    assert setup.run()
+    assert setup.pushed_branch is None
+    assert fake_github.requests.get(REF_UPDATE, 0) == 0
+    assert fake_github.requests.get(DISPATCH) == 1
@@ -0,0 +1,28 @@
+from streamer import WorkflowGenerator, validate_workflow
+
+SHA = 'ab' * 32
+
+
+def step_names(generator):
+    return [step['name'] for step in generator.render()['jobs']['stream']['steps']]
+
+
+def test_unpinned_ffmpeg_uses_apt_and_no_cache():
+    generator = WorkflowGenerator.from_env({})
+
+    assert generator.ffmpeg_key is None
+    assert '💾 FFmpeg Cache' not in step_names(generator)
+    assert 'curl' not in generator.install_ffmpeg_script()
+    assert validate_workflow(generator.render()) == []
+
+
+def test_pinned_ffmpeg_is_verified_and_keyed_on_its_checksum():
+    url = 'https://example.com/ffmpeg-7.1.tar.xz'
+    generator = WorkflowGenerator.from_env({'FFMPEG_STATIC_URL': url, 'FFMPEG_STATIC_SHA256': SHA})
+    script = generator.install_ffmpeg_script()
+
+    assert '💾 FFmpeg Cache' in step_names(generator)
+    assert f'echo "{SHA}  ffmpeg.tar.xz" | sha256sum -c -' in script
+    # A new build behind the same URL needs a new checksum - and gets a new cache
+    rebuilt = WorkflowGenerator(ffmpeg_url=url, ffmpeg_sha256='cd' * 32)
+    assert rebuilt.ffmpeg_key != generator.ffmpeg_key